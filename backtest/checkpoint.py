@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from backtest.results import CapitalHistory, TradeLog
+from report.accumulators import MetricAccumulator
+
+CHECKPOINT_VERSION = 5
+
+
+@dataclass
+class EngineCheckpoint:
+    """Everything :class:`BacktestEngine` needs to continue a run.
+
+    ``cursor`` is the UTC nanosecond timestamp of the last test row whose
+    entry and settlement have been fully processed; resumed runs only look at
+    rows strictly after it.  Calibrators are not stored: they are refitted
+    deterministically from the training rows of the remaining splits.
+    ``results_rows`` holds the rows per table an attached results writer had
+    written at the cursor, so a resumed run can continue its files.
+    """
+
+    cursor: int
+    capital: float
+    open_positions: List[Tuple[int, int, object]]
+    executed_trades: TradeLog
+    capital_history: CapitalHistory
+    exposures: Dict[str, Dict[str, float]]
+    metrics: MetricAccumulator
+    results_rows: Optional[Dict[str, int]] = None
+    version: int = CHECKPOINT_VERSION
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write atomically so a crash mid-write keeps the previous checkpoint."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as handle:
+            pickle.dump(self, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "EngineCheckpoint":
+        with open(path, "rb") as handle:
+            checkpoint = pickle.load(handle)
+        if not isinstance(checkpoint, cls):
+            raise ValueError(f"{path} is not an engine checkpoint")
+        if checkpoint.version != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint version {checkpoint.version}; expected {CHECKPOINT_VERSION}"
+            )
+        return checkpoint
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Dict, Sequence, Union
+
+import numpy as np
 import pandas as pd
 
+BookLike = Union[pd.DataFrame, "AskLadder"]
+
 
 @dataclass
 class CostBreakdown:
@@ -32,6 +37,108 @@ class CostBreakdown:
         return self.total_cost / self.filled_size
 
 
+@dataclass(frozen=True)
+class AskLadder:
+    """Ask side of a book snapshot as cumulative arrays sorted by price.
+
+    ``cum_size[i]`` and ``cum_notional[i]`` hold the size and cost of taking
+    levels ``0..i``; VWAP fills and budget-constrained sizes are then a
+    binary search plus one linear interpolation.
+    """
+
+    best_ask: float
+    prices: np.ndarray
+    cum_size: np.ndarray
+    cum_notional: np.ndarray
+
+    @classmethod
+    def from_snapshot(cls, book_snapshot: pd.DataFrame) -> "AskLadder":
+        sides = book_snapshot["side"].to_numpy()
+        asks = sides == "ask"
+        if not asks.any():
+            raise ValueError("No ask liquidity available")
+        prices = book_snapshot["price"].to_numpy(dtype=float)[asks]
+        sizes = book_snapshot["size"].to_numpy(dtype=float)[asks]
+        levels = book_snapshot["level"].to_numpy()[asks]
+        best_ask = float(prices[np.argmin(levels)])
+        order = np.argsort(prices, kind="stable")
+        prices = prices[order]
+        sizes = sizes[order]
+        return cls(
+            best_ask=best_ask,
+            prices=prices,
+            cum_size=np.cumsum(sizes),
+            cum_notional=np.cumsum(sizes * prices),
+        )
+
+    @classmethod
+    def from_levels(cls, prices: Sequence[float], sizes: Sequence[float]) -> "AskLadder":
+        """Build from ask ``prices``/``sizes`` listed in level order, best first."""
+        prices = np.asarray(prices, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)
+        if len(prices) == 0:
+            raise ValueError("No ask liquidity available")
+        order = np.argsort(prices, kind="stable")
+        return cls(
+            best_ask=float(prices[0]),
+            prices=prices[order],
+            cum_size=np.cumsum(sizes[order]),
+            cum_notional=np.cumsum(sizes[order] * prices[order]),
+        )
+
+    @property
+    def liquidity(self) -> float:
+        return float(self.cum_size[-1])
+
+    @property
+    def cheapest_ask(self) -> float:
+        return float(self.prices[0])
+
+    def fill(self, size: float) -> tuple[float, float]:
+        """Return ``(vwap, filled)`` for taking up to ``size`` shares."""
+        filled = min(size, self.liquidity)
+        if filled <= 0:
+            return float("nan"), 0.0
+        k = int(np.searchsorted(self.cum_size, filled, side="left"))
+        k = min(k, len(self.prices) - 1)
+        size_before = self.cum_size[k - 1] if k > 0 else 0.0
+        notional_before = self.cum_notional[k - 1] if k > 0 else 0.0
+        notional = notional_before + (filled - size_before) * self.prices[k]
+        return float(notional / filled), float(filled)
+
+    def size_for_notional(self, budget: float) -> float:
+        """Largest size whose VWAP notional does not exceed ``budget``."""
+        if budget <= 0:
+            return 0.0
+        if budget >= self.cum_notional[-1]:
+            return self.liquidity
+        k = int(np.searchsorted(self.cum_notional, budget, side="left"))
+        size_before = self.cum_size[k - 1] if k > 0 else 0.0
+        notional_before = self.cum_notional[k - 1] if k > 0 else 0.0
+        return float(size_before + (budget - notional_before) / self.prices[k])
+
+
+def _stack_ladders(ladders: Sequence[AskLadder]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pad ladders into ``(books, levels)`` arrays.
+
+    Padding repeats each ladder's last cumulative values, so padded levels add
+    no size and a padded price never gets selected.
+    """
+    depth = max(len(ladder.prices) for ladder in ladders)
+    prices = np.empty((len(ladders), depth))
+    cum_size = np.empty((len(ladders), depth))
+    cum_notional = np.empty((len(ladders), depth))
+    for i, ladder in enumerate(ladders):
+        n = len(ladder.prices)
+        prices[i, :n] = ladder.prices
+        prices[i, n:] = ladder.prices[-1]
+        cum_size[i, :n] = ladder.cum_size
+        cum_size[i, n:] = ladder.cum_size[-1]
+        cum_notional[i, :n] = ladder.cum_notional
+        cum_notional[i, n:] = ladder.cum_notional[-1]
+    return prices, cum_size, cum_notional
+
+
 class CostModel:
     def __init__(
         self,
@@ -43,38 +150,14 @@ class CostModel:
         self.gas_cost = gas_cost
         self.borrow_rate = borrow_rate
 
-    def _compute_vwap(self, asks: pd.DataFrame, size: float) -> tuple[float, float]:
-        remaining = size
-        total_cost = 0.0
-        filled = 0.0
-        for _, row in asks.sort_values("price").iterrows():
-            available = float(row["size"])
-            take = min(remaining, available)
-            total_cost += take * float(row["price"])
-            filled += take
-            remaining -= take
-            if remaining <= 1e-9:
-                break
-        if filled == 0:
-            return float("nan"), 0.0
-        return total_cost / filled, filled
+    @staticmethod
+    def ladder(book_snapshot: BookLike) -> AskLadder:
+        if isinstance(book_snapshot, AskLadder):
+            return book_snapshot
+        return AskLadder.from_snapshot(book_snapshot)
 
-    def estimate_cost(
-        self,
-        book_snapshot: pd.DataFrame,
-        target_size: float,
-        tau_days: float,
-    ) -> CostBreakdown:
-        asks = book_snapshot[book_snapshot["side"] == "ask"]
-        if asks.empty:
-            raise ValueError("No ask liquidity available")
-
-        best_ask = float(asks.loc[asks["level"].idxmin(), "price"])
-        vwap, filled = self._compute_vwap(asks, target_size)
-        if filled == 0:
-            raise ValueError("Unable to fill order with available liquidity")
-
-        slippage_cost = max(0.0, (vwap - best_ask) * filled)
+    def _breakdown(self, ladder: AskLadder, vwap: float, filled: float, tau_days: float) -> CostBreakdown:
+        slippage_cost = max(0.0, (vwap - ladder.best_ask) * filled)
         taker_fee_cost = self.taker_fee * vwap * filled
         borrow_cost = max(tau_days, 0.0) / 365.0 * self.borrow_rate * vwap * filled
         gas_cost = self.gas_cost
@@ -87,3 +170,81 @@ class CostModel:
             gas_cost=gas_cost,
             borrow_cost=borrow_cost,
         )
+
+    def estimate_cost(
+        self,
+        book_snapshot: BookLike,
+        target_size: float,
+        tau_days: float,
+    ) -> CostBreakdown:
+        ladder = self.ladder(book_snapshot)
+        vwap, filled = ladder.fill(target_size)
+        if filled == 0:
+            raise ValueError("Unable to fill order with available liquidity")
+        return self._breakdown(ladder, vwap, filled, tau_days)
+
+    def estimate_cost_for_notional(
+        self,
+        book_snapshot: BookLike,
+        budget: float,
+        tau_days: float,
+    ) -> CostBreakdown:
+        """Cost of the largest fill whose VWAP notional fits ``budget``."""
+        ladder = self.ladder(book_snapshot)
+        return self.estimate_cost(ladder, ladder.size_for_notional(budget), tau_days)
+
+    def estimate_costs(
+        self,
+        books: Sequence[BookLike],
+        sizes: np.ndarray,
+        tau_days: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """Vectorised :meth:`estimate_cost` over aligned ``(book, size, tau)`` requests.
+
+        Returns one array per :class:`CostBreakdown` field.  Requests that
+        cannot be filled get ``filled_size == 0`` and NaN prices instead of
+        raising.
+        """
+        ladders = [self.ladder(book) for book in books]
+        sizes = np.asarray(sizes, dtype=float)
+        tau_days = np.asarray(tau_days, dtype=float)
+        if not ladders:
+            empty = np.empty(0)
+            return {name: empty for name in CostBreakdown.__dataclass_fields__}
+
+        prices, cum_size, cum_notional = _stack_ladders(ladders)
+        rows = np.arange(len(ladders))
+        filled = np.clip(sizes, 0.0, cum_size[:, -1])
+        k = np.minimum((cum_size < filled[:, None]).sum(axis=1), prices.shape[1] - 1)
+        size_before = np.where(k > 0, cum_size[rows, k - 1], 0.0)
+        notional_before = np.where(k > 0, cum_notional[rows, k - 1], 0.0)
+        notional = notional_before + (filled - size_before) * prices[rows, k]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = np.where(filled > 0, notional / filled, np.nan)
+
+        best_ask = np.array([ladder.best_ask for ladder in ladders])
+        return {
+            "execution_price": vwap,
+            "filled_size": filled,
+            "slippage_cost": np.where(filled > 0, np.maximum(0.0, (vwap - best_ask) * filled), 0.0),
+            "taker_fee_cost": np.where(filled > 0, self.taker_fee * vwap * filled, 0.0),
+            "gas_cost": np.full(len(ladders), self.gas_cost),
+            "borrow_cost": np.where(
+                filled > 0, np.maximum(tau_days, 0.0) / 365.0 * self.borrow_rate * vwap * filled, 0.0
+            ),
+        }
+
+    def max_sizes_for_notional(self, books: Sequence[BookLike], budgets: np.ndarray) -> np.ndarray:
+        """Vectorised :meth:`AskLadder.size_for_notional`."""
+        ladders = [self.ladder(book) for book in books]
+        budgets = np.asarray(budgets, dtype=float)
+        if not ladders:
+            return np.empty(0)
+        prices, cum_size, cum_notional = _stack_ladders(ladders)
+        rows = np.arange(len(ladders))
+        k = np.minimum((cum_notional < budgets[:, None]).sum(axis=1), prices.shape[1] - 1)
+        size_before = np.where(k > 0, cum_size[rows, k - 1], 0.0)
+        notional_before = np.where(k > 0, cum_notional[rows, k - 1], 0.0)
+        sizes = size_before + (budgets - notional_before) / prices[rows, k]
+        sizes = np.where(budgets >= cum_notional[:, -1], cum_size[:, -1], sizes)
+        return np.where(budgets > 0, sizes, 0.0)
@@ -1,41 +1,129 @@
 from __future__ import annotations
 
-from __future__ import annotations
-
+import heapq
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from backtest.cost_model import CostModel
+from backtest.checkpoint import EngineCheckpoint
+from backtest.cost_model import AskLadder, CostModel
+from backtest.results import CapitalHistory, TradeLog, TradeResult  # noqa: F401 (re-export)
 from backtest.risk import RiskManager
-from model.calibrate_isotonic import IsotonicCalibrator
+from backtest.splits import SplitLike, WalkForwardSplit, as_split
+from backtest.writers import ResultsWriter
+from report.accumulators import MetricAccumulator
+from report.profiling import StageProfiler
 
 
 @dataclass
 class BacktestConfig:
     initial_capital: float = 100_000.0
     min_ev: float = 0.0
-
-
-@dataclass
-class TradeResult:
-    trade_id: str
-    condition_id: str
-    timestamp: pd.Timestamp
-    resolve_ts: pd.Timestamp
-    category: str
-    neg_risk_group: str
-    price: float
-    execution_price: float
-    shares: float
-    notional: float
-    q_hat: float
-    q_lower: float
-    ev_lower: float
-    total_cost: float
-    payout: float
-    pnl: float
+    # Processes used to fit calibrators for independent folds; ``None`` uses
+    # every core.  Execution always runs sequentially.
+    fit_workers: Optional[int] = 1
+    # When set, state is saved here after every split and, within a split,
+    # roughly every ``checkpoint_every`` test rows.
+    checkpoint_path: Optional[Path] = None
+    checkpoint_every: Optional[int] = None
+    # "sequential" takes candidates first come, first served; "ranked"
+    # batches candidates sharing a timestamp (or decision window) and fills
+    # them best tau-annualised EV lower bound first.
+    allocation: Literal["sequential", "ranked"] = "sequential"
+    decision_window_minutes: float = 0.0
+    # Report metrics are always accumulated on settlement; ``keep_trades``
+    # additionally retains every trade in ``executed_trades``.
+    keep_trades: bool = True
+    # Called with the running :class:`MetricAccumulator` roughly every
+    # ``progress_every`` settlements.
+    on_progress: Optional[Callable[[MetricAccumulator], None]] = None
+    progress_every: int = 1_000
+    # Receives per-stage timings (calibrator fits, prescreen, the entry and
+    # settlement loop); the loop is also sampled if the profiler samples.
+    profiler: Optional[StageProfiler] = None
+
+
+# Floor on time to resolution when annualising edge for ranking (one hour).
+_MIN_TAU_DAYS = 1.0 / 24.0
+_DAY_NS = 86_400 * 10**9
+
+
+class _OpenPosition:
+    """Entry details kept until a position settles."""
+
+    __slots__ = (
+        "trade_id",
+        "token_id",
+        "condition_id",
+        "timestamp",
+        "resolve_ts",
+        "category",
+        "neg_risk_group",
+        "category_id",
+        "neg_risk_id",
+        "market_id",
+        "price",
+        "execution_price",
+        "shares",
+        "notional",
+        "total_cost",
+        "q_hat",
+        "q_lower",
+        "ev_lower",
+        "outcome",
+    )
+
+    def __init__(self, **values) -> None:
+        for name, value in values.items():
+            setattr(self, name, value)
+
+
+def _calibrator_columns(calibrator, base: List[str]) -> List[str]:
+    """Append any extra ``feature_columns`` a calibrator declares to ``base``."""
+    extra = getattr(calibrator, "feature_columns", ())
+    return list(dict.fromkeys([*base, *extra]))
+
+
+def _column_values(frame: pd.DataFrame, name: str) -> list:
+    """Column as Python scalars; optional columns default to ``None``."""
+    if name not in frame:
+        return [None] * len(frame)
+    column = frame[name]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Dictionary-encoded strings; missing codes become ``None``, not NaN.
+        return column.astype(object).where(column.notna(), None).tolist()
+    return column.to_numpy().tolist()
+
+
+def _fit_and_predict(
+    calibrator_factory: Callable[[], object], train: pd.DataFrame, test: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray]:
+    calibrator = calibrator_factory()
+    calibrator.fit(train[_calibrator_columns(calibrator, ["price", "outcome", "tau_bucket"])])
+    predictions = calibrator.transform(test[_calibrator_columns(calibrator, ["price", "tau_bucket"])])
+    return predictions["q_hat"].to_numpy(), predictions["q_lower"].to_numpy()
+
+
+_FOLD_STATE: Optional[Tuple[Callable[[], object], pd.DataFrame]] = None
+
+
+def _init_fold_worker(calibrator_factory: Callable[[], object], data: pd.DataFrame) -> None:
+    global _FOLD_STATE
+    _FOLD_STATE = (calibrator_factory, data)
+
+
+def _worker_fit_fold(split: WalkForwardSplit) -> Tuple[np.ndarray, np.ndarray]:
+    if _FOLD_STATE is None:
+        raise RuntimeError("Fold worker was not initialised")
+    calibrator_factory, data = _FOLD_STATE
+    return _fit_and_predict(
+        calibrator_factory, data.loc[split.train_mask(data)], data.loc[split.test_mask(data)]
+    )
 
 
 class BacktestEngine:
@@ -46,173 +134,623 @@ class BacktestEngine:
         risk_manager: RiskManager,
         config: BacktestConfig,
         book_lookup: Dict[Tuple[str, pd.Timestamp], pd.DataFrame],
+        results_writer: Optional[ResultsWriter] = None,
     ) -> None:
         self.calibrator_factory = calibrator_factory
         self.cost_model = cost_model
         self.risk_manager = risk_manager
         self.config = config
         self.book_lookup = book_lookup
+        # Receives every settled trade and capital change as it happens; the
+        # caller owns it and closes it after the run.
+        self.results_writer = results_writer
+        self._online_calibrator = None
+        self._online_train_end: pd.Timestamp | None = None
+        self._metrics = MetricAccumulator()
+        self._next_progress = 0
+        self._ladders: Dict[Tuple[str, pd.Timestamp], Optional[AskLadder]] = {}
+        # Per token, sorted book times (ns) and their lookup keys; built on
+        # first use by decision windows.
+        self._book_times: Optional[Dict[str, Tuple[np.ndarray, list]]] = None
+
+    def _fit_split_calibrator(self, data: pd.DataFrame, split: WalkForwardSplit):
+        """Return a calibrator fitted on the training rows of ``split``.
+
+        Calibrators exposing ``partial_fit``/``snapshot`` are kept across
+        expanding splits and only fold in rows added since the previous
+        ``train_end``; anything else is refitted from scratch on the full
+        training window.
+        """
+        columns = ["price", "outcome", "tau_bucket"]
+        train_end = split.train_end
+        online = self._online_calibrator
+        if online is not None and split.expanding and train_end >= self._online_train_end:
+            new_rows = data.loc[
+                (data["timestamp"] > self._online_train_end) & (data["timestamp"] <= train_end)
+            ]
+            online.partial_fit(new_rows[columns])
+            self._online_train_end = train_end
+            return online.snapshot()
+
+        calibrator = self.calibrator_factory()
+        columns = _calibrator_columns(calibrator, columns)
+        calibrator.fit(data.loc[split.train_mask(data), columns])
+        if split.expanding and hasattr(calibrator, "partial_fit") and hasattr(calibrator, "snapshot"):
+            self._online_calibrator = calibrator
+            self._online_train_end = train_end
+            return calibrator.snapshot()
+        return calibrator
+
+    def _predict_folds(
+        self, data: pd.DataFrame, splits: List[WalkForwardSplit], cursor: Optional[int] = None
+    ) -> List[Optional[pd.DataFrame]]:
+        """Test rows of every split with ``q_hat``/``q_lower`` attached.
+
+        Folds do not depend on each other or on capital, so with
+        ``config.fit_workers != 1`` each fold is fitted and predicted in a
+        worker process (the calibrator factory must then be picklable).
+        Incrementally updated calibrators are cheaper to run in order and
+        always stay in-process.  Folds with no training or test rows yield
+        ``None``; with ``cursor`` (ns) only test rows after it are kept.
+        """
+        tests = [data.loc[split.test_mask(data)] for split in splits]
+        if cursor is not None:
+            tests = [test_df.loc[pd.DatetimeIndex(test_df["timestamp"]).asi8 > cursor] for test_df in tests]
+        pending = [
+            i
+            for i, test_df in enumerate(tests)
+            if not test_df.empty and splits[i].train_mask(data).any()
+        ]
+        probe = self.calibrator_factory()
+        incremental = hasattr(probe, "partial_fit") and hasattr(probe, "snapshot")
+
+        predictions: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        if self.config.fit_workers == 1 or len(pending) <= 1 or incremental:
+            for i in pending:
+                calibrator = self._fit_split_calibrator(data, splits[i])
+                frame = calibrator.transform(
+                    tests[i][_calibrator_columns(calibrator, ["price", "tau_bucket"])]
+                )
+                predictions[i] = (frame["q_hat"].to_numpy(), frame["q_lower"].to_numpy())
+        else:
+            columns = _calibrator_columns(
+                probe, ["timestamp", "resolve_ts", "price", "outcome", "tau_bucket"]
+            )
+            with ProcessPoolExecutor(
+                max_workers=self.config.fit_workers,
+                initializer=_init_fold_worker,
+                initargs=(self.calibrator_factory, data[columns]),
+            ) as pool:
+                results = pool.map(_worker_fit_fold, [splits[i] for i in pending])
+                predictions = dict(zip(pending, results))
+
+        folds: List[Optional[pd.DataFrame]] = []
+        for i, test_df in enumerate(tests):
+            if i not in predictions:
+                folds.append(None)
+                continue
+            test_with_pred = test_df.copy()
+            test_with_pred["q_hat"], test_with_pred["q_lower"] = predictions[i]
+            folds.append(test_with_pred)
+        return folds
 
     def _settle_positions(
         self,
         current_time: pd.Timestamp,
-        open_positions: List[Dict],
+        open_positions: List[Tuple[int, int, _OpenPosition]],
         capital: float,
-        executed_trades: List[TradeResult],
-        capital_history: List[Tuple[pd.Timestamp, float]],
-    ) -> Tuple[List[Dict], float]:
-        remaining = []
-        for position in open_positions:
-            if position["resolve_ts"] <= current_time:
-                payout = position["outcome"] * position["shares"]
-                capital += payout
-                pnl = payout - position["notional"] - position["breakdown"].total_cost
-                trade_result = TradeResult(
-                    trade_id=position["trade_id"],
-                    condition_id=position["condition_id"],
-                    timestamp=position["timestamp"],
-                    resolve_ts=position["resolve_ts"],
-                    category=position["category"],
-                    neg_risk_group=position["neg_risk_group"],
-                    price=position["price"],
-                    execution_price=position["breakdown"].execution_price,
-                    shares=position["shares"],
-                    notional=position["notional"],
-                    q_hat=position["q_hat"],
-                    q_lower=position["q_lower"],
-                    ev_lower=position["ev_lower"],
-                    total_cost=position["breakdown"].total_cost,
-                    payout=payout,
-                    pnl=pnl,
-                )
-                executed_trades.append(trade_result)
-                self.risk_manager.release_position(
-                    position["category"], position["neg_risk_group"], position["condition_id"], position["notional"]
-                )
-                capital_history.append((position["resolve_ts"], capital))
-            else:
-                remaining.append(position)
-        return remaining, capital
+        executed_trades: TradeLog,
+        capital_history: CapitalHistory,
+    ) -> Tuple[List[Tuple[int, int, _OpenPosition]], float]:
+        """Settle every position resolving at or before ``current_time``.
+
+        ``open_positions`` is a min-heap of ``(resolve_ts ns, entry seq,
+        position)``, so only due positions are touched.  Due positions are
+        settled in entry order to keep results and ``capital_history``
+        identical to a linear scan of the book.
+        """
+        cutoff = current_time.value
+        due = []
+        while open_positions and open_positions[0][0] <= cutoff:
+            due.append(heapq.heappop(open_positions))
+        due.sort(key=lambda entry: entry[1])
+        for _, _, position in due:
+            payout = position.outcome * position.shares
+            capital += payout
+            pnl = payout - position.notional - position.total_cost
+            self._metrics.update(
+                position.timestamp,
+                position.resolve_ts,
+                pnl,
+                position.notional,
+                position.total_cost,
+                payout,
+                position.q_hat,
+            )
+            row = (
+                position.trade_id,
+                position.condition_id,
+                position.timestamp,
+                position.resolve_ts,
+                position.category,
+                position.neg_risk_group,
+                position.price,
+                position.execution_price,
+                position.shares,
+                position.notional,
+                position.q_hat,
+                position.q_lower,
+                position.ev_lower,
+                position.total_cost,
+                payout,
+                pnl,
+                position.token_id,
+            )
+            if self.config.keep_trades:
+                executed_trades.append(*row)
+            if self.results_writer is not None:
+                self.results_writer.write_trade(*row)
+            self.risk_manager.release_coded(
+                position.category_id, position.neg_risk_id, position.market_id, position.notional
+            )
+            self._record_capital(capital_history, position.resolve_ts, capital)
+        on_progress = self.config.on_progress
+        if on_progress is not None and due and self._metrics.trades >= self._next_progress:
+            on_progress(self._metrics)
+            self._next_progress = self._metrics.trades + self.config.progress_every
+        return open_positions, capital
+
+    def _record_capital(self, capital_history: CapitalHistory, timestamp: int, capital: float) -> None:
+        capital_history.append(timestamp, capital)
+        if self.results_writer is not None:
+            self.results_writer.write_capital(timestamp, capital)
+
+    def _prescreen(self, frame: pd.DataFrame) -> np.ndarray:
+        """Vectorised mask of rows that can possibly trade.
+
+        Only checks that do not depend on capital, exposures or open
+        positions are applied: a book must exist with ask liquidity, both
+        calibrated probabilities must be present, the Kelly fraction must be
+        positive and, when every cost component is non-negative, the EV lower
+        bound before costs (``q_lower`` minus the cheapest ask) must clear
+        ``min_ev``.  Rejected rows would be skipped by the loop anyway.
+        """
+        q_hat = frame["q_hat"].to_numpy(dtype=float)
+        q_lower = frame["q_lower"].to_numpy(dtype=float)
+        prices = frame["price"].to_numpy(dtype=float)
+
+        mask = ~(np.isnan(q_hat) | np.isnan(q_lower))
+        mask &= self.risk_manager.kelly_fractions(q_hat, prices) > 0
+
+        cost_model = self.cost_model
+        screen_ev = min(cost_model.taker_fee, cost_model.gas_cost, cost_model.borrow_rate) >= 0
+        keys = zip(frame["token_id"].to_numpy(), frame["timestamp"])
+        for i, key in enumerate(keys):
+            if not mask[i]:
+                continue
+            ladder = self._ask_ladder(key)
+            if ladder is None or ladder.liquidity <= 0:
+                mask[i] = False
+                continue
+            if screen_ev and q_lower[i] - ladder.cheapest_ask <= self.config.min_ev:
+                mask[i] = False
+        return mask
+
+    def _ask_ladder(self, key: Tuple[str, pd.Timestamp]) -> Optional[AskLadder]:
+        """Cached ask ladder for a book key; ``None`` without a book or asks."""
+        if key in self._ladders:
+            return self._ladders[key]
+        book_snapshot = self.book_lookup.get(key)
+        ladder = None
+        if book_snapshot is not None:
+            try:
+                ladder = self.cost_model.ladder(book_snapshot)
+            except ValueError:
+                ladder = None
+        self._ladders[key] = ladder
+        return ladder
+
+    def _decision_ladder(self, fold: Dict[str, list], i: int, decision_ns: int) -> Optional[AskLadder]:
+        """Ask ladder candidate ``i`` fills against when entered at ``decision_ns``.
+
+        That is the token's latest snapshot at or before ``decision_ns``,
+        which is the candidate's own book unless a decision window delayed
+        the entry past a newer one.
+        """
+        key = (fold["token_id"][i], fold["timestamp"][i])
+        if decision_ns == fold["entry_ns"][i]:
+            return self._ask_ladder(key)
+        if self._book_times is None:
+            by_token: Dict[str, list] = {}
+            for token, ts in self.book_lookup.keys():
+                by_token.setdefault(token, []).append(ts)
+            self._book_times = {}
+            for token, stamps in by_token.items():
+                stamps.sort()
+                self._book_times[token] = (pd.DatetimeIndex(stamps).asi8, stamps)
+        times, stamps = self._book_times[key[0]]
+        latest = int(np.searchsorted(times, decision_ns, side="right")) - 1
+        return self._ask_ladder((key[0], stamps[latest]))
+
+    @staticmethod
+    def _resolved_by(fold: Dict[str, list], i: int, decision_ns: int) -> bool:
+        """Whether a decision window delayed candidate ``i`` until its market had resolved."""
+        return decision_ns != fold["entry_ns"][i] and fold["resolve_ns"][i] <= decision_ns
+
+    @staticmethod
+    def _decision_tau(fold: Dict[str, list], i: int, decision_ns: int) -> float:
+        """Days to the event as of ``decision_ns`` rather than the candidate's arrival."""
+        return fold["time_to_event_days"][i] - (decision_ns - fold["entry_ns"][i]) / _DAY_NS
+
+    def _settle_through(
+        self,
+        row_times: np.ndarray,
+        open_positions: List[Tuple[int, int, _OpenPosition]],
+        capital: float,
+        executed_trades: TradeLog,
+        capital_history: CapitalHistory,
+    ) -> float:
+        """Replay settlement at each of ``row_times`` (sorted ns timestamps).
+
+        Equivalent to calling :meth:`_settle_positions` once per row, but only
+        visits the row times at which some position actually becomes due.
+        """
+        if len(row_times) == 0:
+            return capital
+        while open_positions and open_positions[0][0] <= row_times[-1]:
+            at = row_times[np.searchsorted(row_times, open_positions[0][0], side="left")]
+            open_positions, capital = self._settle_positions(
+                pd.Timestamp(int(at), tz="UTC"), open_positions, capital, executed_trades, capital_history
+            )
+        return capital
+
+    def _save_checkpoint(
+        self,
+        cursor: int,
+        capital: float,
+        open_positions: List[Tuple[int, int, _OpenPosition]],
+        executed_trades: TradeLog,
+        capital_history: CapitalHistory,
+    ) -> None:
+        EngineCheckpoint(
+            cursor=int(cursor),
+            capital=capital,
+            open_positions=open_positions,
+            executed_trades=executed_trades,
+            capital_history=capital_history,
+            exposures=self.risk_manager.exposures(),
+            metrics=self._metrics,
+            # Flushed before the checkpoint file replaces the previous one.
+            results_rows=self.results_writer.checkpoint() if self.results_writer is not None else None,
+        ).save(self.config.checkpoint_path)
+
+    def _decision_batches(self, entry_times: np.ndarray) -> List[Tuple[int, int]]:
+        """``[start, stop)`` ranges of candidates decided together.
+
+        Sequential allocation decides every candidate on its own.  Ranked
+        allocation groups candidates sharing a timestamp or, with a positive
+        ``decision_window_minutes``, falling within that window of the
+        first candidate in the group.
+        """
+        n = len(entry_times)
+        if self.config.allocation == "sequential":
+            return [(i, i + 1) for i in range(n)]
+        if self.config.allocation != "ranked":
+            raise ValueError(f"Unknown allocation mode: {self.config.allocation}")
+        window = int(pd.Timedelta(minutes=self.config.decision_window_minutes).value)
+        batches = []
+        start = 0
+        while start < n:
+            stop = int(np.searchsorted(entry_times, entry_times[start] + window, side="right"))
+            batches.append((start, stop))
+            start = stop
+        return batches
+
+    def _rank_batch(
+        self, fold: Dict[str, list], indices: np.ndarray, capital: float, decision_ns: int
+    ) -> np.ndarray:
+        """Order ``indices`` by tau-annualised EV lower bound, best first.
+
+        Every candidate is sized and costed as of ``decision_ns`` in one
+        vectorised pass against the exposures and capital at the start of
+        the batch; candidates that cannot be filled at all, or whose market
+        has resolved or whose book has no asks by then, are dropped.
+        """
+        open_markets = [i for i in indices if not self._resolved_by(fold, i, decision_ns)]
+        ladders = [self._decision_ladder(fold, i, decision_ns) for i in open_markets]
+        indices = np.array(
+            [i for i, ladder in zip(open_markets, ladders) if ladder is not None], dtype=indices.dtype
+        )
+        ladders = [ladder for ladder in ladders if ladder is not None]
+        if len(indices) == 0:
+            return indices
+        q_hat = np.array([fold["q_hat"][i] for i in indices], dtype=float)
+        q_lower = np.array([fold["q_lower"][i] for i in indices], dtype=float)
+        price = np.array([fold["price"][i] for i in indices], dtype=float)
+        tau_days = np.array([self._decision_tau(fold, i, decision_ns) for i in indices], dtype=float)
+        available = self.risk_manager.available_notionals(
+            capital,
+            np.array([fold["category_id"][i] for i in indices]),
+            np.array([fold["neg_risk_id"][i] for i in indices]),
+            np.array([fold["market_id"][i] for i in indices]),
+        )
+        targets = np.minimum(capital * self.risk_manager.kelly_fractions(q_hat, price), available)
+        sizes = self.cost_model.max_sizes_for_notional(ladders, targets)
+        costs = self.cost_model.estimate_costs(ladders, sizes, tau_days)
+
+        filled = costs["filled_size"]
+        total_cost = (
+            costs["slippage_cost"] + costs["taker_fee_cost"] + costs["gas_cost"] + costs["borrow_cost"]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ev_lower = q_lower - costs["execution_price"] - total_cost / filled
+        score = ev_lower / np.maximum(tau_days, _MIN_TAU_DAYS)
+        keep = (filled > 0) & np.isfinite(score)
+        order = np.argsort(-score[keep], kind="stable")
+        return indices[keep][order]
+
+    def _enter(
+        self,
+        fold: Dict[str, list],
+        i: int,
+        capital: float,
+        decision_ns: int,
+        open_positions: List[Tuple[int, int, _OpenPosition]],
+        entry_seq: Iterator[int],
+        capital_history: CapitalHistory,
+    ) -> float:
+        """Size, cost and open candidate ``i`` at ``decision_ns`` if it passes every check.
+
+        The position is stamped, costed and debited at ``decision_ns``, the
+        end of its decision window, which is when its capital moves.  A
+        window that delays the entry to or past the market's resolution
+        drops the candidate; undelayed entries are not checked, as before
+        decision windows.
+        """
+        if self._resolved_by(fold, i, decision_ns):
+            return capital
+        ladder = self._decision_ladder(fold, i, decision_ns)
+        if ladder is None:
+            return capital
+        price = fold["price"][i]
+        q_hat = fold["q_hat"][i]
+        q_lower = fold["q_lower"][i]
+        category_id = fold["category_id"][i]
+        neg_risk_id = fold["neg_risk_id"][i]
+        market_id = fold["market_id"][i]
+
+        fraction = self.risk_manager.kelly_fraction(q_hat, price)
+        if fraction <= 0:
+            return capital
+
+        available_notional = self.risk_manager.available_notional_coded(
+            capital, category_id, neg_risk_id, market_id
+        )
+        if available_notional <= 0:
+            return capital
+
+        target_notional = min(capital * fraction, available_notional)
+        if target_notional <= 0:
+            return capital
+
+        # Largest fill whose VWAP notional fits the target, in one pass.
+        size = ladder.size_for_notional(target_notional)
+        if size <= 0:
+            return capital
+        breakdown = self.cost_model.estimate_cost(ladder, size, self._decision_tau(fold, i, decision_ns))
+
+        if breakdown.notional + breakdown.total_cost > capital:
+            return capital
+
+        ev_lower = q_lower - breakdown.execution_price - breakdown.per_share_cost
+        if ev_lower <= self.config.min_ev:
+            return capital
+
+        capital -= breakdown.notional
+        capital -= breakdown.total_cost
+        self._record_capital(capital_history, decision_ns, capital)
+
+        position = _OpenPosition(
+            trade_id=fold["trade_id"][i],
+            token_id=fold["token_id"][i],
+            condition_id=fold["condition_id"][i],
+            timestamp=decision_ns,
+            resolve_ts=fold["resolve_ns"][i],
+            category=fold["category"][i],
+            neg_risk_group=fold["neg_risk_group"][i],
+            category_id=category_id,
+            neg_risk_id=neg_risk_id,
+            market_id=market_id,
+            price=price,
+            execution_price=breakdown.execution_price,
+            shares=breakdown.filled_size,
+            notional=breakdown.notional,
+            total_cost=breakdown.total_cost,
+            q_hat=q_hat,
+            q_lower=q_lower,
+            ev_lower=ev_lower,
+            outcome=fold["outcome"][i],
+        )
+        heapq.heappush(open_positions, (fold["resolve_ns"][i], next(entry_seq), position))
+        self.risk_manager.register_coded(category_id, neg_risk_id, market_id, breakdown.notional)
+        return capital
+
+    def extend(self, data: pd.DataFrame, splits: Iterable[SplitLike]) -> Dict[str, object]:
+        """Continue from the last checkpoint, processing only newer test rows.
+
+        ``data`` must still contain the history needed to fit calibrators;
+        splits (or parts of them) at or before the checkpoint are skipped.
+        """
+        if self.config.checkpoint_path is None or not Path(self.config.checkpoint_path).exists():
+            raise ValueError("extend requires an existing checkpoint_path")
+        return self.run(data, splits, resume=True)
+
+    def predict_folds(
+        self, data: pd.DataFrame, splits: Iterable[SplitLike], cursor: Optional[int] = None
+    ) -> List[Optional[pd.DataFrame]]:
+        """Calibrated test rows of every split (``None`` for folds that cannot be fitted).
+
+        Predictions depend only on the data, the splits and the calibrator,
+        so runs that differ in risk, cost or entry settings can share them
+        through the ``folds`` argument of :meth:`run`.
+        """
+        data = data.sort_values("timestamp").reset_index(drop=True)
+        self._online_calibrator = None
+        self._online_train_end = None
+        return self._predict_folds(data, [as_split(split) for split in splits], cursor)
 
     def run(
         self,
-        data: pd.DataFrame,
-        splits: Iterable[Tuple[pd.Timestamp, pd.Timestamp]],
+        data: Optional[pd.DataFrame],
+        splits: Iterable[SplitLike],
+        resume: bool = False,
+        folds: Optional[List[Optional[pd.DataFrame]]] = None,
     ) -> Dict[str, object]:
+        """Walk the splits and return capital history, trades, ending capital and metrics.
+
+        With ``resume`` and an existing ``config.checkpoint_path`` the run
+        restarts from the saved state instead of from scratch.  The state is
+        always saved before the final settlement of still-open positions, so
+        a later run over extended data carries those positions forward.
+        ``folds`` from :meth:`predict_folds` skip fitting; ``data`` and
+        ``splits`` are then not used.
+        """
         capital = self.config.initial_capital
-        open_positions: List[Dict] = []
-        executed_trades: List[TradeResult] = []
-        capital_history: List[Tuple[pd.Timestamp, float]] = []
-
-        data = data.sort_values("timestamp").reset_index(drop=True)
-
-        for train_end, test_end in splits:
-            train_mask = data["timestamp"] <= train_end
-            test_mask = (data["timestamp"] > train_end) & (data["timestamp"] <= test_end)
-            train_df = data.loc[train_mask]
-            test_df = data.loc[test_mask]
-            if test_df.empty:
+        open_positions: List[Tuple[int, int, _OpenPosition]] = []
+        executed_trades = TradeLog()
+        capital_history = CapitalHistory()
+        self._metrics = MetricAccumulator()
+        cursor: Optional[int] = None
+
+        checkpoint_path = self.config.checkpoint_path
+        if resume and checkpoint_path is not None and Path(checkpoint_path).exists():
+            checkpoint = EngineCheckpoint.load(checkpoint_path)
+            cursor = checkpoint.cursor
+            capital = checkpoint.capital
+            open_positions = checkpoint.open_positions
+            executed_trades = checkpoint.executed_trades
+            capital_history = checkpoint.capital_history
+            self._metrics = checkpoint.metrics
+            self.risk_manager.restore_exposures(checkpoint.exposures)
+            if self.results_writer is not None:
+                if checkpoint.results_rows is None:
+                    raise ValueError("Checkpoint was saved without a results writer; cannot continue its files")
+                self.results_writer.restore(checkpoint.results_rows)
+        self._next_progress = self._metrics.trades + self.config.progress_every
+        # Every entry is either settled or still open, which gives the next
+        # entry sequence number.
+        entry_seq = count(self._metrics.trades + len(open_positions))
+
+        every = self.config.checkpoint_every if checkpoint_path is not None else None
+        profiler = self.config.profiler or StageProfiler()
+        if folds is None:
+            with profiler.stage("engine.fit_predict", rows=len(data)):
+                folds = self.predict_folds(data, splits, cursor)
+        elif cursor is not None:
+            folds = [
+                None if fold is None else fold.loc[pd.DatetimeIndex(fold["timestamp"]).asi8 > cursor]
+                for fold in folds
+            ]
+            folds = [None if fold is None or fold.empty else fold for fold in folds]
+        for test_with_pred in folds:
+            if test_with_pred is None:
                 continue
 
-            calibrator: IsotonicCalibrator = self.calibrator_factory()
-            calibrator.fit(train_df[["price", "outcome", "tau_bucket"]])
-            predictions = calibrator.transform(test_df[["price", "tau_bucket"]])
-            test_with_pred = test_df.copy()
-            test_with_pred["q_hat"] = predictions["q_hat"].to_numpy()
-            test_with_pred["q_lower"] = predictions["q_lower"].to_numpy()
-
-            for _, row in test_with_pred.iterrows():
-                open_positions, capital = self._settle_positions(
-                    row["timestamp"], open_positions, capital, executed_trades, capital_history
-                )
-
-                if capital <= 0:
-                    continue
-
-                book_key = (row["token_id"], row["timestamp"])
-                book_snapshot = self.book_lookup.get(book_key)
-                if book_snapshot is None:
-                    continue
-
-                q_hat = float(row["q_hat"])
-                q_lower = float(row["q_lower"])
-                if pd.isna(q_lower) or pd.isna(q_hat):
-                    continue
-
-                fraction = self.risk_manager.kelly_fraction(q_hat, row["price"])
-                if fraction <= 0:
-                    continue
-
-                available_notional = self.risk_manager.available_notional(
-                    capital,
-                    row.get("category"),
-                    row.get("neg_risk_group"),
-                    row["condition_id"],
-                )
-                if available_notional <= 0:
-                    continue
-
-                target_notional = min(capital * fraction, available_notional)
-                if target_notional <= 0:
-                    continue
-
-                available_liquidity = float(book_snapshot.loc[book_snapshot["side"] == "ask", "size"].sum())
-                if available_liquidity <= 0:
-                    continue
-
-                tentative_size = min(available_liquidity, target_notional / row["price"])
-                breakdown = self.cost_model.estimate_cost(
-                    book_snapshot, tentative_size, row["time_to_event_days"]
-                )
-                if breakdown.notional > target_notional and breakdown.filled_size > 0:
-                    adjusted_size = target_notional / breakdown.execution_price
-                    breakdown = self.cost_model.estimate_cost(
-                        book_snapshot, adjusted_size, row["time_to_event_days"]
+            with profiler.stage("engine.prescreen", rows=len(test_with_pred)):
+                # Settlement still happens at every test row's timestamp; rows that
+                # fail the state-free screen only contribute those settlement times.
+                row_times = pd.DatetimeIndex(test_with_pred["timestamp"]).asi8
+                survivors = np.flatnonzero(self._prescreen(test_with_pred))
+                candidates = test_with_pred.iloc[survivors]
+                fold = {
+                    name: _column_values(candidates, name)
+                    for name in (
+                        "trade_id",
+                        "token_id",
+                        "condition_id",
+                        "category",
+                        "neg_risk_group",
+                        "price",
+                        "q_hat",
+                        "q_lower",
+                        "time_to_event_days",
+                        "outcome",
                     )
-
-                if breakdown.filled_size == 0:
-                    continue
-
-                if breakdown.notional + breakdown.total_cost > capital:
-                    continue
-
-                ev_lower = q_lower - breakdown.execution_price - breakdown.per_share_cost
-                if ev_lower <= self.config.min_ev:
-                    continue
-
-                capital -= breakdown.notional
-                capital -= breakdown.total_cost
-                capital_history.append((row["timestamp"], capital))
-
-                position = {
-                    "trade_id": row["trade_id"],
-                    "condition_id": row["condition_id"],
-                    "timestamp": row["timestamp"],
-                    "resolve_ts": row["resolve_ts"],
-                    "category": row.get("category"),
-                    "neg_risk_group": row.get("neg_risk_group"),
-                    "price": row["price"],
-                    "shares": breakdown.filled_size,
-                    "notional": breakdown.notional,
-                    "breakdown": breakdown,
-                    "q_hat": q_hat,
-                    "q_lower": q_lower,
-                    "ev_lower": ev_lower,
-                    "outcome": row["outcome"],
                 }
-                open_positions.append(position)
-                self.risk_manager.register_position(
-                    row.get("category"), row.get("neg_risk_group"), row["condition_id"], breakdown.notional
+                fold["category_id"] = self.risk_manager.encode("category", fold["category"]).tolist()
+                fold["neg_risk_id"] = self.risk_manager.encode(
+                    "neg_risk", fold["neg_risk_group"]
+                ).tolist()
+                fold["market_id"] = self.risk_manager.encode("market", fold["condition_id"]).tolist()
+                fold["timestamp"] = list(candidates["timestamp"])
+                fold["entry_ns"] = row_times[survivors].tolist()
+                fold["resolve_ns"] = pd.DatetimeIndex(candidates["resolve_ts"]).asi8.tolist()
+
+            with profiler.stage("engine.loop", rows=len(row_times), sample=True):
+                settled_upto = 0
+                checkpointed_upto = 0
+                for start, stop in self._decision_batches(row_times[survivors]):
+                    first_index = survivors[start]
+                    last_index = survivors[stop - 1]
+                    # Rows before ``settled_upto`` are done; only cut there when
+                    # no unprocessed entry shares the last processed timestamp.
+                    if (
+                        every
+                        and settled_upto - checkpointed_upto >= every
+                        and row_times[first_index] > row_times[settled_upto - 1]
+                    ):
+                        self._save_checkpoint(
+                            row_times[settled_upto - 1],
+                            capital,
+                            open_positions,
+                            executed_trades,
+                            capital_history,
+                        )
+                        checkpointed_upto = settled_upto
+
+                    capital = self._settle_through(
+                        row_times[settled_upto : last_index + 1],
+                        open_positions,
+                        capital,
+                        executed_trades,
+                        capital_history,
+                    )
+                    settled_upto = last_index + 1
+
+                    if capital <= 0:
+                        continue
+
+                    decision_ns = int(row_times[last_index])
+                    if stop - start == 1:
+                        order = [start]
+                    else:
+                        order = self._rank_batch(fold, np.arange(start, stop), capital, decision_ns).tolist()
+                    for i in order:
+                        if capital <= 0:
+                            break
+                        capital = self._enter(
+                            fold, i, capital, decision_ns, open_positions, entry_seq, capital_history
+                        )
+
+                capital = self._settle_through(
+                    row_times[settled_upto:], open_positions, capital, executed_trades, capital_history
                 )
+                if checkpoint_path is not None:
+                    self._save_checkpoint(
+                        row_times[-1], capital, open_positions, executed_trades, capital_history
+                    )
 
-        open_positions, capital = self._settle_positions(
-            pd.Timestamp.max.tz_localize("UTC"), open_positions, capital, executed_trades, capital_history
-        )
+        end_of_time = pd.Timestamp.max.tz_localize("UTC")
+        with profiler.stage("engine.settle_final", rows=len(open_positions)):
+            open_positions, capital = self._settle_positions(
+                end_of_time, open_positions, capital, executed_trades, capital_history
+            )
 
-        capital_history.append((pd.Timestamp.max.tz_localize("UTC"), capital))
+        self._record_capital(capital_history, end_of_time.value, capital)
 
         return {
             "capital_history": capital_history,
             "executed_trades": executed_trades,
             "ending_capital": capital,
+            "metrics": self._metrics,
         }
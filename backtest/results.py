@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+_INITIAL_CAPACITY = 1024
+
+
+@dataclass
+class TradeResult:
+    trade_id: str
+    condition_id: str
+    timestamp: pd.Timestamp
+    resolve_ts: pd.Timestamp
+    category: str
+    neg_risk_group: str
+    price: float
+    execution_price: float
+    shares: float
+    notional: float
+    q_hat: float
+    q_lower: float
+    ev_lower: float
+    total_cost: float
+    payout: float
+    pnl: float
+    token_id: Optional[str] = None
+
+
+class ColumnBuffer:
+    """Growable struct-of-arrays with a fixed schema.
+
+    Rows are appended into preallocated NumPy columns whose capacity doubles
+    when full, so appends are amortised O(1) and the stored data stays flat.
+    Timestamp columns are declared with dtype ``"datetime"`` and stored as
+    int64 UTC nanoseconds.
+    """
+
+    schema: Dict[str, str] = {}
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY) -> None:
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(capacity, dtype=self._storage_dtype(dtype))
+            for name, dtype in self.schema.items()
+        }
+
+    @staticmethod
+    def _storage_dtype(dtype: str) -> str:
+        return "int64" if dtype == "datetime" else dtype
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self) -> None:
+        for name, column in self._columns.items():
+            grown = np.empty(max(2 * len(column), _INITIAL_CAPACITY), dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+
+    def append(self, *values) -> None:
+        """Append one row; ``values`` follow the order of ``schema``."""
+        if self._size == len(next(iter(self._columns.values()))):
+            self._grow()
+        index = self._size
+        for column, value in zip(self._columns.values(), values):
+            column[index] = value
+        self._size += 1
+
+    def clear(self) -> None:
+        """Drop all rows but keep the allocated capacity."""
+        self._size = 0
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of the filled part of a column."""
+        view = self._columns[name][: self._size]
+        view.flags.writeable = False
+        return view
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {}
+        for name, dtype in self.schema.items():
+            values = self._columns[name][: self._size]
+            if dtype == "datetime":
+                data[name] = pd.to_datetime(values, unit="ns", utc=True)
+            else:
+                data[name] = values.copy()
+        return pd.DataFrame(data)
+
+
+class TradeLog(ColumnBuffer):
+    """Columnar store of settled trades.
+
+    Iterating yields :class:`TradeResult` objects so code written against the
+    list-of-dataclasses interface keeps working.
+    """
+
+    schema = {
+        "trade_id": "object",
+        "condition_id": "object",
+        "timestamp": "datetime",
+        "resolve_ts": "datetime",
+        "category": "object",
+        "neg_risk_group": "object",
+        "price": "float64",
+        "execution_price": "float64",
+        "shares": "float64",
+        "notional": "float64",
+        "q_hat": "float64",
+        "q_lower": "float64",
+        "ev_lower": "float64",
+        "total_cost": "float64",
+        "payout": "float64",
+        "pnl": "float64",
+        "token_id": "object",
+    }
+
+    def __iter__(self) -> Iterator[TradeResult]:
+        columns = [self._columns[name][: self._size].tolist() for name in self.schema]
+        datetime_fields = {i for i, dtype in enumerate(self.schema.values()) if dtype == "datetime"}
+        for row in zip(*columns):
+            values = [
+                pd.Timestamp(value, tz="UTC") if i in datetime_fields else value
+                for i, value in enumerate(row)
+            ]
+            yield TradeResult(*values)
+
+
+class CapitalHistory(ColumnBuffer):
+    """Columnar ``(timestamp, capital)`` log; iterates as tuples."""
+
+    schema = {"timestamp": "datetime", "capital": "float64"}
+
+    def __iter__(self) -> Iterator[Tuple[pd.Timestamp, float]]:
+        timestamps = self._columns["timestamp"][: self._size].tolist()
+        capital = self._columns["capital"][: self._size].tolist()
+        for ts, value in zip(timestamps, capital):
+            yield pd.Timestamp(ts, tz="UTC"), value
+
+    def __getitem__(self, index: int) -> Tuple[pd.Timestamp, float]:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("capital history index out of range")
+        return (
+            pd.Timestamp(int(self._columns["timestamp"][index]), tz="UTC"),
+            float(self._columns["capital"][index]),
+        )
+
+
+def as_trade_frame(trades: Union[pd.DataFrame, TradeLog, Iterable[TradeResult]]) -> pd.DataFrame:
+    """Executed trades as a DataFrame, converting at most once."""
+    if isinstance(trades, pd.DataFrame):
+        return trades
+    if isinstance(trades, ColumnBuffer):
+        return trades.to_frame()
+    return pd.DataFrame([asdict(t) for t in trades], columns=list(TradeLog.schema))
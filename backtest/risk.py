@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_DIMENSIONS = ("category", "neg_risk", "market")
 
 
 @dataclass
@@ -15,11 +19,72 @@ class RiskConfig:
 
 
 class RiskManager:
+    """Kelly sizing plus exposure caps per category, neg-risk group and market.
+
+    Labels are encoded to integer ids (see :meth:`encode`) and exposures are
+    kept in one NumPy array per dimension, so caps can be checked for whole
+    candidate arrays with :meth:`available_notionals`.  Empty or missing
+    categories and neg-risk groups get id ``-1`` and are not capped.  The
+    string-keyed methods remain for one-off calls.
+    """
+
     def __init__(self, config: Optional[RiskConfig] = None) -> None:
         self.config = config or RiskConfig()
-        self._category_exposure: Dict[str, float] = defaultdict(float)
-        self._neg_risk_exposure: Dict[str, float] = defaultdict(float)
-        self._market_exposure: Dict[str, float] = defaultdict(float)
+        self._ids: Dict[str, Dict[object, int]] = {dimension: {} for dimension in _DIMENSIONS}
+        self._exposure: Dict[str, np.ndarray] = {dimension: np.zeros(0) for dimension in _DIMENSIONS}
+
+    def _cap(self, dimension: str) -> float:
+        if dimension == "category":
+            return self.config.category_cap
+        if dimension == "neg_risk":
+            return self.config.neg_risk_cap
+        return self.config.market_cap
+
+    def _assign(self, dimension: str, label) -> int:
+        ids = self._ids[dimension]
+        code = ids.get(label)
+        if code is None:
+            code = ids[label] = len(ids)
+            exposure = self._exposure[dimension]
+            if code >= len(exposure):
+                grown = np.zeros(max(2 * len(exposure), 16))
+                grown[: len(exposure)] = exposure
+                self._exposure[dimension] = grown
+        return code
+
+    def _code(self, dimension: str, label) -> int:
+        missing = label is None or label == "" or (isinstance(label, float) and np.isnan(label))
+        if dimension != "market" and missing:
+            return -1
+        return self._assign(dimension, label)
+
+    def encode(self, dimension: str, labels: Iterable) -> np.ndarray:
+        """Integer ids for ``labels`` in ``dimension``, assigning new ids as needed."""
+        if dimension not in self._ids:
+            raise ValueError(f"Unknown exposure dimension: {dimension}")
+        codes, uniques = pd.factorize(pd.Series(list(labels), dtype=object))
+        missing = self._code(dimension, None) if (codes < 0).any() else -1
+        mapping = np.array([self._code(dimension, label) for label in uniques] + [missing], dtype=np.int64)
+        # factorize marks missing values with -1, which indexes the trailing entry.
+        return mapping[codes]
+
+    def exposures(self) -> Dict[str, Dict[object, float]]:
+        """Snapshot of current exposures, keyed by label in id order."""
+        return {
+            dimension: dict(zip(ids, self._exposure[dimension][: len(ids)].tolist()))
+            for dimension, ids in self._ids.items()
+        }
+
+    def restore_exposures(self, exposures: Dict[str, Dict[object, float]]) -> None:
+        """Replace current state with a snapshot from :meth:`exposures`.
+
+        Ids are reassigned in snapshot order, so they match the ids that
+        were in use when the snapshot was taken.
+        """
+        for dimension in _DIMENSIONS:
+            labels = exposures[dimension]
+            self._ids[dimension] = {label: code for code, label in enumerate(labels)}
+            self._exposure[dimension] = np.array(list(labels.values()), dtype=float)
 
     def kelly_fraction(self, q_hat: float, price: float) -> float:
         edge = q_hat - price
@@ -28,6 +93,68 @@ class RiskManager:
         raw = edge / (1.0 - price)
         return max(0.0, min(self.config.max_fraction, self.config.kelly_lambda * raw))
 
+    def kelly_fractions(self, q_hat: np.ndarray, price: np.ndarray) -> np.ndarray:
+        """Vectorised :meth:`kelly_fraction` over aligned arrays."""
+        q_hat = np.asarray(q_hat, dtype=float)
+        price = np.asarray(price, dtype=float)
+        edge = q_hat - price
+        valid = (edge > 0) & (price < 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw = edge / (1.0 - price)
+        fractions = np.maximum(0.0, np.minimum(self.config.max_fraction, self.config.kelly_lambda * raw))
+        return np.where(valid, fractions, 0.0)
+
+    def available_notional_coded(
+        self, capital: float, category_id: int, neg_risk_id: int, market_id: int
+    ) -> float:
+        """:meth:`available_notional` for ids from :meth:`encode`."""
+        available = capital
+        for dimension, code in zip(_DIMENSIONS, (category_id, neg_risk_id, market_id)):
+            if code < 0:
+                continue
+            room = max(0.0, self._cap(dimension) * capital - self._exposure[dimension][code])
+            if room < available:
+                available = room
+        return max(0.0, float(available))
+
+    def available_notionals(
+        self,
+        capital: float,
+        category_ids: np.ndarray,
+        neg_risk_ids: np.ndarray,
+        market_ids: np.ndarray,
+    ) -> np.ndarray:
+        """Vectorised :meth:`available_notional_coded` over candidate id arrays."""
+        available = np.full(len(market_ids), float(capital))
+        for dimension, codes in zip(_DIMENSIONS, (category_ids, neg_risk_ids, market_ids)):
+            codes = np.asarray(codes, dtype=np.int64)
+            exposure = self._exposure[dimension]
+            if len(exposure) == 0:
+                exposure = np.zeros(1)
+            room = np.maximum(0.0, self._cap(dimension) * capital - exposure[np.maximum(codes, 0)])
+            available = np.minimum(available, np.where(codes >= 0, room, np.inf))
+        return np.maximum(0.0, available)
+
+    def register_coded(self, category_id: int, neg_risk_id: int, market_id: int, notional: float) -> None:
+        for dimension, code in zip(_DIMENSIONS, (category_id, neg_risk_id, market_id)):
+            if code >= 0:
+                self._exposure[dimension][code] += notional
+
+    def release_coded(self, category_id: int, neg_risk_id: int, market_id: int, notional: float) -> None:
+        for dimension, code in zip(_DIMENSIONS, (category_id, neg_risk_id, market_id)):
+            if code >= 0:
+                exposure = self._exposure[dimension]
+                exposure[code] = max(0.0, exposure[code] - notional)
+
+    def _codes(
+        self, category: Optional[str], neg_risk_group: Optional[str], market: str
+    ) -> Tuple[int, int, int]:
+        return (
+            self._code("category", category),
+            self._code("neg_risk", neg_risk_group),
+            self._code("market", market),
+        )
+
     def available_notional(
         self,
         capital: float,
@@ -35,15 +162,7 @@ class RiskManager:
         neg_risk_group: Optional[str],
         market: str,
     ) -> float:
-        caps = [capital]
-        if category:
-            caps.append(max(0.0, self.config.category_cap * capital - self._category_exposure[category]))
-        if neg_risk_group:
-            caps.append(
-                max(0.0, self.config.neg_risk_cap * capital - self._neg_risk_exposure[neg_risk_group])
-            )
-        caps.append(max(0.0, self.config.market_cap * capital - self._market_exposure[market]))
-        return max(0.0, min(caps))
+        return self.available_notional_coded(capital, *self._codes(category, neg_risk_group, market))
 
     def register_position(
         self,
@@ -52,11 +171,7 @@ class RiskManager:
         market: str,
         notional: float,
     ) -> None:
-        if category:
-            self._category_exposure[category] += notional
-        if neg_risk_group:
-            self._neg_risk_exposure[neg_risk_group] += notional
-        self._market_exposure[market] += notional
+        self.register_coded(*self._codes(category, neg_risk_group, market), notional)
 
     def release_position(
         self,
@@ -65,10 +180,4 @@ class RiskManager:
         market: str,
         notional: float,
     ) -> None:
-        if category:
-            self._category_exposure[category] = max(0.0, self._category_exposure[category] - notional)
-        if neg_risk_group:
-            self._neg_risk_exposure[neg_risk_group] = max(
-                0.0, self._neg_risk_exposure[neg_risk_group] - notional
-            )
-        self._market_exposure[market] = max(0.0, self._market_exposure[market] - notional)
+        self.release_coded(*self._codes(category, neg_risk_group, market), notional)
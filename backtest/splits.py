@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Literal, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class WalkForwardSplit:
+    """One walk-forward fold.
+
+    Training uses rows with ``train_start <= timestamp <= train_end`` (no
+    lower bound when ``train_start`` is ``None``); testing uses rows with
+    ``test_start < timestamp <= test_end``.  With ``purge`` set, training rows
+    whose market resolves after ``test_start`` are dropped so no label is
+    used before it would have been known.
+    """
+
+    train_end: pd.Timestamp
+    test_end: pd.Timestamp
+    train_start: Optional[pd.Timestamp] = None
+    test_start: Optional[pd.Timestamp] = None
+    purge: bool = False
+
+    @property
+    def test_begin(self) -> pd.Timestamp:
+        return self.train_end if self.test_start is None else self.test_start
+
+    @property
+    def expanding(self) -> bool:
+        """Whether the training set only ever grows along the timeline."""
+        return self.train_start is None and not self.purge
+
+    def train_mask(self, data: pd.DataFrame) -> pd.Series:
+        mask = data["timestamp"] <= self.train_end
+        if self.train_start is not None:
+            mask &= data["timestamp"] >= self.train_start
+        if self.purge:
+            mask &= data["resolve_ts"] <= self.test_begin
+        return mask
+
+    def test_mask(self, data: pd.DataFrame) -> pd.Series:
+        return (data["timestamp"] > self.test_begin) & (data["timestamp"] <= self.test_end)
+
+
+SplitLike = Union[WalkForwardSplit, Tuple[pd.Timestamp, pd.Timestamp]]
+
+
+def as_split(split: SplitLike) -> WalkForwardSplit:
+    """Accept legacy ``(train_end, test_end)`` tuples as expanding splits."""
+    if isinstance(split, WalkForwardSplit):
+        return split
+    train_end, test_end = split
+    return WalkForwardSplit(train_end=train_end, test_end=test_end)
+
+
+@dataclass
+class WalkForwardConfig:
+    """Walk-forward schedule with window sizes in days.
+
+    ``scheme="expanding"`` trains on everything up to each fold's cut-off,
+    ``"rolling"`` on the trailing ``train_days`` only.  ``step_days``
+    defaults to ``test_days``; ``embargo_days`` leaves a gap between training
+    and test windows and ``purge`` drops training rows resolving inside it.
+    """
+
+    scheme: Literal["expanding", "rolling"] = "expanding"
+    train_days: float = 90.0
+    test_days: float = 30.0
+    step_days: Optional[float] = None
+    embargo_days: float = 0.0
+    purge: bool = False
+
+
+def walk_forward_splits(
+    timestamps: Union[pd.Series, pd.DatetimeIndex, np.ndarray], config: WalkForwardConfig
+) -> List[WalkForwardSplit]:
+    """Folds covering ``timestamps`` from the first full training window on."""
+    if config.scheme not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown walk-forward scheme: {config.scheme}")
+    if config.train_days <= 0 or config.test_days <= 0:
+        raise ValueError("train_days and test_days must be positive")
+    step_days = config.test_days if config.step_days is None else config.step_days
+    if step_days < config.test_days:
+        raise ValueError("step_days shorter than test_days would test rows twice")
+    if config.embargo_days < 0:
+        raise ValueError("embargo_days must be non-negative")
+
+    index = pd.DatetimeIndex(timestamps)
+    if len(index) == 0:
+        return []
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    start, end = index.min(), index.max()
+
+    train = pd.Timedelta(days=config.train_days)
+    test = pd.Timedelta(days=config.test_days)
+    step = pd.Timedelta(days=step_days)
+    embargo = pd.Timedelta(days=config.embargo_days)
+
+    splits: List[WalkForwardSplit] = []
+    train_end = start + train
+    while train_end + embargo < end:
+        test_start = train_end + embargo
+        splits.append(
+            WalkForwardSplit(
+                train_end=train_end,
+                test_end=min(test_start + test, end),
+                train_start=train_end - train if config.scheme == "rolling" else None,
+                test_start=test_start if config.embargo_days else None,
+                purge=config.purge,
+            )
+        )
+        train_end += step
+    return splits
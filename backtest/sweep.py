@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import csv
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.cost_model import AskLadder, CostModel
+from backtest.engine import BacktestConfig, BacktestEngine
+from backtest.risk import RiskConfig, RiskManager
+from backtest.splits import SplitLike
+from backtest.writers import ResultsFormat, results_writer
+
+_COST_PARAMETERS = ("taker_fee", "gas_cost", "borrow_rate")
+_RISK_PARAMETERS = tuple(f.name for f in fields(RiskConfig))
+_ENGINE_PARAMETERS = ("initial_capital", "min_ev")
+SWEEP_PARAMETERS = _RISK_PARAMETERS + _ENGINE_PARAMETERS + _COST_PARAMETERS
+
+
+@dataclass
+class SweepConfig:
+    """Settings for a parameter sweep over the backtest engine."""
+
+    n_workers: Optional[int] = None
+    output_path: Optional[Path] = None
+    # When set, every configuration streams its trades and capital history
+    # to ``results_dir / "run_id=point-NNNNN"`` instead of keeping them.
+    results_dir: Optional[Path] = None
+    results_format: ResultsFormat = "csv"
+
+
+def parameter_grid(axes: Mapping[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """Cartesian product of ``axes`` as a list of parameter dictionaries.
+
+    Keys must be fields of :class:`RiskConfig`, :class:`BacktestConfig` or
+    :class:`CostModel` arguments; anything not listed keeps its default.
+    """
+    unknown = set(axes) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+@dataclass
+class _ArraySpec:
+    """Location of one array inside a shared memory block."""
+
+    offset: int
+    dtype: str
+    length: int
+
+
+@dataclass
+class _SharedInputs:
+    """Picklable description of the shared predicted test rows and ask ladders.
+
+    Numeric columns are stored as-is, datetime columns as int64 UTC
+    nanoseconds and string columns as categorical codes into ``labels``;
+    only this small header is pickled to the workers.  ``folds`` holds each
+    fold's ``(start, stop)`` row range, ``None`` for folds without rows.
+    """
+
+    name: str
+    columns: Dict[str, Tuple[str, _ArraySpec]]
+    labels: Dict[str, list]
+    folds: List[Optional[Tuple[int, int]]]
+    ladder_tokens: list
+    ladder_arrays: Dict[str, _ArraySpec]
+
+
+def _encode_column(series: pd.Series) -> Tuple[str, np.ndarray, Optional[list]]:
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return "datetime", pd.DatetimeIndex(series).tz_convert("UTC").asi8, None
+    if series.dtype.kind in "biuf":
+        return "numeric", series.to_numpy(), None
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        series = pd.Series(pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(uniques)))
+    # Codes keep the width pandas picks for the category count, so workers
+    # can wrap them without a conversion; missing values are code -1.
+    return "category", series.cat.codes.to_numpy(), list(series.cat.categories)
+
+
+def _encode_ladders(
+    book_lookup: Mapping[Tuple[str, pd.Timestamp], pd.DataFrame]
+) -> Tuple[list, Dict[str, np.ndarray]]:
+    tokens: list = []
+    timestamps: List[int] = []
+    best_ask: List[float] = []
+    lengths: List[int] = []
+    prices: List[np.ndarray] = []
+    cum_size: List[np.ndarray] = []
+    cum_notional: List[np.ndarray] = []
+    for (token, ts), snapshot in book_lookup.items():
+        try:
+            ladder = CostModel.ladder(snapshot)
+        except ValueError:
+            continue
+        tokens.append(token)
+        timestamps.append(pd.Timestamp(ts).value)
+        best_ask.append(ladder.best_ask)
+        lengths.append(len(ladder.prices))
+        prices.append(ladder.prices)
+        cum_size.append(ladder.cum_size)
+        cum_notional.append(ladder.cum_notional)
+
+    def _flat(parts: List[np.ndarray]) -> np.ndarray:
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    arrays = {
+        "timestamp": np.asarray(timestamps, dtype=np.int64),
+        "best_ask": np.asarray(best_ask, dtype=float),
+        "offset": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        "prices": _flat(prices),
+        "cum_size": _flat(cum_size),
+        "cum_notional": _flat(cum_notional),
+    }
+    return tokens, arrays
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _share_inputs(
+    folds: List[Optional[pd.DataFrame]],
+    book_lookup: Mapping[Tuple[str, pd.Timestamp], pd.DataFrame],
+) -> Tuple[shared_memory.SharedMemory, _SharedInputs]:
+    """Copy the predicted folds, one after another, and the ask ladders into one shared memory block."""
+    present = [fold for fold in folds if fold is not None]
+    frame = pd.concat(present, ignore_index=True) if present else pd.DataFrame()
+    bounds: List[Optional[Tuple[int, int]]] = []
+    start = 0
+    for fold in folds:
+        bounds.append(None if fold is None else (start, start + len(fold)))
+        start += 0 if fold is None else len(fold)
+    encoded = {name: _encode_column(frame[name]) for name in frame.columns}
+    ladder_tokens, ladder_arrays = _encode_ladders(book_lookup)
+
+    arrays = [(("column", name), values) for name, (_, values, _) in encoded.items()]
+    arrays += [(("ladder", name), values) for name, values in ladder_arrays.items()]
+    specs: Dict[Tuple[str, str], _ArraySpec] = {}
+    offset = 0
+    for key, values in arrays:
+        offset = _aligned(offset)
+        specs[key] = _ArraySpec(offset, values.dtype.str, len(values))
+        offset += values.nbytes
+
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for key, values in arrays:
+        spec = specs[key]
+        view = np.ndarray(spec.length, dtype=spec.dtype, buffer=block.buf, offset=spec.offset)
+        view[:] = values
+
+    inputs = _SharedInputs(
+        name=block.name,
+        columns={name: (kind, specs[("column", name)]) for name, (kind, _, _) in encoded.items()},
+        labels={name: labels for name, (kind, _, labels) in encoded.items() if kind == "category"},
+        folds=bounds,
+        ladder_tokens=ladder_tokens,
+        ladder_arrays={name: specs[("ladder", name)] for name in ladder_arrays},
+    )
+    return block, inputs
+
+
+def _attach_inputs(
+    block: shared_memory.SharedMemory, inputs: _SharedInputs
+) -> Tuple[List[Optional[pd.DataFrame]], Dict[Tuple[str, pd.Timestamp], AskLadder]]:
+    """Rebuild the predicted folds and a ladder lookup over ``block``.
+
+    Every column and ladder is a read-only view into the shared block, so
+    workers add no per-row memory: string columns come back as categoricals
+    over the shared codes, which the engine reads like dictionary-encoded
+    features, and folds are row slices of one frame.
+    """
+
+    def _view(spec: _ArraySpec) -> np.ndarray:
+        view = np.ndarray(spec.length, dtype=spec.dtype, buffer=block.buf, offset=spec.offset)
+        view.flags.writeable = False
+        return view
+
+    data = {}
+    for name, (kind, spec) in inputs.columns.items():
+        values = _view(spec)
+        if kind == "datetime":
+            # Built from the int64 view with its dtype, the index wraps the buffer.
+            data[name] = pd.DatetimeIndex(values, dtype="datetime64[ns, UTC]", copy=False)
+        elif kind == "category":
+            dtype = pd.CategoricalDtype(inputs.labels[name])
+            data[name] = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        else:
+            data[name] = values
+    # ``copy=False`` keeps one block per column instead of consolidating.
+    frame = pd.DataFrame(data, copy=False)
+    folds = [None if bounds is None else frame.iloc[bounds[0] : bounds[1]] for bounds in inputs.folds]
+
+    ladders = {name: _view(spec) for name, spec in inputs.ladder_arrays.items()}
+    offsets = ladders["offset"]
+    lookup: Dict[Tuple[str, pd.Timestamp], AskLadder] = {}
+    for i, token in enumerate(inputs.ladder_tokens):
+        start, stop = offsets[i], offsets[i + 1]
+        key = (token, pd.Timestamp(int(ladders["timestamp"][i]), tz="UTC"))
+        lookup[key] = AskLadder(
+            best_ask=float(ladders["best_ask"][i]),
+            prices=ladders["prices"][start:stop],
+            cum_size=ladders["cum_size"][start:stop],
+            cum_notional=ladders["cum_notional"][start:stop],
+        )
+    return folds, lookup
+
+
+@dataclass
+class _WorkerState:
+    block: Optional[shared_memory.SharedMemory]
+    # Test rows of every split with ``q_hat``/``q_lower``, predicted once
+    # in the parent since no swept parameter affects calibration.
+    folds: List[Optional[pd.DataFrame]]
+    book_lookup: Mapping[Tuple[str, pd.Timestamp], object]
+    calibrator_factory: Callable[[], object]
+
+
+_WORKER_STATE: Optional[_WorkerState] = None
+
+
+def _init_worker(inputs: _SharedInputs, calibrator_factory: Callable[[], object]) -> None:
+    global _WORKER_STATE
+    # Keep the block referenced for the worker's lifetime; the views need it.
+    block = shared_memory.SharedMemory(name=inputs.name)
+    folds, lookup = _attach_inputs(block, inputs)
+    _WORKER_STATE = _WorkerState(block, folds, lookup, calibrator_factory)
+
+
+def _run_id(index: int) -> str:
+    return f"point-{index:05d}"
+
+
+def _run_point(
+    state: _WorkerState, params: Mapping[str, float], index: int, config: SweepConfig
+) -> Dict[str, object]:
+    risk_config = RiskConfig(**{k: v for k, v in params.items() if k in _RISK_PARAMETERS})
+    engine_config = BacktestConfig(
+        **{k: v for k, v in params.items() if k in _ENGINE_PARAMETERS}, keep_trades=False
+    )
+    cost_model = CostModel(**{k: v for k, v in params.items() if k in _COST_PARAMETERS})
+    writer = None
+    if config.results_dir is not None:
+        writer = results_writer(config.results_dir, _run_id(index), config.results_format)
+    engine = BacktestEngine(
+        state.calibrator_factory,
+        cost_model,
+        RiskManager(risk_config),
+        engine_config,
+        state.book_lookup,
+        writer,
+    )
+    try:
+        result = engine.run(None, (), folds=state.folds)
+    finally:
+        if writer is not None:
+            writer.close()
+    metrics = result["metrics"]
+    summary = {
+        **metrics.summary(engine_config.initial_capital),
+        **metrics.risk_adjusted(engine_config.initial_capital),
+    }
+    if writer is None:
+        return {**params, **summary}
+    return {"run_id": _run_id(index), **params, **summary}
+
+
+def _worker_run(params: Mapping[str, float], index: int, config: SweepConfig) -> Dict[str, object]:
+    if _WORKER_STATE is None:
+        raise RuntimeError("Sweep worker was not initialised")
+    return _run_point(_WORKER_STATE, params, index, config)
+
+
+def run_sweep(
+    features: pd.DataFrame,
+    book_lookup: Mapping[Tuple[str, pd.Timestamp], pd.DataFrame],
+    splits: Iterable[SplitLike],
+    grid: Sequence[Mapping[str, float]],
+    calibrator_factory: Callable[[], object],
+    config: Optional[SweepConfig] = None,
+) -> pd.DataFrame:
+    """Run the engine once per parameter set in ``grid`` and tabulate summaries.
+
+    No swept parameter affects calibration, so calibrators are fitted and
+    every fold predicted once, up front (over ``config.n_workers`` fold
+    workers); each configuration starts from the prescreen.  The predicted
+    test rows and ask ladders are copied once into shared memory and every
+    worker process attaches to that block in its initializer, so only the
+    parameter dictionaries travel per task.  ``calibrator_factory`` must be
+    picklable (a class or module-level function).  Rows are appended to
+    ``config.output_path`` as configurations finish; the returned frame
+    follows the order of ``grid``.  With ``config.results_dir`` each row
+    gains a ``run_id`` naming the partition that holds its trades (see
+    :func:`backtest.writers.load_results`).
+    """
+    config = config or SweepConfig()
+    splits = list(splits)
+    unknown = {name for params in grid for name in params} - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+
+    rows: Dict[int, Dict[str, object]] = {}
+    writer = None
+    handle = None
+    try:
+        if config.output_path is not None:
+            handle = open(config.output_path, "w", newline="")
+
+        def _record(index: int, row: Dict[str, object]) -> None:
+            nonlocal writer
+            rows[index] = row
+            if handle is None:
+                return
+            if writer is None:
+                writer = csv.DictWriter(handle, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            handle.flush()
+
+        predictor = BacktestEngine(
+            calibrator_factory,
+            CostModel(),
+            RiskManager(),
+            BacktestConfig(fit_workers=config.n_workers),
+            book_lookup,
+        )
+        folds = predictor.predict_folds(features, splits)
+        if config.n_workers == 1 or len(grid) <= 1:
+            state = _WorkerState(None, folds, book_lookup, calibrator_factory)
+            for index, params in enumerate(grid):
+                _record(index, _run_point(state, params, index, config))
+        else:
+            block, inputs = _share_inputs(folds, book_lookup)
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=config.n_workers,
+                    initializer=_init_worker,
+                    initargs=(inputs, calibrator_factory),
+                ) as pool:
+                    futures = {
+                        pool.submit(_worker_run, dict(params), i, config): i for i, params in enumerate(grid)
+                    }
+                    for future in as_completed(futures):
+                        _record(futures[future], future.result())
+            finally:
+                block.close()
+                block.unlink()
+    finally:
+        if handle is not None:
+            handle.close()
+
+    return pd.DataFrame([rows[i] for i in range(len(grid))])
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Union
+
+import pandas as pd
+
+from backtest.results import CapitalHistory, ColumnBuffer, TradeLog
+
+_TABLES = {"trades": TradeLog, "capital": CapitalHistory}
+
+
+class ResultsWriter(ABC):
+    """Sink for settled trades and capital changes, fed while the engine runs.
+
+    Rows follow :attr:`TradeLog.schema` and :attr:`CapitalHistory.schema`
+    with datetimes as int64 UTC nanoseconds.  :meth:`checkpoint` and
+    :meth:`restore` keep the output consistent with engine checkpoints.
+    """
+
+    @abstractmethod
+    def write_trade(self, *values) -> None:
+        ...
+
+    @abstractmethod
+    def write_capital(self, timestamp: int, capital: float) -> None:
+        ...
+
+    @abstractmethod
+    def checkpoint(self) -> Dict[str, int]:
+        """Make every row written so far durable; return the row count per table."""
+
+    @abstractmethod
+    def restore(self, rows: Dict[str, int]) -> None:
+        """Continue after the first ``rows[table]`` rows already written by an earlier run.
+
+        Rows past those counts (written after the checkpoint by a run that
+        then crashed, or by the final settlement) are dropped.
+        """
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _BufferedWriter(ResultsWriter):
+    """Collect rows in columnar buffers and hand them on ``row_group_size`` at a time.
+
+    Output goes to ``root / f"run_id={run_id}"``, one entry per table, so
+    several runs (e.g. every point of a sweep) can share ``root`` and be
+    read back together with :func:`load_results`.
+    """
+
+    suffix = ""
+
+    def __init__(self, root: Union[str, Path], run_id: str, row_group_size: int = 65_536) -> None:
+        if row_group_size <= 0:
+            raise ValueError("row_group_size must be positive")
+        self.directory = Path(root) / f"run_id={run_id}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.run_id = run_id
+        self.row_group_size = row_group_size
+        self._buffers: Dict[str, ColumnBuffer] = {
+            name: table(row_group_size) for name, table in _TABLES.items()
+        }
+        # Rows handed to ``_write_group`` per table.  The first group
+        # replaces any file left by an earlier run with the same id, unless
+        # :meth:`restore` continued that file.
+        self._written: Dict[str, int] = {name: 0 for name in _TABLES}
+        self._started: Dict[str, bool] = {name: False for name in _TABLES}
+
+    def path(self, table: str) -> Path:
+        return self.directory / f"{table}{self.suffix}"
+
+    def _append(self, table: str, values) -> None:
+        buffer = self._buffers[table]
+        buffer.append(*values)
+        if len(buffer) >= self.row_group_size:
+            self._flush(table)
+
+    def write_trade(self, *values) -> None:
+        self._append("trades", values)
+
+    def write_capital(self, timestamp: int, capital: float) -> None:
+        self._append("capital", (timestamp, capital))
+
+    def _flush(self, table: str) -> None:
+        buffer = self._buffers[table]
+        if len(buffer) == 0 and self._started[table]:
+            return
+        self._write_group(table, buffer.to_frame(), first=not self._started[table])
+        self._started[table] = True
+        self._written[table] += len(buffer)
+        buffer.clear()
+
+    @abstractmethod
+    def _write_group(self, table: str, frame: pd.DataFrame, first: bool) -> None:
+        """Write one row group; ``first`` starts the file afresh."""
+
+    @abstractmethod
+    def _truncate(self, table: str, rows: int) -> None:
+        """Cut the existing file for ``table`` to its first ``rows`` rows and reopen it for appending."""
+
+    def checkpoint(self) -> Dict[str, int]:
+        for table in _TABLES:
+            if len(self._buffers[table]):
+                self._flush(table)
+        return dict(self._written)
+
+    def restore(self, rows: Dict[str, int]) -> None:
+        if any(self._written.values()) or any(len(buffer) for buffer in self._buffers.values()):
+            raise RuntimeError("restore must be called before any rows are written")
+        for table in _TABLES:
+            count = int(rows.get(table, 0))
+            if count == 0:
+                continue
+            if not self.path(table).exists():
+                raise RuntimeError(
+                    f"Checkpoint expects {count} rows in {self.path(table)}, which does not exist; "
+                    "resume with the run id the checkpoint was written under"
+                )
+            self._truncate(table, count)
+            self._started[table] = True
+            self._written[table] = count
+
+    def close(self) -> None:
+        for table in _TABLES:
+            self._flush(table)
+
+
+class CSVResultsWriter(_BufferedWriter):
+    """Append each row group to ``trades.csv`` / ``capital.csv``."""
+
+    suffix = ".csv"
+
+    def _write_group(self, table: str, frame: pd.DataFrame, first: bool) -> None:
+        frame.to_csv(self.path(table), mode="w" if first else "a", header=first, index=False)
+
+    def _truncate(self, table: str, rows: int) -> None:
+        # Values are kept as the text written, so the kept rows are unchanged.
+        path = self.path(table)
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+        if len(frame) < rows:
+            raise RuntimeError(f"{path} has {len(frame)} rows; the checkpoint expects {rows}")
+        frame.iloc[:rows].to_csv(path, index=False)
+
+
+class ParquetResultsWriter(_BufferedWriter):
+    """Write row groups to part files under ``trades/`` / ``capital/``.
+
+    A Parquet file is only readable once its footer is written on close,
+    so :meth:`checkpoint` closes the open part and later rows start the
+    next one (``part-00000.parquet``, ``part-00001.parquet``, ...).  Rows
+    covered by a checkpoint therefore survive a hard crash; only the part
+    left open by the crash is unreadable, and :meth:`restore` drops it.
+    Needs ``pyarrow``, which is imported on first use.
+    """
+
+    def __init__(self, root: Union[str, Path], run_id: str, row_group_size: int = 65_536) -> None:
+        super().__init__(root, run_id, row_group_size)
+        self._writers: Dict[str, object] = {}
+        self._parts: Dict[str, int] = {name: 0 for name in _TABLES}
+
+    @staticmethod
+    def _pyarrow():
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("ParquetResultsWriter requires pyarrow") from exc
+        return pa, pq
+
+    @classmethod
+    def arrow_schema(cls, table: str):
+        """Arrow schema of ``table`` from its column schema.
+
+        Fixed up front rather than inferred from the first row group, where
+        an all-missing string column (e.g. ``neg_risk_group``) would be
+        typed ``null`` and reject later groups holding strings.
+        """
+        pa, _ = cls._pyarrow()
+        types = {
+            "object": pa.string(),
+            "float64": pa.float64(),
+            "int64": pa.int64(),
+            "bool": pa.bool_(),
+            "datetime": pa.timestamp("ns", tz="UTC"),
+        }
+        return pa.schema([(name, types[dtype]) for name, dtype in _TABLES[table].schema.items()])
+
+    def _open(self, table: str):
+        _, pq = self._pyarrow()
+        writer = self._writers.get(table)
+        if writer is None:
+            path = self.path(table) / f"part-{self._parts[table]:05d}.parquet"
+            writer = self._writers[table] = pq.ParquetWriter(path, self.arrow_schema(table))
+            self._parts[table] += 1
+        return writer
+
+    def _close_parts(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def _write_group(self, table: str, frame: pd.DataFrame, first: bool) -> None:
+        pa, _ = self._pyarrow()
+        if first:
+            # Replace the parts of an earlier run with the same id.
+            for part in _parquet_parts(self.path(table)):
+                part.unlink()
+            self.path(table).mkdir(exist_ok=True)
+        schema = self.arrow_schema(table)
+        self._open(table).write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+    def _truncate(self, table: str, rows: int) -> None:
+        # Parts wholly within ``rows`` are kept as they are, the part holding
+        # the checkpoint boundary is rewritten with its leading rows, and
+        # later parts (including one left without a footer) are removed.
+        _, pq = self._pyarrow()
+        parts = _parquet_parts(self.path(table))
+        kept = 0
+        for index, part in enumerate(parts):
+            if kept == rows:
+                part.unlink()
+                continue
+            part_rows = pq.ParquetFile(part).metadata.num_rows
+            if kept + part_rows > rows:
+                head = pq.read_table(part).slice(0, rows - kept).cast(self.arrow_schema(table))
+                pq.write_table(head, part)
+                part_rows = rows - kept
+            kept += part_rows
+            self._parts[table] = index + 1
+        if kept < rows:
+            raise RuntimeError(f"{self.path(table)} has {kept} rows; the checkpoint expects {rows}")
+
+    def checkpoint(self) -> Dict[str, int]:
+        rows = super().checkpoint()
+        self._close_parts()
+        return rows
+
+    def close(self) -> None:
+        super().close()
+        self._close_parts()
+
+
+def _parquet_parts(directory: Path) -> List[Path]:
+    """Part files of one Parquet table directory, in write order."""
+    return sorted(directory.glob("part-*.parquet"))
+
+
+ResultsFormat = Literal["csv", "parquet"]
+
+
+def results_writer(
+    root: Union[str, Path], run_id: str, fmt: ResultsFormat = "csv", row_group_size: int = 65_536
+) -> ResultsWriter:
+    if fmt == "csv":
+        return CSVResultsWriter(root, run_id, row_group_size)
+    if fmt == "parquet":
+        return ParquetResultsWriter(root, run_id, row_group_size)
+    raise ValueError(f"Unknown results format: {fmt}")
+
+
+def load_results(
+    root: Union[str, Path], table: str = "trades", run_ids: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Read one table back from every (or the selected) run partition under ``root``.
+
+    Adds a ``run_id`` column taken from the partition directory name.
+    """
+    if table not in _TABLES:
+        raise ValueError(f"Unknown results table: {table}")
+    datetimes = [name for name, dtype in _TABLES[table].schema.items() if dtype == "datetime"]
+    frames = []
+    for directory in sorted(Path(root).glob("run_id=*")):
+        run_id = directory.name.split("=", 1)[1]
+        if run_ids is not None and run_id not in run_ids:
+            continue
+        parts = _parquet_parts(directory / table)
+        if parts:
+            frame = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        elif (directory / f"{table}.csv").exists():
+            frame = pd.read_csv(directory / f"{table}.csv")
+            for name in datetimes:
+                frame[name] = pd.to_datetime(frame[name], utc=True, format="ISO8601")
+        else:
+            continue
+        frame.insert(0, "run_id", run_id)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=["run_id", *_TABLES[table].schema])
+    return pd.concat(frames, ignore_index=True)
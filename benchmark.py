@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ingest.synthetic import SyntheticMarketConfig, generate_bundle
+from report.profiling import StageProfiler
+from run_backtest import PipelineConfig, run_backtest
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baseline.json"
+
+# Each CLI's ``--help``, timed in a fresh interpreter.
+STARTUP_COMMANDS = {
+    "startup.run_backtest": ["run_backtest.py", "--help"],
+    "startup.paper_trade": ["paper_trade.py", "--help"],
+}
+# Ceiling on CLI startup whatever the baseline says; importing pandas alone
+# takes most of it, so a CLI that loads its subsystems eagerly fails.
+STARTUP_BUDGET_S = 0.3
+
+
+@dataclass
+class BenchmarkConfig:
+    """One benchmark scale; every repeat regenerates the same seeded bundle."""
+
+    n_markets: int = 200
+    n_trades: int = 20_000
+    book_levels: int = 3
+    repeat: int = 3
+    seed: int = 0
+    # Report from running metrics, as a large production run would.
+    keep_trades: bool = False
+    startup: bool = True
+
+    @property
+    def key(self) -> str:
+        return f"markets={self.n_markets},trades={self.n_trades},levels={self.book_levels}"
+
+
+def measure_startup(repeat: int = 5) -> Dict[str, float]:
+    """Median wall time for each CLI to start, print ``--help`` and exit."""
+    if repeat <= 0:
+        raise ValueError("repeat must be positive")
+    times: Dict[str, float] = {}
+    for name, command in STARTUP_COMMANDS.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, *command], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+            samples.append(time.perf_counter() - started)
+        times[name] = float(np.median(samples))
+    return times
+
+
+def over_startup_budget(result: Dict[str, object], budget: float = STARTUP_BUDGET_S) -> List[str]:
+    return [name for name, seconds in result.get("startup", {}).items() if seconds > budget]
+
+
+def run_benchmark(config: Optional[BenchmarkConfig] = None) -> Dict[str, object]:
+    """Time every pipeline stage on a synthetic bundle; stage times are medians over repeats.
+
+    CLI startup times are measured separately (``result["startup"]``) and
+    compared against the baseline like stages.
+    """
+    config = config or BenchmarkConfig()
+    if config.repeat <= 0:
+        raise ValueError("repeat must be positive")
+    synthetic = SyntheticMarketConfig(
+        n_markets=config.n_markets,
+        n_trades=config.n_trades,
+        book_levels=config.book_levels,
+        seed=config.seed,
+    )
+    walls: Dict[str, List[float]] = {}
+    rows: Dict[str, Optional[int]] = {}
+    peak_rss: Optional[float] = None
+    for _ in range(config.repeat):
+        profiler = StageProfiler()
+        with profiler.stage("generate") as stage:
+            bundle = generate_bundle(synthetic)
+            stage.rows = len(bundle.trades)
+        result = run_backtest(PipelineConfig(source="local", keep_trades=config.keep_trades), bundle)
+        stages = profiler.report()["stages"] + result["profile"]["stages"]
+        for stats in stages:
+            walls.setdefault(stats["name"], []).append(stats["wall_s"])
+            rows[stats["name"]] = stats["rows"]
+        peak_rss = result["profile"]["peak_rss_mb"]
+        del bundle, result
+
+    stage_times = {name: float(np.median(values)) for name, values in walls.items()}
+    return {
+        "key": config.key,
+        "config": asdict(config),
+        "recorded": pd.Timestamp.now(tz="UTC").isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "total_s": sum(stage_times.values()),
+        "peak_rss_mb": peak_rss,
+        "stages": stage_times,
+        "rows": rows,
+        "startup": measure_startup(config.repeat) if config.startup else {},
+    }
+
+
+def load_baselines(path: Path) -> Dict[str, dict]:
+    if not Path(path).exists():
+        return {}
+    return json.loads(Path(path).read_text())
+
+
+def save_baseline(path: Path, result: Dict[str, object]) -> None:
+    """Store ``result`` as the baseline for its scale, keeping other scales."""
+    path = Path(path)
+    baselines = load_baselines(path)
+    baselines[result["key"]] = result
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baselines, indent=2) + "\n")
+
+
+def compare_to_baseline(
+    result: Dict[str, object],
+    baseline: Dict[str, object],
+    tolerance: float = 0.25,
+    min_delta_s: float = 0.05,
+) -> pd.DataFrame:
+    """Per-stage comparison against a stored run at the same scale.
+
+    A stage regresses when it is more than ``tolerance`` slower than the
+    baseline and by more than ``min_delta_s`` seconds, so millisecond
+    stages do not flag on timer noise.
+    """
+    before_times = {**baseline["stages"], **baseline.get("startup", {})}
+    after_times = {**result["stages"], **result.get("startup", {})}
+    records = []
+    for name in dict.fromkeys([*before_times, *after_times]):
+        before = before_times.get(name)
+        after = after_times.get(name)
+        ratio = after / before if before and after is not None else float("nan")
+        regression = (
+            before is not None
+            and after is not None
+            and after > before * (1.0 + tolerance)
+            and after - before > min_delta_s
+        )
+        records.append(
+            {
+                "stage": name,
+                "baseline_s": before,
+                "current_s": after,
+                "ratio": ratio,
+                "regression": regression,
+            }
+        )
+    return pd.DataFrame.from_records(records)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Polymoly pipeline on synthetic data")
+    parser.add_argument("--markets", type=int, default=BenchmarkConfig.n_markets)
+    parser.add_argument("--trades", type=int, default=BenchmarkConfig.n_trades)
+    parser.add_argument(
+        "--book-levels",
+        type=int,
+        default=BenchmarkConfig.book_levels,
+        help="Book levels per side; 0 benchmarks the synthesised-book fallback",
+    )
+    parser.add_argument("--repeat", type=int, default=BenchmarkConfig.repeat)
+    parser.add_argument("--seed", type=int, default=BenchmarkConfig.seed)
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="JSON file of baseline results keyed by scale",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store this run as the baseline for its scale instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative slowdown per stage that counts as a regression",
+    )
+    parser.add_argument("--output", type=Path, help="Also write this run's results as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    result = run_benchmark(
+        BenchmarkConfig(
+            n_markets=args.markets,
+            n_trades=args.trades,
+            book_levels=args.book_levels,
+            repeat=args.repeat,
+            seed=args.seed,
+        )
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"=== Benchmark {result['key']} ===")
+    slow_startup = over_startup_budget(result)
+    for name in slow_startup:
+        print(f"{name}: {result['startup'][name]:.3f}s exceeds the {STARTUP_BUDGET_S}s startup budget")
+    baseline = load_baselines(args.baseline).get(result["key"])
+    if args.update_baseline or baseline is None:
+        for name, seconds in result["stages"].items():
+            print(f"{name}: {seconds:.4f}s rows={result['rows'][name]}")
+        for name, seconds in result["startup"].items():
+            print(f"{name}: {seconds:.4f}s")
+        save_baseline(args.baseline, result)
+        print(f"Baseline stored in {args.baseline}")
+        raise SystemExit(1 if slow_startup else 0)
+    table = compare_to_baseline(result, baseline, tolerance=args.tolerance)
+    print(table.to_string(index=False))
+    regressions = table.loc[table["regression"], "stage"].tolist()
+    regressions += [name for name in slow_startup if name not in regressions]
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        raise SystemExit(1)
+    print("No regressions")
@@ -25,7 +25,7 @@ def _prepare_order_book_features(books: pd.DataFrame) -> pd.DataFrame:
         [["token_id", "timestamp", "best_bid", "best_bid_size"]]
     )
     depth = (
-        books.groupby(["token_id", "timestamp", "side"], as_index=False)["size"].sum()
+        books.groupby(["token_id", "timestamp", "side"], as_index=False, observed=True)["size"].sum()
         .pivot(index=["token_id", "timestamp"], columns="side", values="size")
         .rename(columns={"ask": "ask_depth", "bid": "bid_depth"})
         .reset_index()
@@ -85,9 +85,10 @@ def compute_features(
     enriched["relative_spread"] = enriched["spread"] / enriched["midpoint"]
     enriched["price_vs_mid"] = enriched["price"] - enriched["midpoint"]
 
-    # Merge price history for simple momentum style features.
-    prices_sorted = prices.sort_values(["token_id", "timestamp"])
-    enriched = enriched.sort_values(["token_id", "timestamp"]).reset_index(drop=True)
+    # Merge price history for simple momentum style features.  ``merge_asof``
+    # needs both sides sorted by the ``on`` key across all tokens.
+    prices_sorted = prices.sort_values("timestamp", kind="stable")
+    enriched = enriched.sort_values("timestamp", kind="stable").reset_index(drop=True)
     previous_prices = pd.merge_asof(
         enriched,
         prices_sorted,
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+_BOOK_COLUMNS = ["token_id", "timestamp", "side", "level", "price", "size"]
+DEFAULT_PRICE_BANDS: Tuple[float, ...] = (0.0, 0.2, 0.4, 0.6, 0.8, 0.9, 0.95, 1.0)
+# Heuristic used where no fitted shape applies: a tick of 1% of the price
+# (at least 0.002) per level and depth falling 25% of the trade size per
+# level, floored at a quarter.
+_MIN_TICK = 0.002
+_TICK_SHARE = 0.01
+_DEPTH_DECAY = 0.25
+
+
+@dataclass
+class BookShape:
+    """Per-level distance from the trade price and depth relative to trade size."""
+
+    ask_offsets: np.ndarray
+    bid_offsets: np.ndarray
+    ask_depth: np.ndarray
+    bid_depth: np.ndarray
+    samples: int
+
+
+def _heuristic(prices: np.ndarray, sizes: np.ndarray, levels: int) -> Tuple[np.ndarray, np.ndarray]:
+    """``(offsets, depth)`` of shape ``(n, levels)``, the same on both sides."""
+    level = np.arange(1, levels + 1)
+    tick = np.maximum(_MIN_TICK, prices * _TICK_SHARE)
+    depth = np.maximum(1.0 - _DEPTH_DECAY * (level - 1), _DEPTH_DECAY)
+    return tick[:, None] * level, sizes[:, None] * depth
+
+
+def _extend(values: np.ndarray, levels: int, additive: bool) -> np.ndarray:
+    """Fill levels deeper than the fitted ones by repeating the last step (offsets)
+    or the last decay ratio (depth)."""
+    out = np.empty(levels)
+    known = min(len(values), levels)
+    out[:known] = values[:known]
+    for i in range(known, levels):
+        if additive:
+            out[i] = out[i - 1] + (out[i - 1] - out[i - 2] if i >= 2 else max(out[0], _MIN_TICK))
+        elif i >= 2 and out[i - 2] > 0:
+            out[i] = out[i - 1] * out[i - 1] / out[i - 2]
+        else:
+            out[i] = out[i - 1] * (1.0 - _DEPTH_DECAY)
+    return out
+
+
+class BookProfile:
+    """Book shapes fitted per ``(category, price band)`` from observed snapshots.
+
+    Snapshots are matched to the trades sharing their ``(token_id,
+    timestamp)``.  For each level, the profile keeps the median distance of
+    the quote from the trade price and the median ratio of quoted size to
+    trade size.  Cells with fewer than ``min_samples`` snapshots fall back
+    to the pooled shape of their price band, then to the fixed heuristic.
+    """
+
+    def __init__(
+        self,
+        levels: int = 3,
+        bands: Sequence[float] = DEFAULT_PRICE_BANDS,
+        shapes: Optional[Dict[Tuple[Optional[str], int], BookShape]] = None,
+    ) -> None:
+        self.levels = levels
+        self.bands = tuple(bands)
+        self.shapes: Dict[Tuple[Optional[str], int], BookShape] = shapes or {}
+
+    def band(self, prices: np.ndarray) -> np.ndarray:
+        return np.searchsorted(np.asarray(self.bands[1:-1]), prices, side="right")
+
+    @classmethod
+    def fit(
+        cls,
+        books: pd.DataFrame,
+        trades: pd.DataFrame,
+        markets: Optional[pd.DataFrame] = None,
+        levels: int = 3,
+        bands: Sequence[float] = DEFAULT_PRICE_BANDS,
+        min_samples: int = 20,
+    ) -> "BookProfile":
+        profile = cls(levels, bands)
+        reference = trades.drop_duplicates(["token_id", "timestamp"])[
+            ["token_id", "timestamp", "condition_id", "price", "size"]
+        ].rename(columns={"price": "trade_price", "size": "trade_size"})
+        snapshots = books.loc[books["level"] <= levels].merge(reference, on=["token_id", "timestamp"])
+        if snapshots.empty:
+            return profile
+        if markets is not None:
+            snapshots = snapshots.merge(
+                markets[["condition_id", "category"]], on="condition_id", how="left"
+            )
+        else:
+            snapshots["category"] = None
+
+        ask = (snapshots["side"] == "ask").to_numpy()
+        trade_price = snapshots["trade_price"].to_numpy(dtype=float)
+        quoted = snapshots["price"].to_numpy(dtype=float)
+        snapshots["offset"] = np.where(ask, quoted - trade_price, trade_price - quoted)
+        snapshots["depth"] = snapshots["size"].to_numpy(dtype=float) / np.maximum(
+            snapshots["trade_size"].to_numpy(dtype=float), 1.0
+        )
+        snapshots["band"] = profile.band(trade_price)
+
+        for by_category in (True, False):
+            keys = ["category", "band"] if by_category else ["band"]
+            stats = snapshots.groupby([*keys, "side", "level"], dropna=False, observed=True).agg(
+                offset=("offset", "median"), depth=("depth", "median"), samples=("offset", "size")
+            )
+            for cell, table in stats.groupby(level=keys if by_category else "band", dropna=False, observed=True):
+                category, band = cell if by_category else (None, cell)
+                if by_category and pd.isna(category):
+                    continue
+                shape = profile._shape(table.droplevel(keys), min_samples)
+                if shape is not None:
+                    profile.shapes[(category, int(band))] = shape
+        return profile
+
+    def _shape(self, table: pd.DataFrame, min_samples: int) -> Optional[BookShape]:
+        """Shape from per-``(side, level)`` medians, or ``None`` with too few samples."""
+        sides = {}
+        for side in ("ask", "bid"):
+            if (side, 1) not in table.index:
+                return None
+            rows = table.loc[side].sort_index()
+            # Only the contiguous run of levels from the top of the book.
+            contiguous = np.cumprod(rows.index.to_numpy() == np.arange(1, len(rows) + 1))
+            sides[side] = rows.loc[contiguous.astype(bool)]
+        samples = int(min(sides["ask"].loc[1, "samples"], sides["bid"].loc[1, "samples"]))
+        if samples < min_samples:
+            return None
+        # Quotes never cross the trade price and move away from it with depth.
+        ask_offsets = np.maximum.accumulate(np.maximum(sides["ask"]["offset"].to_numpy(), 0.0))
+        bid_offsets = np.maximum.accumulate(np.maximum(sides["bid"]["offset"].to_numpy(), 0.001))
+        return BookShape(
+            ask_offsets=_extend(ask_offsets, self.levels, additive=True),
+            bid_offsets=_extend(bid_offsets, self.levels, additive=True),
+            ask_depth=_extend(sides["ask"]["depth"].to_numpy(), self.levels, additive=False),
+            bid_depth=_extend(sides["bid"]["depth"].to_numpy(), self.levels, additive=False),
+            samples=samples,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "levels": self.levels,
+            "bands": list(self.bands),
+            "shapes": [
+                {
+                    "category": category,
+                    "band": band,
+                    "samples": shape.samples,
+                    "ask_offsets": shape.ask_offsets.tolist(),
+                    "bid_offsets": shape.bid_offsets.tolist(),
+                    "ask_depth": shape.ask_depth.tolist(),
+                    "bid_depth": shape.bid_depth.tolist(),
+                }
+                for (category, band), shape in self.shapes.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BookProfile":
+        shapes = {
+            (item["category"], int(item["band"])): BookShape(
+                ask_offsets=np.asarray(item["ask_offsets"]),
+                bid_offsets=np.asarray(item["bid_offsets"]),
+                ask_depth=np.asarray(item["ask_depth"]),
+                bid_depth=np.asarray(item["bid_depth"]),
+                samples=int(item["samples"]),
+            )
+            for item in data["shapes"]
+        }
+        return cls(int(data["levels"]), data["bands"], shapes)
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BookProfile":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def synthesise_books(
+    trades: pd.DataFrame,
+    levels: int = 3,
+    profile: Optional[BookProfile] = None,
+    markets: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """One synthetic snapshot per distinct ``(token_id, timestamp)`` in ``trades``.
+
+    Quotes are the trade price plus (asks) or minus (bids) each level's
+    offset, clipped to ``[0.001, 0.999]``; sizes are the trade size (1 when
+    missing) times each level's depth ratio.  Offsets and ratios come from
+    ``profile`` for the trade's category (looked up in ``markets``) and
+    price band, else from the fixed heuristic.  All levels of all trades are
+    built in one broadcast, in the loaders' ``(token_id, timestamp, side,
+    level)`` order.
+    """
+    if trades.empty:
+        return pd.DataFrame(columns=_BOOK_COLUMNS)
+    if profile is not None and profile.levels < levels:
+        raise ValueError(f"Profile has {profile.levels} levels but {levels} were requested")
+    snapshot_trades = trades.drop_duplicates(["token_id", "timestamp"]).sort_values(
+        ["token_id", "timestamp"], kind="stable"
+    )
+    n = len(snapshot_trades)
+    prices = snapshot_trades["price"].to_numpy(dtype=float)
+    if "size" in snapshot_trades:
+        sizes = snapshot_trades["size"].to_numpy(dtype=float)
+        sizes = np.where(np.isfinite(sizes) & (sizes > 0), sizes, 1.0)
+    else:
+        sizes = np.ones(n)
+
+    offsets, depth = _heuristic(prices, sizes, levels)
+    ask_offsets, bid_offsets = offsets, offsets.copy()
+    ask_depth, bid_depth = depth, depth.copy()
+    if profile is not None and profile.shapes:
+        bands = profile.band(prices)
+        if markets is not None and "condition_id" in snapshot_trades:
+            category_of = markets.drop_duplicates("condition_id").set_index("condition_id")["category"]
+            categories = snapshot_trades["condition_id"].map(category_of).to_numpy(dtype=object)
+        else:
+            categories = np.full(n, None, dtype=object)
+        cells = pd.DataFrame({"category": categories, "band": bands})
+        for (category, band), rows in cells.groupby(["category", "band"], dropna=False, observed=True).indices.items():
+            category = None if pd.isna(category) else category
+            shape = profile.shapes.get((category, int(band))) or profile.shapes.get((None, int(band)))
+            if shape is None:
+                continue
+            ask_offsets[rows] = shape.ask_offsets[:levels]
+            bid_offsets[rows] = shape.bid_offsets[:levels]
+            ask_depth[rows] = sizes[rows, None] * shape.ask_depth[:levels]
+            bid_depth[rows] = sizes[rows, None] * shape.bid_depth[:levels]
+
+    asks = np.minimum(prices[:, None] + ask_offsets, 0.999)
+    bids = np.maximum(prices[:, None] - bid_offsets, 0.001)
+    rows = 2 * levels
+    return pd.DataFrame(
+        {
+            "token_id": np.repeat(snapshot_trades["token_id"].to_numpy(), rows),
+            "timestamp": snapshot_trades["timestamp"].repeat(rows).reset_index(drop=True),
+            "side": np.tile(np.repeat(np.array(["ask", "bid"], dtype=object), levels), n),
+            "level": np.tile(np.arange(1, levels + 1), 2 * n),
+            "price": np.stack([asks, bids], axis=1).ravel(),
+            "size": np.stack([ask_depth, bid_depth], axis=1).ravel(),
+        }
+    )
+
+
+def fill_missing_books(
+    books: pd.DataFrame,
+    trades: pd.DataFrame,
+    markets: Optional[pd.DataFrame] = None,
+    levels: int = 3,
+    profile: Optional[BookProfile] = None,
+) -> pd.DataFrame:
+    """``books`` plus synthetic snapshots for trades without one.
+
+    Without an explicit ``profile`` the shapes are fitted on ``books``
+    itself, so the filler follows whatever real snapshots exist.
+    """
+    if books is None or books.empty:
+        return synthesise_books(trades, levels, profile, markets)
+    keys: List[str] = ["token_id", "timestamp"]
+    covered = pd.MultiIndex.from_frame(books[keys].drop_duplicates())
+    missing = ~pd.MultiIndex.from_frame(trades[keys]).isin(covered)
+    if not missing.any():
+        return books
+    if profile is None:
+        profile = BookProfile.fit(books, trades, markets, levels)
+    filler = synthesise_books(trades.loc[missing], levels, profile, markets)
+    combined = pd.concat([books, filler], ignore_index=True)
+    combined.sort_values(["token_id", "timestamp", "side", "level"], inplace=True, kind="stable")
+    combined.reset_index(drop=True, inplace=True)
+    return combined
@@ -2,21 +2,19 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
 
 import pandas as pd
 
-from ingest.polymarket_api import (
-    BackfillWindow,
-    PolymarketAPIClient,
-    PolymarketAPISettings,
-)
 from ingest.clob_books_loader import load_order_books
 from ingest.clob_prices_loader import load_prices_history
 from ingest.dataapi_trades_loader import load_trades
 from ingest.gamma_markets_loader import load_gamma_markets
 from ingest.subgraph_resolutions import load_resolutions
 
+if TYPE_CHECKING:
+    from ingest.polymarket_api import BackfillWindow, PolymarketAPISettings
+
 
 @dataclass
 class BacktestDataBundle:
@@ -88,6 +86,9 @@ def download_bundle_from_api(
     and replace this approximation with actual snapshots.
     """
 
+    # The client (and ``requests``) is only loaded for API runs.
+    from ingest.polymarket_api import PolymarketAPIClient
+
     client = PolymarketAPIClient(settings)
     markets = client.fetch_gamma_markets()
     if condition_filter:
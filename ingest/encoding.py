@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ingest.data_bundle import BacktestDataBundle
+
+# Repeated string columns that share the bundle dictionary.  Unique
+# per-row identifiers such as ``trade_id`` gain nothing from it and stay
+# as strings.
+DICTIONARY_COLUMNS = (
+    "token_id",
+    "condition_id",
+    "clob_token_yes",
+    "clob_token_no",
+    "category",
+    "neg_risk_group",
+    "slug",
+    "side",
+    "taker_side",
+    "resolved_outcome",
+)
+
+_FRAMES = ("markets", "resolutions", "trades", "books", "prices")
+_INT32 = np.iinfo(np.int32)
+
+
+def _frames(bundle: BacktestDataBundle) -> Dict[str, pd.DataFrame]:
+    return {name: getattr(bundle, name) for name in _FRAMES}
+
+
+def _string_values(series: pd.Series) -> np.ndarray:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return np.asarray(series.cat.categories, dtype=object)
+    values = series.dropna().unique()
+    return np.asarray([value for value in values if isinstance(value, str)], dtype=object)
+
+
+def build_dictionary(bundle: BacktestDataBundle) -> pd.CategoricalDtype:
+    """Sorted dictionary of every string in the bundle's :data:`DICTIONARY_COLUMNS`.
+
+    Categories are sorted, so code order is string order and sorts and
+    groupbys on encoded columns come out as they would on strings.
+    """
+    parts = [
+        _string_values(frame[column])
+        for frame in _frames(bundle).values()
+        for column in DICTIONARY_COLUMNS
+        if frame is not None and column in frame.columns
+    ]
+    values = np.concatenate(parts) if parts else np.empty(0, dtype=object)
+    return pd.CategoricalDtype(np.unique(values.astype(str)), ordered=False)
+
+
+def narrow_numeric(series: pd.Series) -> pd.Series:
+    """``series`` in the narrowest dtype that holds every value exactly.
+
+    Integers drop to ``int32`` when they fit (never below, so sums of
+    sizes cannot overflow); floats drop to ``float32`` only when every
+    value survives the round trip, so prices such as 0.123 keep float64.
+    """
+    dtype = series.dtype
+    if dtype.kind in "iu" and dtype.itemsize > 4:
+        if series.empty or (series.min() >= _INT32.min and series.max() <= _INT32.max):
+            return series.astype(np.int32)
+    elif dtype.kind == "f" and dtype.itemsize > 4:
+        values = series.to_numpy()
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(dtype), values, equal_nan=True):
+            return pd.Series(narrow, index=series.index, name=series.name)
+    return series
+
+
+def encode_frame(frame: pd.DataFrame, dictionary: pd.CategoricalDtype) -> pd.DataFrame:
+    """Dictionary-encode string columns and narrow numeric ones; ``frame`` is not modified."""
+    if frame is None:
+        return frame
+    encoded = {}
+    for column in frame.columns:
+        series = frame[column]
+        if column in DICTIONARY_COLUMNS:
+            # Non-string placeholders (``None``, NaN) become missing codes.
+            series = series.astype(dictionary)
+        else:
+            series = narrow_numeric(series)
+        encoded[column] = series
+    return pd.DataFrame(encoded, index=frame.index)
+
+
+def decode_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """``frame`` with categorical columns back as strings, missing values as ``None``."""
+    decoded = {
+        column: frame[column].astype(object).where(frame[column].notna(), None)
+        for column in frame.columns
+        if isinstance(frame[column].dtype, pd.CategoricalDtype)
+    }
+    # ``copy`` consolidates the decoded columns into one block, which keeps
+    # later per-group copies as cheap as on a freshly loaded frame.
+    return frame.assign(**decoded).copy() if decoded else frame
+
+
+def encode_bundle(
+    bundle: BacktestDataBundle, dictionary: Optional[pd.CategoricalDtype] = None
+) -> BacktestDataBundle:
+    """A copy of ``bundle`` with one shared string dictionary and narrow numerics.
+
+    Every :data:`DICTIONARY_COLUMNS` column becomes a categorical over the
+    same dictionary, so the joins in feature engineering compare integer
+    codes rather than strings, and each distinct string is stored once.
+    """
+    dictionary = dictionary or build_dictionary(bundle)
+    frames = {name: encode_frame(frame, dictionary) for name, frame in _frames(bundle).items()}
+    return BacktestDataBundle(**frames)
+
+
+def _column_bytes(series: pd.Series, shared: Iterable[pd.CategoricalDtype]) -> int:
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.dtype in shared:
+        return int(series.cat.codes.to_numpy().nbytes)
+    return int(series.memory_usage(deep=True, index=False))
+
+
+def memory_report(bundle: BacktestDataBundle) -> pd.DataFrame:
+    """Bytes held by each frame, counting a shared string dictionary once.
+
+    ``pandas`` charges a categorical's categories to every column that uses
+    them; here encoded columns are charged their codes only and the
+    dictionary gets its own ``dictionary`` row.
+    """
+    frames = _frames(bundle)
+    shared = []
+    for frame in frames.values():
+        if frame is None:
+            continue
+        for column in DICTIONARY_COLUMNS:
+            if column in frame.columns and isinstance(frame[column].dtype, pd.CategoricalDtype):
+                if frame[column].dtype not in shared:
+                    shared.append(frame[column].dtype)
+    records = []
+    for name, frame in frames.items():
+        if frame is None:
+            continue
+        records.append(
+            {
+                "frame": name,
+                "rows": len(frame),
+                "columns": len(frame.columns),
+                "bytes": sum(_column_bytes(frame[column], shared) for column in frame.columns),
+            }
+        )
+    for dtype in shared:
+        records.append(
+            {
+                "frame": "dictionary",
+                "rows": len(dtype.categories),
+                "columns": 1,
+                "bytes": int(dtype.categories.memory_usage(deep=True)),
+            }
+        )
+    report = pd.DataFrame.from_records(records, columns=["frame", "rows", "columns", "bytes"])
+    report["mb"] = report["bytes"] / 2**20
+    return report
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from ingest.data_bundle import BacktestDataBundle
+
+_HOUR_NS = 3_600 * 10**9
+_DAY_NS = 24 * _HOUR_NS
+
+
+@dataclass
+class SyntheticMarketConfig:
+    """Scale and shape of a generated :class:`BacktestDataBundle`."""
+
+    n_markets: int = 100
+    n_trades: int = 10_000
+    start: str = "2023-01-01"
+    # Market end dates are spread over this many days after ``start``.
+    days: float = 365.0
+    min_duration_days: float = 2.0
+    max_duration_days: float = 60.0
+    # Book levels per side at every trade; 0 leaves ``books`` empty so the
+    # pipeline falls back to synthesised books.
+    book_levels: int = 3
+    tick: float = 0.01
+    categories: Tuple[str, ...] = ("politics", "sports", "crypto", "economics", "culture")
+    neg_risk_share: float = 0.2
+    neg_risk_group_size: int = 4
+    # Traded prices are pulled towards 0.5 by this share of their distance
+    # (favourite-longshot bias), which gives the calibrator an edge to find.
+    longshot_bias: float = 0.1
+    seed: int = 0
+
+
+def _utc(ns: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(np.asarray(ns, dtype=np.int64).view("datetime64[ns]")).tz_localize("UTC")
+
+
+def _labels(prefix: str, n: int) -> np.ndarray:
+    width = len(str(max(n - 1, 0)))
+    return (prefix + pd.Series(np.arange(n)).astype(str).str.zfill(width)).to_numpy(dtype=object)
+
+
+def generate_bundle(config: SyntheticMarketConfig | None = None) -> BacktestDataBundle:
+    """Generate an internally consistent bundle at the configured scale.
+
+    Every market has a latent probability and a resolution drawn from it;
+    trades buy the YES token before ``end_date`` at a noisy, biased price
+    that drifts towards the outcome as resolution nears, each with a book
+    snapshot whose best ask is the trade price and a preceding price-history
+    point.  ``(token_id, timestamp)`` is unique, so every trade matches
+    exactly one snapshot.  Arrays are built with NumPy throughout; the
+    frames follow the loaders' schemas and sort orders.
+    """
+    config = config or SyntheticMarketConfig()
+    if config.n_markets <= 0 or config.n_trades <= 0:
+        raise ValueError("n_markets and n_trades must be positive")
+    rng = np.random.default_rng(config.seed)
+    n_markets = config.n_markets
+    start = pd.Timestamp(config.start, tz="UTC").value
+
+    condition_ids = _labels("mkt_", n_markets)
+    yes_tokens = _labels("tok_yes_", n_markets)
+    no_tokens = _labels("tok_no_", n_markets)
+    duration = rng.uniform(config.min_duration_days, config.max_duration_days, n_markets) * _DAY_NS
+    end = start + config.max_duration_days * _DAY_NS + rng.uniform(0, config.days, n_markets) * _DAY_NS
+    end = (end // _HOUR_NS * _HOUR_NS).astype(np.int64)
+    opened = (end - duration).astype(np.int64)
+    resolve = end + rng.integers(1, 48, n_markets) * _HOUR_NS
+    latent = rng.uniform(0.02, 0.98, n_markets)
+    outcome = rng.random(n_markets) < latent
+
+    categories = np.asarray(config.categories, dtype=object)
+    n_groups = max(int(n_markets * config.neg_risk_share) // max(config.neg_risk_group_size, 1), 0)
+    group_ids = np.full(n_markets, None, dtype=object)
+    if n_groups:
+        grouped = rng.choice(n_markets, n_groups * config.neg_risk_group_size, replace=False)
+        group_ids[grouped] = _labels("grp_", n_groups)[np.arange(len(grouped)) % n_groups]
+
+    markets = pd.DataFrame(
+        {
+            "condition_id": condition_ids,
+            "slug": _labels("market-", n_markets),
+            "category": categories[rng.integers(0, len(categories), n_markets)],
+            "end_date": _utc(end),
+            "clob_token_yes": yes_tokens,
+            "clob_token_no": no_tokens,
+            "neg_risk_group": group_ids,
+        }
+    )
+    resolutions = pd.DataFrame(
+        {
+            "condition_id": condition_ids,
+            "resolved_outcome": np.where(outcome, "yes", "no").astype(object),
+            "resolve_ts": _utc(resolve),
+            "dispute_flag": rng.random(n_markets) < 0.01,
+        }
+    ).sort_values("resolve_ts", ignore_index=True)
+
+    # Trade activity is heavy-tailed across markets.
+    weights = rng.pareto(1.5, n_markets) + 1.0
+    market = rng.choice(n_markets, config.n_trades, p=weights / weights.sum())
+    progress = rng.random(config.n_trades)
+    # Whole seconds, at least a minute before the market's end date.
+    timestamp = opened[market] + (progress * (duration[market] - 60e9)).astype(np.int64)
+    timestamp -= timestamp % 10**9
+    order = np.lexsort((timestamp, market))
+    market, timestamp, progress = market[order], timestamp[order], progress[order]
+    unique = np.ones(len(market), dtype=bool)
+    unique[1:] = (market[1:] != market[:-1]) | (timestamp[1:] != timestamp[:-1])
+    market, timestamp, progress = market[unique], timestamp[unique], progress[unique]
+    n = len(market)
+
+    fair = latent[market] + (outcome[market] - latent[market]) * progress**4
+    price = fair - config.longshot_bias * (fair - 0.5) + rng.normal(0.0, 0.02, n)
+    tick = config.tick
+    price = np.clip(np.round(price, 3), tick, 1.0 - tick)
+    size = np.maximum(rng.lognormal(4.5, 1.0, n), 1.0).astype(np.int64)
+    tokens = yes_tokens[market]
+
+    trades = pd.DataFrame(
+        {
+            "trade_id": _labels("trade_", n),
+            "token_id": tokens,
+            "condition_id": condition_ids[market],
+            "timestamp": _utc(timestamp),
+            "price": price,
+            "size": size,
+            "taker_side": np.full(n, "buy", dtype=object),
+        }
+    )
+
+    prices = pd.DataFrame(
+        {
+            "token_id": tokens,
+            "timestamp": _utc(timestamp - rng.integers(60, 3_600, n) * 10**9),
+            "price": np.clip(np.round(price + rng.normal(0.0, 0.01, n), 3), tick, 1.0 - tick),
+        }
+    ).sort_values(["token_id", "timestamp"], ignore_index=True)
+
+    levels = config.book_levels
+    if levels > 0:
+        steps = np.arange(levels) * tick
+        best_bid = price - tick * rng.geometric(0.6, n)
+        ask_prices = np.minimum(price[:, None] + steps, 0.999)
+        bid_prices = np.maximum(best_bid[:, None] - steps, 0.001)
+        decay = rng.uniform(0.6, 0.95, n)[:, None] ** np.arange(levels)
+        ask_sizes = np.maximum(size[:, None] * rng.uniform(0.8, 2.0, (n, 1)) * decay, 1.0)
+        bid_sizes = np.maximum(size[:, None] * rng.uniform(0.8, 2.0, (n, 1)) * decay, 1.0)
+        # Trade-major, then ask before bid, then level: the loader's sort order.
+        rows = 2 * levels
+        books = pd.DataFrame(
+            {
+                "token_id": np.repeat(tokens, rows),
+                "timestamp": _utc(np.repeat(timestamp, rows)),
+                "side": np.tile(np.repeat(np.array(["ask", "bid"], dtype=object), levels), n),
+                "level": np.tile(np.arange(1, levels + 1), 2 * n),
+                "price": np.round(np.stack([ask_prices, bid_prices], axis=1), 3).ravel(),
+                "size": np.stack([ask_sizes, bid_sizes], axis=1).astype(np.int64).ravel(),
+            }
+        )
+    else:
+        books = pd.DataFrame(columns=["token_id", "timestamp", "side", "level", "price", "size"])
+
+    trades = trades.sort_values("timestamp", kind="stable", ignore_index=True)
+    return BacktestDataBundle(markets, resolutions, trades, books, prices)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import socket
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from ingest.data_bundle import BacktestDataBundle
+
+# Replay order for events sharing a timestamp: a trade sees the book taken at
+# its own timestamp, while prices at that timestamp only count for later
+# trades, matching the as-of joins in :func:`feature.make_features.compute_features`.
+_EVENT_ORDER = {"book": 0, "trade": 1, "price": 2, "resolution": 3}
+
+
+@dataclass
+class FeedEvent:
+    """One market event.
+
+    ``kind`` is ``"book"``, ``"trade"``, ``"price"`` or ``"resolution"``;
+    ``payload`` holds the remaining fields of the JSON line.  Book payloads
+    carry ``bids``/``asks`` as ``[[price, size], ...]`` in level order.
+    """
+
+    kind: str
+    timestamp: pd.Timestamp
+    payload: Dict[str, object] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, line: str) -> "FeedEvent":
+        record = json.loads(line)
+        kind = record.pop("type")
+        if kind not in _EVENT_ORDER:
+            raise ValueError(f"Unknown feed event type: {kind}")
+        timestamp = pd.Timestamp(record.pop("timestamp"))
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize("UTC")
+        return cls(kind=kind, timestamp=timestamp, payload=record)
+
+    def to_json(self) -> str:
+        record = {"type": self.kind, "timestamp": self.timestamp.isoformat()}
+        record.update(self.payload)
+        return json.dumps(record)
+
+
+def _book_events(books: pd.DataFrame) -> Iterator[FeedEvent]:
+    books = books.sort_values(["token_id", "timestamp", "side", "level"])
+    for (token_id, ts), group in books.groupby(["token_id", "timestamp"], sort=False, observed=True):
+        sides = group["side"].to_numpy()
+        levels = list(zip(group["price"].astype(float), group["size"].astype(float)))
+        yield FeedEvent(
+            "book",
+            ts,
+            {
+                "token_id": token_id,
+                "bids": [list(level) for level, side in zip(levels, sides) if side == "bid"],
+                "asks": [list(level) for level, side in zip(levels, sides) if side == "ask"],
+            },
+        )
+
+
+def bundle_events(bundle: BacktestDataBundle) -> List[FeedEvent]:
+    """Interleave a bundle's books, trades, prices and resolutions by time."""
+    events: List[FeedEvent] = list(_book_events(bundle.books))
+    for row in bundle.trades.itertuples(index=False):
+        events.append(
+            FeedEvent(
+                "trade",
+                row.timestamp,
+                {
+                    "trade_id": row.trade_id,
+                    "token_id": row.token_id,
+                    "condition_id": row.condition_id,
+                    "price": float(row.price),
+                    "size": float(row.size),
+                },
+            )
+        )
+    for row in bundle.prices.itertuples(index=False):
+        events.append(FeedEvent("price", row.timestamp, {"token_id": row.token_id, "price": float(row.price)}))
+    for row in bundle.resolutions.itertuples(index=False):
+        events.append(
+            FeedEvent(
+                "resolution",
+                row.resolve_ts,
+                {"condition_id": row.condition_id, "resolved_outcome": str(row.resolved_outcome)},
+            )
+        )
+    events.sort(key=lambda event: (event.timestamp, _EVENT_ORDER[event.kind]))
+    return events
+
+
+def write_replay(events: Iterable[FeedEvent], path: Union[str, Path]) -> int:
+    """Write events as JSON lines; returns the number written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("w", encoding="utf-8") as handle:
+        for event in events:
+            handle.write(event.to_json())
+            handle.write("\n")
+            count += 1
+    return count
+
+
+def _paced(events: Iterable[FeedEvent], speed: Optional[float]) -> Iterator[FeedEvent]:
+    """Sleep between events so market time runs ``speed`` times faster than wall time."""
+    if not speed:
+        yield from events
+        return
+    origin: Optional[Tuple[pd.Timestamp, float]] = None
+    for event in events:
+        if origin is None:
+            origin = (event.timestamp, time.monotonic())
+        due = origin[1] + (event.timestamp - origin[0]).total_seconds() / speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield event
+
+
+class FileFeed:
+    """Replay a JSON-lines event file, optionally paced at ``speed`` x real time."""
+
+    def __init__(self, path: Union[str, Path], speed: Optional[float] = None) -> None:
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Replay file not found: {self.path}")
+        self.speed = speed
+
+    def _read(self) -> Iterator[FeedEvent]:
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield FeedEvent.from_json(line)
+
+    def __iter__(self) -> Iterator[FeedEvent]:
+        return _paced(self._read(), self.speed)
+
+
+class SocketFeed:
+    """Read JSON-lines events from a TCP stream until the peer closes it."""
+
+    def __init__(self, host: str, port: int, timeout: Optional[float] = None) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def __iter__(self) -> Iterator[FeedEvent]:
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            with conn.makefile("r", encoding="utf-8") as stream:
+                for line in stream:
+                    if line.strip():
+                        yield FeedEvent.from_json(line)
+
+
+def serve_replay(
+    path: Union[str, Path],
+    host: str = "127.0.0.1",
+    port: int = 0,
+    speed: Optional[float] = None,
+    ready=None,
+) -> None:
+    """Stand-in exchange: stream a replay file to the first client that connects.
+
+    ``ready`` is called with the bound ``(host, port)`` once the server
+    listens, which lets callers pick ``port=0`` and learn the real port.
+    """
+    feed = FileFeed(path, speed=speed)
+    with socket.create_server((host, port)) as server:
+        if ready is not None:
+            ready(server.getsockname()[:2])
+        conn, _ = server.accept()
+        with conn, conn.makefile("w", encoding="utf-8") as stream:
+            for event in feed:
+                stream.write(event.to_json())
+                stream.write("\n")
+                if speed:
+                    stream.flush()
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest.cost_model import AskLadder, CostModel
+from backtest.risk import RiskManager
+from feature.make_features import TAU_BINS, TAU_LABELS
+from live.feed import FeedEvent
+
+_DAY_NS = 86_400 * 10**9
+
+
+@dataclass
+class PaperTradingConfig:
+    initial_capital: float = 100_000.0
+    min_ev: float = 0.0
+
+
+@dataclass
+class PaperSignal:
+    """A simulated entry, sized and costed against the latest book."""
+
+    timestamp: pd.Timestamp
+    trade_id: str
+    token_id: str
+    condition_id: str
+    price: float
+    q_hat: float
+    q_lower: float
+    ev_lower: float
+    shares: float
+    execution_price: float
+    notional: float
+    total_cost: float
+    capital: float
+
+
+@dataclass
+class _Market:
+    end_ns: int
+    category: Optional[str]
+    neg_risk_group: Optional[str]
+    slug: Optional[str]
+    category_id: int
+    neg_risk_id: int
+    market_id: int
+
+
+class _TokenState:
+    """Latest book and price for one token, updated in place per event."""
+
+    __slots__ = ("ladder", "best_bid", "ask_depth", "bid_depth", "last_price")
+
+    def __init__(self) -> None:
+        self.ladder: Optional[AskLadder] = None
+        self.best_bid = float("nan")
+        self.ask_depth = 0.0
+        self.bid_depth = 0.0
+        self.last_price: Optional[float] = None
+
+
+def _tau_bucket(tau_days: float) -> Optional[str]:
+    # Same right-closed bins as ``assign_tau_bucket``.
+    index = bisect_left(TAU_BINS, tau_days) - 1
+    if 0 <= index < len(TAU_LABELS):
+        return TAU_LABELS[index]
+    return None
+
+
+class PaperTrader:
+    """Score a live event stream with a pre-fitted calibrator and simulate entries.
+
+    Book and price events update per-token state; each trade event becomes
+    one feature row (the columns of :func:`feature.make_features.compute_features`
+    that are known before resolution), is scored, and goes through the same
+    Kelly, exposure-cap, cost and EV checks as :class:`backtest.engine.BacktestEngine`.
+    Resolution events settle the market's positions.  Handling time is
+    recorded for every event.
+    """
+
+    def __init__(
+        self,
+        calibrator,
+        markets: pd.DataFrame,
+        cost_model: Optional[CostModel] = None,
+        risk_manager: Optional[RiskManager] = None,
+        config: Optional[PaperTradingConfig] = None,
+    ) -> None:
+        self.calibrator = calibrator
+        self.cost_model = cost_model or CostModel()
+        self.risk_manager = risk_manager or RiskManager()
+        self.config = config or PaperTradingConfig()
+        self.capital = self.config.initial_capital
+        self.signals: List[PaperSignal] = []
+        self.realised_pnl = 0.0
+        self.skipped = 0
+        self._tokens: Dict[str, _TokenState] = {}
+        self._positions: Dict[str, List[PaperSignal]] = {}
+        self._latency_ns: Dict[str, List[int]] = {}
+
+        end_dates = pd.DatetimeIndex(pd.to_datetime(markets["end_date"], utc=True)).asi8
+        category_ids = self.risk_manager.encode("category", markets["category"])
+        neg_risk_ids = self.risk_manager.encode("neg_risk", markets["neg_risk_group"])
+        market_ids = self.risk_manager.encode("market", markets["condition_id"])
+        self._markets: Dict[str, _Market] = {}
+        for i, row in enumerate(markets[["condition_id", "category", "neg_risk_group", "slug"]].itertuples(index=False)):
+            self._markets[row.condition_id] = _Market(
+                end_ns=int(end_dates[i]),
+                category=row.category,
+                neg_risk_group=row.neg_risk_group,
+                slug=row.slug,
+                category_id=int(category_ids[i]),
+                neg_risk_id=int(neg_risk_ids[i]),
+                market_id=int(market_ids[i]),
+            )
+
+    def _token(self, token_id: str) -> _TokenState:
+        state = self._tokens.get(token_id)
+        if state is None:
+            state = self._tokens[token_id] = _TokenState()
+        return state
+
+    def on_event(self, event: FeedEvent) -> Optional[PaperSignal]:
+        """Apply one event; returns the signal if a trade event led to an entry."""
+        started = time.perf_counter_ns()
+        signal = None
+        if event.kind == "book":
+            self._on_book(event)
+        elif event.kind == "price":
+            self._token(event.payload["token_id"]).last_price = float(event.payload["price"])
+        elif event.kind == "trade":
+            signal = self._on_trade(event)
+        elif event.kind == "resolution":
+            self._on_resolution(event)
+        self._latency_ns.setdefault(event.kind, []).append(time.perf_counter_ns() - started)
+        return signal
+
+    def run(
+        self, feed: Iterable[FeedEvent], on_signal: Optional[Callable[[PaperSignal], None]] = None
+    ) -> Dict[str, object]:
+        """Consume ``feed`` until it ends and return :meth:`summary`."""
+        for event in feed:
+            signal = self.on_event(event)
+            if signal is not None and on_signal is not None:
+                on_signal(signal)
+        return self.summary()
+
+    def _on_book(self, event: FeedEvent) -> None:
+        state = self._token(event.payload["token_id"])
+        asks = event.payload.get("asks") or []
+        bids = event.payload.get("bids") or []
+        state.ladder = AskLadder.from_levels([p for p, _ in asks], [s for _, s in asks]) if asks else None
+        state.best_bid = float(bids[0][0]) if bids else float("nan")
+        state.ask_depth = float(sum(s for _, s in asks))
+        state.bid_depth = float(sum(s for _, s in bids))
+
+    def trade_features(self, event: FeedEvent) -> Optional[Dict[str, object]]:
+        """Feature row for a trade event, or ``None`` if it cannot be scored yet."""
+        payload = event.payload
+        market = self._markets.get(payload["condition_id"])
+        state = self._tokens.get(payload["token_id"])
+        if market is None or state is None or state.ladder is None or np.isnan(state.best_bid):
+            return None
+        tau_days = (market.end_ns - event.timestamp.value) / _DAY_NS
+        if tau_days <= 0:
+            return None
+
+        price = float(payload["price"])
+        best_ask = state.ladder.best_ask
+        best_bid = state.best_bid
+        midpoint = (best_ask + best_bid) / 2
+        prev_price = state.last_price if state.last_price is not None else midpoint - 0.01
+        return {
+            "trade_id": payload.get("trade_id"),
+            "token_id": payload["token_id"],
+            "condition_id": payload["condition_id"],
+            "timestamp": event.timestamp,
+            "price": price,
+            "size": float(payload.get("size", 0.0)),
+            "time_to_event_days": tau_days,
+            "tau_bucket": _tau_bucket(tau_days),
+            "best_ask": best_ask,
+            "best_bid": best_bid,
+            "spread": best_ask - best_bid,
+            "relative_spread": (best_ask - best_bid) / midpoint,
+            "ask_depth": state.ask_depth,
+            "bid_depth": state.bid_depth,
+            "price_vs_mid": price - midpoint,
+            "price_change": price - prev_price,
+            "category": market.category,
+            "neg_risk_group": market.neg_risk_group,
+            "slug": market.slug,
+        }
+
+    def _on_trade(self, event: FeedEvent) -> Optional[PaperSignal]:
+        features = self.trade_features(event)
+        if features is None:
+            self.skipped += 1
+            return None
+        scored = self.calibrator.transform(pd.DataFrame([features]))
+        q_hat = float(scored["q_hat"].iloc[0])
+        q_lower = float(scored["q_lower"].iloc[0])
+        if np.isnan(q_hat) or np.isnan(q_lower):
+            # Never scored, like a trade without features.
+            self.skipped += 1
+            return None
+
+        market = self._markets[features["condition_id"]]
+        ladder = self._tokens[features["token_id"]].ladder
+        price = features["price"]
+        capital = self.capital
+
+        fraction = self.risk_manager.kelly_fraction(q_hat, price)
+        if fraction <= 0:
+            return None
+        available_notional = self.risk_manager.available_notional_coded(
+            capital, market.category_id, market.neg_risk_id, market.market_id
+        )
+        target_notional = min(capital * fraction, available_notional)
+        if target_notional <= 0:
+            return None
+        size = ladder.size_for_notional(target_notional)
+        if size <= 0:
+            return None
+        breakdown = self.cost_model.estimate_cost(ladder, size, features["time_to_event_days"])
+        if breakdown.notional + breakdown.total_cost > capital:
+            return None
+        ev_lower = q_lower - breakdown.execution_price - breakdown.per_share_cost
+        if ev_lower <= self.config.min_ev:
+            return None
+
+        self.capital = capital - breakdown.notional - breakdown.total_cost
+        self.risk_manager.register_coded(
+            market.category_id, market.neg_risk_id, market.market_id, breakdown.notional
+        )
+        signal = PaperSignal(
+            timestamp=event.timestamp,
+            trade_id=features["trade_id"],
+            token_id=features["token_id"],
+            condition_id=features["condition_id"],
+            price=price,
+            q_hat=q_hat,
+            q_lower=q_lower,
+            ev_lower=ev_lower,
+            shares=breakdown.filled_size,
+            execution_price=breakdown.execution_price,
+            notional=breakdown.notional,
+            total_cost=breakdown.total_cost,
+            capital=self.capital,
+        )
+        self.signals.append(signal)
+        self._positions.setdefault(signal.condition_id, []).append(signal)
+        return signal
+
+    def _on_resolution(self, event: FeedEvent) -> None:
+        condition_id = event.payload["condition_id"]
+        outcome = 1 if str(event.payload["resolved_outcome"]).lower() == "yes" else 0
+        market = self._markets.get(condition_id)
+        for position in self._positions.pop(condition_id, []):
+            payout = position.shares * outcome
+            self.capital += payout
+            self.realised_pnl += payout - position.notional - position.total_cost
+            self.risk_manager.release_coded(
+                market.category_id, market.neg_risk_id, market.market_id, position.notional
+            )
+
+    @property
+    def open_positions(self) -> int:
+        return sum(len(positions) for positions in self._positions.values())
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """Per event kind (and ``"all"``): count, mean, p50, p99 and max in microseconds."""
+        summary = {}
+        groups = dict(self._latency_ns)
+        if groups:
+            groups["all"] = [value for values in self._latency_ns.values() for value in values]
+        for kind, values in groups.items():
+            micros = np.asarray(values, dtype=float) / 1_000.0
+            summary[kind] = {
+                "events": len(micros),
+                "mean_us": float(micros.mean()),
+                "p50_us": float(np.percentile(micros, 50)),
+                "p99_us": float(np.percentile(micros, 99)),
+                "max_us": float(micros.max()),
+            }
+        return summary
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "capital": self.capital,
+            "realised_pnl": self.realised_pnl,
+            "signals": len(self.signals),
+            "open_positions": self.open_positions,
+            "skipped_trades": self.skipped,
+            "latency": self.latency_summary(),
+        }
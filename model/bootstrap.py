@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from model.calibrate_isotonic import _pav
+
+
+@dataclass
+class BootstrapConfig:
+    """Settings for market-level bootstrap bands on the calibration curve."""
+
+    n_resamples: int = 1000
+    confidence: float = 0.9
+    tick_size: float = 0.01
+    seed: int = 0
+    n_workers: Optional[int] = None
+    chunk_size: int = 50
+
+
+@dataclass
+class _BootstrapState:
+    """Pre-encoded arrays shipped once to every worker."""
+
+    market_codes: np.ndarray
+    cell_codes: np.ndarray
+    outcomes: np.ndarray
+    n_markets: int
+    n_ticks: int
+    grid_buckets: np.ndarray
+    grid_ticks: np.ndarray
+    tick_size: float
+
+
+_WORKER_STATE: Optional[_BootstrapState] = None
+
+
+def _init_worker(state: _BootstrapState) -> None:
+    global _WORKER_STATE
+    _WORKER_STATE = state
+
+
+def _curve_from_weights(state: _BootstrapState, weights: np.ndarray) -> np.ndarray:
+    """Fit the tie-pooled isotonic curve per bucket and evaluate it on the grid."""
+    n_cells = int(state.grid_buckets.max() + 1) * state.n_ticks
+    trades = np.bincount(state.cell_codes, weights=weights, minlength=n_cells)
+    successes = np.bincount(state.cell_codes, weights=weights * state.outcomes, minlength=n_cells)
+    trades = trades.reshape(-1, state.n_ticks)
+    successes = successes.reshape(-1, state.n_ticks)
+
+    curve = np.full(len(state.grid_ticks), np.nan)
+    for bucket in np.unique(state.grid_buckets):
+        occupied = np.flatnonzero(trades[bucket])
+        if len(occupied) == 0:
+            continue
+        fitted = _pav(successes[bucket, occupied] / trades[bucket, occupied], trades[bucket, occupied])
+        mask = state.grid_buckets == bucket
+        curve[mask] = np.interp(state.grid_ticks[mask], occupied, fitted)
+    return curve
+
+
+def _resample_curves(state: _BootstrapState, seed: np.random.SeedSequence, n: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    curves = np.empty((n, len(state.grid_ticks)))
+    for i in range(n):
+        draws = rng.integers(0, state.n_markets, size=state.n_markets)
+        multiplicity = np.bincount(draws, minlength=state.n_markets).astype(float)
+        curves[i] = _curve_from_weights(state, multiplicity[state.market_codes])
+    return curves
+
+
+def _worker_resample(seed: np.random.SeedSequence, n: int) -> np.ndarray:
+    if _WORKER_STATE is None:
+        raise RuntimeError("Bootstrap worker was not initialised")
+    return _resample_curves(_WORKER_STATE, seed, n)
+
+
+def _encode(data: pd.DataFrame, tick_size: float) -> tuple[_BootstrapState, np.ndarray]:
+    n_ticks = int(round(1.0 / tick_size)) + 1
+    market_codes, markets = pd.factorize(data["condition_id"])
+    bucket_codes, buckets = pd.factorize(data["tau_bucket"].astype(str))
+    prices = data["price"].to_numpy(dtype=float)
+    ticks = np.clip(np.rint(prices / tick_size).astype(np.int64), 0, n_ticks - 1)
+    cell_codes = bucket_codes.astype(np.int64) * n_ticks + ticks
+
+    observed = np.unique(cell_codes)
+    state = _BootstrapState(
+        market_codes=market_codes.astype(np.int64),
+        cell_codes=cell_codes,
+        outcomes=data["outcome"].to_numpy(dtype=float),
+        n_markets=len(markets),
+        n_ticks=n_ticks,
+        grid_buckets=observed // n_ticks,
+        grid_ticks=observed % n_ticks,
+        tick_size=tick_size,
+    )
+    return state, np.asarray(buckets)
+
+
+def bootstrap_calibration_bands(
+    data: pd.DataFrame, config: Optional[BootstrapConfig] = None
+) -> pd.DataFrame:
+    """Percentile bands for the per-bucket isotonic curve, resampling markets.
+
+    Trades within one market share a single resolution, so resampling is done
+    over ``condition_id`` rather than individual trades.  Each resample draws
+    markets with replacement, refits the isotonic curve per ``tau_bucket`` on
+    the implied trade weights and evaluates it at every observed price tick.
+
+    Resamples are split into fixed-size chunks, each with its own child
+    ``SeedSequence`` spawned from ``config.seed``; results therefore do not
+    depend on ``n_workers``.
+    """
+    config = config or BootstrapConfig()
+    if {"price", "outcome", "tau_bucket", "condition_id"} - set(data.columns):
+        raise ValueError("Bootstrap data missing required columns")
+    if data.empty:
+        raise ValueError("Bootstrap data is empty")
+    if not 0 < config.confidence < 1:
+        raise ValueError("confidence must be in (0, 1)")
+    if config.chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    # Resampling is by market, so a trade without one has nothing to be drawn with.
+    if data["condition_id"].isnull().any():
+        raise ValueError("Bootstrap data has trades without a condition_id")
+
+    state, bucket_labels = _encode(data, config.tick_size)
+    point = _curve_from_weights(state, np.ones(len(state.cell_codes)))
+
+    chunk_sizes: List[int] = []
+    remaining = config.n_resamples
+    while remaining > 0:
+        chunk_sizes.append(min(config.chunk_size, remaining))
+        remaining -= chunk_sizes[-1]
+    seeds = np.random.SeedSequence(config.seed).spawn(len(chunk_sizes))
+
+    if config.n_workers == 1 or len(chunk_sizes) <= 1:
+        chunks = [_resample_curves(state, seed, n) for seed, n in zip(seeds, chunk_sizes)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=config.n_workers, initializer=_init_worker, initargs=(state,)
+        ) as pool:
+            chunks = list(pool.map(_worker_resample, seeds, chunk_sizes))
+
+    tail = (1.0 - config.confidence) / 2.0 * 100.0
+    if chunks:
+        curves = np.vstack(chunks)
+        with warnings.catch_warnings():
+            # A bucket can be absent from a resample; those draws are NaN.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            lower, upper = np.nanpercentile(curves, [tail, 100.0 - tail], axis=0)
+    else:
+        lower = upper = np.full(len(point), np.nan)
+
+    counts = np.bincount(state.cell_codes, minlength=int(state.grid_buckets.max() + 1) * state.n_ticks)
+    grid_cells = state.grid_buckets * state.n_ticks + state.grid_ticks
+    return pd.DataFrame(
+        {
+            "tau_bucket": bucket_labels[state.grid_buckets],
+            "price": state.grid_ticks * state.tick_size,
+            "q_hat": point,
+            "lower": lower,
+            "upper": upper,
+            "count": counts[grid_cells],
+        }
+    )
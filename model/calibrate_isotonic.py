@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Optional
+import json
+import struct
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
-from scipy.stats import beta
 
 
 @dataclass
@@ -15,16 +17,58 @@ class CalibrationConfig:
     min_count: int = 2
 
 
+ARTIFACT_MAGIC = b"PMCALIB\0"
+ARTIFACT_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_ALIGNMENT = 8
+
+
 @dataclass
 class _BucketModel:
     prices: np.ndarray
-    outcomes: np.ndarray
+    outcome_cumsum: np.ndarray
     xp: np.ndarray
     yp: np.ndarray
 
+    @property
+    def outcomes(self) -> np.ndarray:
+        return np.diff(self.outcome_cumsum)
+
     def predict_mean(self, price: float) -> float:
         return float(np.interp(price, self.xp, self.yp, left=self.yp[0], right=self.yp[-1]))
 
+    def window_stats(self, price: float, window: float) -> Tuple[int, float]:
+        """Count trades and successes with ``|prices - price| <= window``.
+
+        ``prices`` is sorted, so the window is a contiguous slice found by
+        binary search; the edges are re-checked against the exact distance
+        test so results match a full scan bit for bit.
+        """
+        prices = self.prices
+        lo = int(np.searchsorted(prices, price - window, side="left"))
+        hi = int(np.searchsorted(prices, price + window, side="right"))
+        while lo > 0 and abs(prices[lo - 1] - price) <= window:
+            lo -= 1
+        while lo < hi and abs(prices[lo] - price) > window:
+            lo += 1
+        while hi < len(prices) and abs(prices[hi] - price) <= window:
+            hi += 1
+        while hi > lo and abs(prices[hi - 1] - price) > window:
+            hi -= 1
+        successes = float(self.outcome_cumsum[hi] - self.outcome_cumsum[lo])
+        return hi - lo, successes
+
+
+def _jeffreys_lower(alpha: float, successes, failures):
+    """Lower ``alpha`` quantile of the Beta(successes + 1/2, failures + 1/2) posterior.
+
+    Same values as ``scipy.stats.beta.ppf``; ``scipy.special`` is imported on
+    first use because it is a large share of start-up time otherwise.
+    """
+    from scipy.special import betaincinv
+
+    return betaincinv(successes + 0.5, failures + 0.5, alpha)
+
 
 def _pav(y: np.ndarray, w: np.ndarray) -> np.ndarray:
     """Pool-adjacent-violators algorithm for isotonic regression."""
@@ -66,7 +110,12 @@ def _fit_bucket(prices: np.ndarray, outcomes: np.ndarray) -> _BucketModel:
     xp = aggregated["price"].to_numpy()
     yp = aggregated["fitted"].to_numpy()
 
-    return _BucketModel(prices=x, outcomes=y, xp=xp, yp=yp)
+    outcome_cumsum = np.concatenate(([0.0], np.cumsum(y, dtype=float)))
+    return _BucketModel(prices=x.astype(float), outcome_cumsum=outcome_cumsum, xp=xp, yp=yp)
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
 
 
 class IsotonicCalibrator:
@@ -94,23 +143,17 @@ class IsotonicCalibrator:
     def _lower_bound(self, model: _BucketModel, price: float) -> float:
         config = self.config
         window = config.neighborhood
-        prices = model.prices
-        outcomes = model.outcomes
 
-        distances = np.abs(prices - price)
-        mask = distances <= window
-        while mask.sum() < config.min_count and window < 0.1:
+        count, successes = model.window_stats(price, window)
+        while count < config.min_count and window < 0.1:
             window *= 1.5
-            mask = distances <= window
+            count, successes = model.window_stats(price, window)
 
-        count = mask.sum()
         if count == 0:
             return float("nan")
 
-        successes = outcomes[mask].sum()
         failures = count - successes
-        lb = beta.ppf(config.alpha, successes + 0.5, failures + 0.5)
-        return float(lb)
+        return float(_jeffreys_lower(config.alpha, successes, failures))
 
     def transform(self, data: pd.DataFrame) -> pd.DataFrame:
         if not self._models:
@@ -140,8 +183,7 @@ class IsotonicCalibrator:
                 count = 0
             else:
                 lb = min(lb, mean)
-                distances = np.abs(model.prices - row["price"])
-                count = int((distances <= self.config.neighborhood).sum())
+                count, _ = model.window_stats(row["price"], self.config.neighborhood)
             predictions.append(mean)
             lowers.append(lb)
             sample_counts.append(count)
@@ -151,3 +193,74 @@ class IsotonicCalibrator:
         result["q_lower"] = lowers
         result["sample_count"] = sample_counts
         return result
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the fitted bucket models to a compact binary artifact.
+
+        The file holds a fixed header (magic, format version, metadata
+        length), a JSON metadata block with the :class:`CalibrationConfig`
+        and per-bucket array offsets, then 8-byte aligned little-endian
+        float64 arrays: ``xp``, ``yp``, sorted training prices and outcome
+        prefix sums for each bucket.
+        """
+        if not self._models:
+            raise RuntimeError("Calibrator has not been fitted")
+
+        arrays = []
+        buckets = []
+        for key, model in self._models.items():
+            entry = {"key": key}
+            for name in ("xp", "yp", "prices", "outcome_cumsum"):
+                values = np.ascontiguousarray(getattr(model, name), dtype="<f8")
+                entry[name] = len(values)
+                arrays.append(values)
+            buckets.append(entry)
+
+        metadata = json.dumps({"config": asdict(self.config), "buckets": buckets}).encode("utf-8")
+        data_offset = _aligned(_HEADER.size + len(metadata))
+        with Path(path).open("wb") as handle:
+            handle.write(_HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION, len(metadata)))
+            handle.write(metadata)
+            handle.write(b"\0" * (data_offset - _HEADER.size - len(metadata)))
+            for values in arrays:
+                handle.write(values.tobytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "IsotonicCalibrator":
+        """Load an artifact written by :meth:`save` through a memory map.
+
+        Bucket arrays are read-only views into the mapped file, so loading
+        costs a header parse regardless of how much history was fitted.
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Calibrator artifact not found: {path}")
+
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"Calibrator artifact is truncated: {path}")
+        magic, version, metadata_len = _HEADER.unpack(bytes(buffer[: _HEADER.size]))
+        if magic != ARTIFACT_MAGIC:
+            raise ValueError(f"Not a calibrator artifact: {path}")
+        if version != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported calibrator artifact version {version}")
+
+        if len(buffer) < _HEADER.size + metadata_len:
+            raise ValueError(f"Calibrator artifact is truncated: {path}")
+        metadata = json.loads(bytes(buffer[_HEADER.size : _HEADER.size + metadata_len]))
+        calibrator = cls(CalibrationConfig(**metadata["config"]))
+        offset = _aligned(_HEADER.size + metadata_len)
+        names = ("xp", "yp", "prices", "outcome_cumsum")
+        end = offset + 8 * sum(entry[name] for entry in metadata["buckets"] for name in names)
+        if len(buffer) < end:
+            raise ValueError(f"Calibrator artifact is truncated: {path}")
+        for entry in metadata["buckets"]:
+            views = {}
+            for name in names:
+                length = entry[name]
+                views[name] = buffer[offset : offset + 8 * length].view("<f8")
+                offset += 8 * length
+            calibrator._models[entry["key"]] = _BucketModel(**views)
+        if not calibrator._models:
+            raise ValueError(f"Calibrator artifact holds no bucket models: {path}")
+        return calibrator
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model.calibrate_isotonic import CalibrationConfig, _jeffreys_lower
+
+
+@dataclass
+class GBDTConfig:
+    """Hyper-parameters for the monotone histogram GBDT calibrator."""
+
+    n_estimators: int = 100
+    learning_rate: float = 0.1
+    max_depth: int = 3
+    max_bins: int = 64
+    min_samples_leaf: int = 20
+    l2_regularization: float = 1.0
+    min_gain: float = 1e-6
+    features: Tuple[str, ...] = (
+        "price",
+        "time_to_event_days",
+        "spread",
+        "ask_depth",
+        "category",
+    )
+    categorical: Tuple[str, ...] = ("category",)
+    monotone_feature: str = "price"
+    calibration: CalibrationConfig = field(default_factory=CalibrationConfig)
+
+
+@dataclass
+class _Tree:
+    """Flat tree whose leaves loop back to themselves.
+
+    Leaves route every bin to their own index, so prediction is exactly
+    ``depth`` vectorised steps with no per-row masking.
+    """
+
+    feature: np.ndarray
+    left_bins: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    depth: int
+
+    def apply(self, columns: np.ndarray) -> np.ndarray:
+        rows = np.arange(columns.shape[1])
+        node = np.zeros(columns.shape[1], dtype=np.int64)
+        for _ in range(self.depth):
+            go_left = self.left_bins[node, columns[self.feature[node], rows]]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+
+class _FeatureBinner:
+    """Quantile bins for numeric columns and code tables for categoricals.
+
+    Bin ``n_bins - 1`` is reserved for missing values and unseen categories.
+    """
+
+    def __init__(
+        self, features: Tuple[str, ...], categorical: Tuple[str, ...], max_bins: int
+    ) -> None:
+        if not 4 <= max_bins <= 256:
+            raise ValueError("max_bins must be between 4 and 256")
+        self.features = features
+        self.categorical = set(categorical)
+        self.n_bins = max_bins
+        self._edges: Dict[str, np.ndarray] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+
+    def fit(self, data: pd.DataFrame) -> "_FeatureBinner":
+        for name in self.features:
+            if name in self.categorical:
+                values = data[name].astype(str).unique()
+                counts = data[name].astype(str).value_counts()
+                ranked = sorted(values, key=lambda value: -counts[value])
+                self._codes[name] = {value: i for i, value in enumerate(ranked[: self.n_bins - 1])}
+            else:
+                values = data[name].to_numpy(dtype=float)
+                values = values[~np.isnan(values)]
+                if len(values) == 0:
+                    self._edges[name] = np.empty(0)
+                    continue
+                quantiles = np.linspace(0, 1, self.n_bins - 1)[1:-1]
+                self._edges[name] = np.unique(np.quantile(values, quantiles))
+        return self
+
+    def transform(self, data: pd.DataFrame) -> np.ndarray:
+        """Return bins feature-major, shape ``(features, rows)``."""
+        bins = np.empty((len(self.features), len(data)), dtype=np.uint8)
+        missing_bin = self.n_bins - 1
+        for j, name in enumerate(self.features):
+            if name in self.categorical:
+                codes = data[name].astype(str).map(self._codes[name])
+                bins[j] = codes.fillna(missing_bin).to_numpy(dtype=np.uint8)
+            else:
+                values = data[name].to_numpy(dtype=float)
+                column = np.searchsorted(self._edges[name], values, side="right")
+                column[np.isnan(values)] = missing_bin
+                bins[j] = column
+        return bins
+
+
+def _sigmoid(raw: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-raw))
+
+
+class MonotoneGBDTCalibrator:
+    """Gradient-boosted log-loss model with a non-decreasing effect of price.
+
+    Features are binned once up front and each tree is grown level-wise from
+    per-node gradient histograms built with ``np.bincount``, so training cost
+    is a handful of linear passes over a ``uint8`` matrix per level.  Splits on
+    the monotone feature must order the child values and tighten the value
+    bounds passed to descendants, which keeps every tree (and therefore the
+    ensemble) non-decreasing in price.
+
+    ``q_lower`` applies the Jeffreys bound used by :class:`IsotonicCalibrator`
+    to the model estimate, with the effective sample size taken from training
+    trades within ``calibration.neighborhood`` of the price in the same tau
+    bucket.
+    """
+
+    def __init__(self, config: Optional[GBDTConfig] = None) -> None:
+        self.config = config or GBDTConfig()
+        if self.config.monotone_feature not in self.config.features:
+            raise ValueError("monotone_feature must be one of the model features")
+        self.feature_columns: List[str] = list(self.config.features)
+        self._binner: Optional[_FeatureBinner] = None
+        self._trees: List[_Tree] = []
+        self._base_score = 0.0
+        self._bucket_prices: Dict[str, np.ndarray] = {}
+
+    def _check_columns(self, data: pd.DataFrame, required: set) -> None:
+        if missing := (required - set(data.columns)):
+            raise ValueError(f"Missing columns for GBDT calibrator: {missing}")
+
+    def _best_splits(
+        self,
+        hist_g: np.ndarray,
+        hist_h: np.ndarray,
+        hist_n: np.ndarray,
+        bounds: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Best split per node over all features.
+
+        Histograms are shaped ``(features, nodes, bins)``.  Returns per node
+        the gain, feature index, boolean left-bin mask and child values.
+        """
+        config = self.config
+        lam = config.l2_regularization
+        n_features, n_nodes, n_bins = hist_g.shape
+        best_gain = np.full(n_nodes, -np.inf)
+        best_feature = np.full(n_nodes, -1, dtype=np.int64)
+        best_mask = np.zeros((n_nodes, n_bins), dtype=bool)
+        best_values = np.zeros((n_nodes, 2))
+
+        total_g = hist_g[0].sum(axis=1, keepdims=True)
+        total_h = hist_h[0].sum(axis=1, keepdims=True)
+        total_n = hist_n[0].sum(axis=1, keepdims=True)
+        parent_score = total_g**2 / (total_h + lam)
+
+        for j, name in enumerate(self.config.features):
+            g, h, n = hist_g[j], hist_h[j], hist_n[j]
+            if name in self._binner.categorical:
+                ratio = np.where(n > 0, g / (h + lam), np.inf)
+                order = np.argsort(ratio, axis=1, kind="stable")
+            else:
+                order = np.broadcast_to(np.arange(n_bins), (n_nodes, n_bins))
+            g_sorted = np.take_along_axis(g, order, axis=1)
+            h_sorted = np.take_along_axis(h, order, axis=1)
+            n_sorted = np.take_along_axis(n, order, axis=1)
+            gl = np.cumsum(g_sorted, axis=1)[:, :-1]
+            hl = np.cumsum(h_sorted, axis=1)[:, :-1]
+            nl = np.cumsum(n_sorted, axis=1)[:, :-1]
+            gr, hr, nr = total_g - gl, total_h - hl, total_n - nl
+
+            wl = np.clip(-gl / (hl + lam), bounds[:, :1], bounds[:, 1:])
+            wr = np.clip(-gr / (hr + lam), bounds[:, :1], bounds[:, 1:])
+            gain = -(2 * gl * wl + (hl + lam) * wl**2) - (2 * gr * wr + (hr + lam) * wr**2)
+            gain = gain - parent_score
+            valid = (nl >= config.min_samples_leaf) & (nr >= config.min_samples_leaf)
+            if name == config.monotone_feature:
+                valid &= wl <= wr
+            gain = np.where(valid, gain, -np.inf)
+
+            cut = np.argmax(gain, axis=1)
+            node_gain = gain[np.arange(n_nodes), cut]
+            improved = node_gain > best_gain
+            if not improved.any():
+                continue
+            best_gain[improved] = node_gain[improved]
+            best_feature[improved] = j
+            rank = np.empty_like(order)
+            positions = np.broadcast_to(np.arange(n_bins), (n_nodes, n_bins))
+            np.put_along_axis(rank, order, positions, axis=1)
+            best_mask[improved] = rank[improved] <= cut[improved, None]
+            best_values[improved, 0] = wl[improved, cut[improved]]
+            best_values[improved, 1] = wr[improved, cut[improved]]
+        return best_gain, best_feature, best_mask, best_values
+
+    def _grow_tree(
+        self, columns: np.ndarray, grad: np.ndarray, hess: np.ndarray
+    ) -> Tuple[_Tree, np.ndarray]:
+        """Grow one tree level-wise; return it with the leaf index of every row.
+
+        ``columns`` holds the bins feature-major, shape ``(features, rows)``.
+        Rows sitting in finished leaves are parked in a trailing dummy slot so
+        every histogram is a single ``bincount`` over all rows.
+        """
+        config = self.config
+        lam = config.l2_regularization
+        n_bins = self._binner.n_bins
+        n_features, n_rows = columns.shape
+        monotone_index = config.features.index(config.monotone_feature)
+
+        feature: List[int] = [0]
+        left_bins: List[np.ndarray] = [np.ones(n_bins, dtype=bool)]
+        left: List[int] = [0]
+        right: List[int] = [0]
+        value: List[float] = [0.0]
+
+        slot = np.zeros(n_rows, dtype=np.int64)
+        node_of_row = np.zeros(n_rows, dtype=np.int64)
+        active_nodes = np.array([0])
+        bounds = np.array([[-np.inf, np.inf]])
+        depth = 0
+
+        while True:
+            n_active = len(active_nodes)
+            node_g = np.bincount(slot, weights=grad, minlength=n_active + 1)[:n_active]
+            node_h = np.bincount(slot, weights=hess, minlength=n_active + 1)[:n_active]
+            leaf_values = np.clip(-node_g / (node_h + lam), bounds[:, 0], bounds[:, 1])
+            for k, node in enumerate(active_nodes):
+                value[node] = float(leaf_values[k])
+            if depth == config.max_depth:
+                break
+
+            n_cells = n_active * n_bins
+            size = n_cells + n_bins
+            hist_g = np.empty((n_features, n_cells))
+            hist_h = np.empty((n_features, n_cells))
+            hist_n = np.empty((n_features, n_cells))
+            base = slot * n_bins
+            for j in range(n_features):
+                keys = base + columns[j]
+                hist_g[j] = np.bincount(keys, weights=grad, minlength=size)[:n_cells]
+                hist_h[j] = np.bincount(keys, weights=hess, minlength=size)[:n_cells]
+                hist_n[j] = np.bincount(keys, minlength=size)[:n_cells]
+            shape = (n_features, n_active, n_bins)
+            gain, split_feature, masks, child_values = self._best_splits(
+                hist_g.reshape(shape), hist_h.reshape(shape), hist_n.reshape(shape), bounds
+            )
+
+            split = np.isfinite(gain) & (gain > config.min_gain)
+            if not split.any():
+                break
+
+            next_nodes: List[int] = []
+            next_bounds: List[Tuple[float, float]] = []
+            # Slot ``n_active`` is the dummy for finished rows; unsplit nodes
+            # and the dummy both map to the next level's dummy slot.
+            n_split = int(split.sum())
+            remap_left = np.full(n_active + 1, 2 * n_split, dtype=np.int64)
+            remap_right = np.full(n_active + 1, 2 * n_split, dtype=np.int64)
+            for k in np.flatnonzero(split):
+                node = int(active_nodes[k])
+                lo, hi = bounds[k]
+                left_id, right_id = len(value), len(value) + 1
+                feature[node] = int(split_feature[k])
+                left_bins[node] = masks[k]
+                left[node], right[node] = left_id, right_id
+                feature.extend([0, 0])
+                left_bins.extend([np.ones(n_bins, dtype=bool)] * 2)
+                left.extend([left_id, right_id])
+                right.extend([left_id, right_id])
+                value.extend([0.0, 0.0])
+                if split_feature[k] == monotone_index:
+                    mid = float(child_values[k].mean())
+                    next_bounds.extend([(lo, min(hi, mid)), (max(lo, mid), hi)])
+                else:
+                    next_bounds.extend([(lo, hi), (lo, hi)])
+                remap_left[k] = len(next_nodes)
+                remap_right[k] = len(next_nodes) + 1
+                next_nodes.extend([left_id, right_id])
+
+            slot_feature = np.append(np.where(split, split_feature, 0), 0)
+            slot_masks = np.vstack(
+                [np.where(split[:, None], masks, False), np.zeros(n_bins, dtype=bool)]
+            )
+            goes_left = slot_masks[slot, columns[slot_feature[slot], np.arange(n_rows)]]
+            slot = np.where(goes_left, remap_left[slot], remap_right[slot])
+            active_nodes = np.array(next_nodes)
+            moved = slot < len(next_nodes)
+            node_of_row[moved] = active_nodes[slot[moved]]
+            bounds = np.array(next_bounds)
+            depth += 1
+
+        tree = _Tree(
+            feature=np.array(feature, dtype=np.int64),
+            left_bins=np.vstack(left_bins),
+            left=np.array(left, dtype=np.int64),
+            right=np.array(right, dtype=np.int64),
+            value=np.array(value) * config.learning_rate,
+            depth=depth,
+        )
+        return tree, node_of_row
+
+    def fit(self, data: pd.DataFrame) -> None:
+        if data.empty:
+            raise ValueError("Training data is empty")
+        self._check_columns(data, {"outcome", "tau_bucket", *self.config.features})
+
+        config = self.config
+        self._binner = _FeatureBinner(config.features, config.categorical, config.max_bins)
+        columns = self._binner.fit(data).transform(data)
+        outcomes = data["outcome"].to_numpy(dtype=float)
+
+        mean = float(np.clip(outcomes.mean(), 1e-6, 1 - 1e-6))
+        self._base_score = float(np.log(mean / (1 - mean)))
+        raw = np.full(len(data), self._base_score)
+        self._trees = []
+        for _ in range(config.n_estimators):
+            prob = _sigmoid(raw)
+            hess = np.maximum(prob * (1 - prob), 1e-12)
+            tree, leaves = self._grow_tree(columns, prob - outcomes, hess)
+            self._trees.append(tree)
+            raw += tree.value[leaves]
+
+        prices = data["price"].to_numpy(dtype=float)
+        bucket_keys = data["tau_bucket"].astype(str).to_numpy()
+        self._bucket_prices = {
+            key: np.sort(prices[bucket_keys == key]) for key in np.unique(bucket_keys)
+        }
+
+    def predict_raw(self, data: pd.DataFrame) -> np.ndarray:
+        if self._binner is None:
+            raise RuntimeError("Calibrator has not been fitted")
+        columns = self._binner.transform(data)
+        raw = np.full(len(data), self._base_score)
+        for tree in self._trees:
+            raw += tree.value[tree.apply(columns)]
+        return raw
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        self._check_columns(data, {"tau_bucket", *self.config.features})
+        q_hat = _sigmoid(self.predict_raw(data))
+
+        calibration = self.config.calibration
+        prices = data["price"].to_numpy(dtype=float)
+        bucket_keys = data["tau_bucket"].astype(str).to_numpy()
+        counts = np.zeros(len(data), dtype=np.int64)
+        for key, train_prices in self._bucket_prices.items():
+            mask = bucket_keys == key
+            if not mask.any():
+                continue
+            window = calibration.neighborhood
+            lo = np.searchsorted(train_prices, prices[mask] - window, side="left")
+            hi = np.searchsorted(train_prices, prices[mask] + window, side="right")
+            counts[mask] = hi - lo
+
+        q_lower = q_hat.copy()
+        has_data = counts > 0
+        successes = q_hat[has_data] * counts[has_data]
+        q_lower[has_data] = np.minimum(
+            _jeffreys_lower(calibration.alpha, successes, counts[has_data] - successes),
+            q_hat[has_data],
+        )
+
+        result = data.copy()
+        result["q_hat"] = q_hat
+        result["q_lower"] = q_lower
+        result["sample_count"] = counts
+        return result
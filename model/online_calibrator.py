@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from model.calibrate_isotonic import CalibrationConfig, _jeffreys_lower, _pav
+
+_MAX_WINDOW = 0.1
+
+
+@dataclass
+class _HistogramBucket:
+    """Per-tick sufficient statistics for a single tau bucket."""
+
+    trades: np.ndarray
+    successes: np.ndarray
+
+
+@dataclass
+class _SnapshotBucket:
+    xp: np.ndarray
+    yp: np.ndarray
+    trades_cumsum: np.ndarray
+    successes_cumsum: np.ndarray
+
+
+class CalibrationSnapshot:
+    """Frozen isotonic fit derived from a histogram state.
+
+    Exposes the same ``transform`` contract as :class:`IsotonicCalibrator` so
+    the backtest engine can score test rows without knowing which calibrator
+    produced it.
+    """
+
+    def __init__(
+        self,
+        config: CalibrationConfig,
+        tick_size: float,
+        buckets: Dict[str, _SnapshotBucket],
+    ) -> None:
+        self.config = config
+        self.tick_size = tick_size
+        self._buckets = buckets
+
+    def _window_counts(
+        self, bucket: _SnapshotBucket, prices: np.ndarray, window: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        n_ticks = len(bucket.trades_cumsum) - 1
+        lo = np.ceil((prices - window) / self.tick_size - 1e-9).astype(np.int64)
+        hi = np.floor((prices + window) / self.tick_size + 1e-9).astype(np.int64)
+        lo = np.clip(lo, 0, n_ticks)
+        hi = np.clip(hi + 1, 0, n_ticks)
+        hi = np.maximum(hi, lo)
+        counts = bucket.trades_cumsum[hi] - bucket.trades_cumsum[lo]
+        successes = bucket.successes_cumsum[hi] - bucket.successes_cumsum[lo]
+        return counts, successes
+
+    def _predict_bucket(
+        self, bucket: _SnapshotBucket, prices: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        config = self.config
+        mean = np.interp(prices, bucket.xp, bucket.yp, left=bucket.yp[0], right=bucket.yp[-1])
+
+        window = np.full(len(prices), config.neighborhood, dtype=float)
+        base_counts, successes = self._window_counts(bucket, prices, window)
+        counts = base_counts.copy()
+        # Mirror IsotonicCalibrator._lower_bound: widen sparse windows by 1.5x
+        # until ``min_count`` observations are found or the cap is reached.
+        widen = (counts < config.min_count) & (window < _MAX_WINDOW)
+        while widen.any():
+            window[widen] *= 1.5
+            new_counts, new_successes = self._window_counts(bucket, prices[widen], window[widen])
+            counts[widen] = new_counts
+            successes[widen] = new_successes
+            widen = (counts < config.min_count) & (window < _MAX_WINDOW)
+
+        lower = np.full(len(prices), np.nan)
+        has_data = counts > 0
+        if has_data.any():
+            failures = counts[has_data] - successes[has_data]
+            lower[has_data] = _jeffreys_lower(config.alpha, successes[has_data], failures)
+        lower = np.where(has_data, np.minimum(lower, mean), mean)
+        sample_counts = np.where(has_data, base_counts, 0)
+        return mean, lower, sample_counts
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        required = {"price", "tau_bucket"}
+        if missing := (required - set(data.columns)):
+            raise ValueError(f"Missing columns for transform: {missing}")
+
+        prices = data["price"].to_numpy(dtype=float)
+        bucket_keys = data["tau_bucket"].astype(str).to_numpy()
+        q_hat = np.full(len(data), np.nan)
+        q_lower = np.full(len(data), np.nan)
+        sample_counts = np.zeros(len(data), dtype=np.int64)
+
+        for key, bucket in self._buckets.items():
+            mask = bucket_keys == key
+            if not mask.any():
+                continue
+            mean, lower, counts = self._predict_bucket(bucket, prices[mask])
+            q_hat[mask] = mean
+            q_lower[mask] = lower
+            sample_counts[mask] = counts
+
+        result = data.copy()
+        result["q_hat"] = q_hat
+        result["q_lower"] = q_lower
+        result["sample_count"] = sample_counts
+        return result
+
+
+class OnlineIsotonicCalibrator:
+    """Isotonic calibrator backed by per-tick ``(trades, successes)`` counts.
+
+    Each tau bucket keeps two integer histograms over the price grid, so
+    memory is bounded by ``buckets x ticks`` regardless of how much history
+    has been folded in.  ``partial_fit`` adds new rows to the histograms and
+    ``snapshot`` produces a frozen :class:`CalibrationSnapshot` for scoring.
+
+    For prices that lie on the tick grid the snapshot reproduces the
+    Jeffreys lower bounds of :class:`IsotonicCalibrator` exactly.  The mean
+    curve pools tied prices before running PAV, whereas the per-trade fit
+    depends on the order in which tied outcomes happen to arrive.
+    """
+
+    def __init__(
+        self,
+        config: Optional[CalibrationConfig] = None,
+        tick_size: float = 0.001,
+    ) -> None:
+        if tick_size <= 0 or tick_size > 1:
+            raise ValueError("tick_size must be in (0, 1]")
+        self.config = config or CalibrationConfig()
+        self.tick_size = tick_size
+        self.n_ticks = int(round(1.0 / tick_size)) + 1
+        self._histograms: Dict[str, _HistogramBucket] = {}
+        self._snapshot: Optional[CalibrationSnapshot] = None
+
+    @property
+    def n_observations(self) -> int:
+        return int(sum(h.trades.sum() for h in self._histograms.values()))
+
+    def reset(self) -> None:
+        self._histograms = {}
+        self._snapshot = None
+
+    def fit(self, data: pd.DataFrame) -> None:
+        self.reset()
+        self.partial_fit(data)
+        if not self._histograms:
+            raise ValueError("No bucket models were fitted")
+
+    def partial_fit(self, data: pd.DataFrame) -> "OnlineIsotonicCalibrator":
+        if {"price", "outcome", "tau_bucket"} - set(data.columns):
+            raise ValueError("Training data missing required columns")
+        if data.empty:
+            return self
+
+        prices = data["price"].to_numpy(dtype=float)
+        outcomes = data["outcome"].to_numpy(dtype=float)
+        ticks = np.clip(np.rint(prices / self.tick_size).astype(np.int64), 0, self.n_ticks - 1)
+        bucket_keys = data["tau_bucket"].astype(str).to_numpy()
+
+        for key in np.unique(bucket_keys):
+            mask = bucket_keys == key
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = _HistogramBucket(
+                    trades=np.zeros(self.n_ticks, dtype=np.int64),
+                    successes=np.zeros(self.n_ticks, dtype=np.int64),
+                )
+                self._histograms[key] = histogram
+            histogram.trades += np.bincount(ticks[mask], minlength=self.n_ticks)
+            histogram.successes += np.bincount(
+                ticks[mask], weights=outcomes[mask], minlength=self.n_ticks
+            ).round().astype(np.int64)
+
+        self._snapshot = None
+        return self
+
+    def snapshot(self) -> CalibrationSnapshot:
+        if not self._histograms:
+            raise RuntimeError("Calibrator has not been fitted")
+        if self._snapshot is not None:
+            return self._snapshot
+
+        buckets: Dict[str, _SnapshotBucket] = {}
+        for key, histogram in self._histograms.items():
+            occupied = np.flatnonzero(histogram.trades)
+            if len(occupied) == 0:
+                continue
+            weights = histogram.trades[occupied].astype(float)
+            rates = histogram.successes[occupied] / weights
+            buckets[key] = _SnapshotBucket(
+                xp=occupied * self.tick_size,
+                yp=_pav(rates, weights),
+                trades_cumsum=np.concatenate(([0], np.cumsum(histogram.trades))),
+                successes_cumsum=np.concatenate(([0], np.cumsum(histogram.successes))),
+            )
+        self._snapshot = CalibrationSnapshot(self.config, self.tick_size, buckets)
+        return self._snapshot
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self.snapshot().transform(data)
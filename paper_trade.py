@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Tuple
+
+# Each mode imports only what it uses, so ``--help`` returns immediately.
+if TYPE_CHECKING:
+    from live.paper_trader import PaperSignal
+
+
+def _parse_address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    if not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(f"Expected HOST:PORT, got {value!r}")
+    return host, int(port)
+
+
+def _print_signal(signal: PaperSignal) -> None:
+    record = asdict(signal)
+    record["timestamp"] = signal.timestamp.isoformat()
+    print(json.dumps(record), flush=True)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Paper-trade a market event stream with a fitted calibrator")
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path(__file__).resolve().parent / "data",
+        help="Directory with local fixtures (market metadata, and inputs for --write-replay/--fit-calibrator)",
+    )
+    parser.add_argument(
+        "--write-replay",
+        type=Path,
+        help="Write the local fixtures as a JSON-lines event file and exit",
+    )
+    parser.add_argument(
+        "--fit-calibrator",
+        type=Path,
+        help="Fit an isotonic calibrator on the local fixtures, save it here and exit",
+    )
+    parser.add_argument(
+        "--serve",
+        type=_parse_address,
+        metavar="HOST:PORT",
+        help="Stream --replay to one TCP client instead of trading",
+    )
+    parser.add_argument("--calibrator", type=Path, help="Calibrator artifact written by --fit-calibrator")
+    parser.add_argument("--replay", type=Path, help="JSON-lines event file to replay")
+    parser.add_argument(
+        "--connect",
+        type=_parse_address,
+        metavar="HOST:PORT",
+        help="Read events from a TCP feed instead of --replay",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        help="Pace replayed events at this multiple of market time (default: as fast as possible)",
+    )
+    parser.add_argument("--initial-capital", type=float, default=100_000.0, help="Initial paper capital")
+    parser.add_argument(
+        "--min-ev",
+        type=float,
+        default=0.0,
+        help="Minimum EV lower-bound threshold required to trade",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.write_replay is not None:
+        from ingest.data_bundle import load_local_bundle
+        from live.feed import bundle_events, write_replay
+
+        count = write_replay(bundle_events(load_local_bundle(args.data_dir)), args.write_replay)
+        print(f"Wrote {count} events to {args.write_replay}")
+        raise SystemExit(0)
+    if args.fit_calibrator is not None:
+        from feature.make_features import compute_features
+        from feature.make_labels import attach_labels
+        from ingest.data_bundle import load_local_bundle
+        from model.calibrate_isotonic import IsotonicCalibrator
+
+        bundle = load_local_bundle(args.data_dir)
+        features = compute_features(
+            attach_labels(bundle.trades, bundle.resolutions), bundle.markets, bundle.books, bundle.prices
+        )
+        calibrator = IsotonicCalibrator()
+        calibrator.fit(features)
+        calibrator.save(args.fit_calibrator)
+        print(f"Saved calibrator fitted on {len(features)} trades to {args.fit_calibrator}")
+        raise SystemExit(0)
+    if args.serve is not None:
+        if args.replay is None:
+            raise SystemExit("--serve needs --replay")
+        from live.feed import serve_replay
+
+        serve_replay(
+            args.replay,
+            *args.serve,
+            speed=args.speed,
+            ready=lambda address: print(f"Serving {args.replay} on {address[0]}:{address[1]}", flush=True),
+        )
+        raise SystemExit(0)
+
+    if args.calibrator is None or (args.replay is None and args.connect is None):
+        raise SystemExit("Paper trading needs --calibrator and either --replay or --connect")
+    from backtest.cost_model import CostModel
+    from backtest.risk import RiskManager
+    from ingest.gamma_markets_loader import load_gamma_markets
+    from live.feed import FileFeed, SocketFeed
+    from live.paper_trader import PaperTrader, PaperTradingConfig
+    from model.calibrate_isotonic import IsotonicCalibrator
+
+    feed = SocketFeed(*args.connect) if args.connect is not None else FileFeed(args.replay, speed=args.speed)
+    trader = PaperTrader(
+        IsotonicCalibrator.load(args.calibrator),
+        load_gamma_markets(args.data_dir / "gamma_markets_sample.json"),
+        CostModel(),
+        RiskManager(),
+        PaperTradingConfig(initial_capital=args.initial_capital, min_ev=args.min_ev),
+    )
+    summary = trader.run(feed, on_signal=_print_signal)
+    print("=== Paper Trading Summary ===")
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from report.metrics import (
+    _DAY_NS,
+    _MIN_HOLDING_DAYS,
+    TradesLike,
+    risk_adjusted_from_tallies,
+    trade_columns,
+)
+
+
+class MetricAccumulator:
+    """Report metrics kept as running tallies, one settlement at a time.
+
+    Holds Welford mean/variance of per-trade returns, win and Brier tallies,
+    the realised PnL path's peak, trough and maximum drawdown, and per-month
+    and per-calibration-bin sums, plus per-day PnL and holding-period
+    tallies for the risk-adjusted figures, so the full report is available
+    at any point without retaining trades.  :meth:`report` matches
+    :func:`report.metrics.compute_report` over the same trades.
+
+    :meth:`merge` combines accumulators as if ``other``'s settlements came
+    after this one's.  Counts, sums and moments merge exactly in any order;
+    peak and drawdown describe the concatenated PnL path, which is exact for
+    workers that processed consecutive slices of one timeline.
+    """
+
+    def __init__(self, n_bins: int = 5) -> None:
+        self.n_bins = n_bins
+        self.edges = np.linspace(0.5, 1.0, n_bins + 1)
+        self.trades = 0
+        self.wins = 0
+        self.total_pnl = 0.0
+        self.total_notional = 0.0
+        self.total_cost = 0.0
+        # Welford state for returns on trades with positive notional.
+        self.returns = 0
+        self.mean_return = 0.0
+        self.m2_return = 0.0
+        self.squared_error = 0.0
+        # Cumulative realised PnL path, starting from zero.  Its drawdown is
+        # in currency, unlike the fraction of equity ``risk_adjusted`` reports
+        # as ``max_drawdown``, hence the ``_pnl`` suffix.
+        self.peak = 0.0
+        self.trough = 0.0
+        self.max_drawdown_pnl = 0.0
+        # Month (months since 1970-01) -> [pnl, notional, count].
+        self.months: Dict[int, List[float]] = {}
+        self.bin_counts = [0] * n_bins
+        self.bin_predictions = [0.0] * n_bins
+        self.bin_outcomes = [0.0] * n_bins
+        # UTC day number -> realised PnL, and holding-period weighted sums.
+        self.days: Dict[int, float] = {}
+        self.first_entry_ns: Optional[int] = None
+        self.capital_days = 0.0
+        self.annualised_edge_sum = 0.0
+        self._edge_list = self.edges.tolist()
+        self._month_range = (0, -1, 0)
+
+    def _month(self, resolve_ns: int) -> int:
+        start, stop, key = self._month_range
+        if start <= resolve_ns < stop:
+            return key
+        month = np.datetime64(int(resolve_ns), "ns").astype("datetime64[M]")
+        start = int(month.astype("datetime64[ns]").astype(np.int64))
+        stop = int((month + 1).astype("datetime64[ns]").astype(np.int64))
+        key = int(month.astype(np.int64))
+        self._month_range = (start, stop, key)
+        return key
+
+    def _bin(self, q_hat: float) -> int:
+        # Right-closed bins with the lowest edge included, as ``pd.cut``.
+        edges = self._edge_list
+        if not edges[0] <= q_hat <= edges[-1]:
+            return -1
+        return max(bisect_left(edges, q_hat) - 1, 0)
+
+    def update(
+        self,
+        entry_ns: int,
+        resolve_ns: int,
+        pnl: float,
+        notional: float,
+        total_cost: float,
+        payout: float,
+        q_hat: float,
+    ) -> None:
+        """Add one settled trade."""
+        self.trades += 1
+        self.total_pnl += pnl
+        self.total_notional += notional
+        self.total_cost += total_cost
+        if payout >= notional:
+            self.wins += 1
+        holding_days = max((resolve_ns - entry_ns) / _DAY_NS, _MIN_HOLDING_DAYS)
+        self.capital_days += notional * holding_days
+        if notional > 0:
+            self.returns += 1
+            value = pnl / notional
+            delta = value - self.mean_return
+            self.mean_return += delta / self.returns
+            self.m2_return += delta * (value - self.mean_return)
+            self.annualised_edge_sum += value * 365.0 / holding_days
+        if self.first_entry_ns is None or entry_ns < self.first_entry_ns:
+            self.first_entry_ns = entry_ns
+        day = resolve_ns // _DAY_NS
+        self.days[day] = self.days.get(day, 0.0) + pnl
+        outcome = 1.0 if payout > 0 else 0.0
+        self.squared_error += (q_hat - outcome) ** 2
+
+        if self.total_pnl > self.peak:
+            self.peak = self.total_pnl
+        elif self.total_pnl < self.trough:
+            self.trough = self.total_pnl
+        drawdown = self.peak - self.total_pnl
+        if drawdown > self.max_drawdown_pnl:
+            self.max_drawdown_pnl = drawdown
+
+        key = self._month(resolve_ns)
+        tally = self.months.get(key)
+        if tally is None:
+            tally = self.months[key] = [0.0, 0.0, 0]
+        tally[0] += pnl
+        tally[1] += notional
+        tally[2] += 1
+
+        index = self._bin(q_hat)
+        if index >= 0:
+            self.bin_counts[index] += 1
+            self.bin_predictions[index] += q_hat
+            self.bin_outcomes[index] += outcome
+
+    @classmethod
+    def from_trades(cls, trades: TradesLike, n_bins: int = 5) -> "MetricAccumulator":
+        """Accumulate already settled trades (in settlement order) with array reductions."""
+        columns = trade_columns(trades)
+        acc = cls(n_bins)
+        pnl = columns["pnl"]
+        notional = columns["notional"]
+        payout = columns["payout"]
+        q_hat = columns["q_hat"]
+        if len(pnl) == 0:
+            return acc
+
+        acc.trades = len(pnl)
+        acc.wins = int((payout >= notional).sum())
+        acc.total_pnl = float(pnl.sum())
+        acc.total_notional = float(notional.sum())
+        acc.total_cost = float(columns["total_cost"].sum())
+        funded = notional > 0
+        returns = pnl[funded] / notional[funded]
+        acc.returns = len(returns)
+        if acc.returns:
+            acc.mean_return = float(returns.mean())
+            acc.m2_return = float(((returns - acc.mean_return) ** 2).sum())
+        outcome = (payout > 0).astype(float)
+        acc.squared_error = float(((q_hat - outcome) ** 2).sum())
+
+        path = np.cumsum(pnl)
+        running_peak = np.maximum.accumulate(np.maximum(path, 0.0))
+        acc.peak = float(running_peak[-1])
+        acc.trough = float(min(path.min(), 0.0))
+        acc.max_drawdown_pnl = float((running_peak - path).max())
+
+        months = columns["resolve_ts"].astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        keys, codes = np.unique(months, return_inverse=True)
+        month_pnl = np.bincount(codes, weights=pnl)
+        month_notional = np.bincount(codes, weights=notional)
+        month_count = np.bincount(codes)
+        acc.months = {
+            int(key): [float(month_pnl[i]), float(month_notional[i]), int(month_count[i])]
+            for i, key in enumerate(keys)
+        }
+
+        bins = np.searchsorted(acc.edges, q_hat, side="left") - 1
+        bins[q_hat == acc.edges[0]] = 0
+        kept = (q_hat >= acc.edges[0]) & (q_hat <= acc.edges[-1])
+        acc.bin_counts = np.bincount(bins[kept], minlength=n_bins).tolist()
+        acc.bin_predictions = np.bincount(bins[kept], weights=q_hat[kept], minlength=n_bins).tolist()
+        acc.bin_outcomes = np.bincount(bins[kept], weights=outcome[kept], minlength=n_bins).tolist()
+
+        entry = columns["timestamp"]
+        resolve = columns["resolve_ts"]
+        holding_days = np.maximum((resolve - entry) / _DAY_NS, _MIN_HOLDING_DAYS)
+        acc.first_entry_ns = int(entry.min())
+        acc.capital_days = float((notional * holding_days).sum())
+        acc.annualised_edge_sum = float((returns * 365.0 / holding_days[funded]).sum())
+        days, day_codes = np.unique(resolve // _DAY_NS, return_inverse=True)
+        acc.days = dict(zip(days.tolist(), np.bincount(day_codes, weights=pnl).tolist()))
+        return acc
+
+    def merge(self, other: "MetricAccumulator") -> "MetricAccumulator":
+        """Combine in place with ``other`` (treated as later settlements); returns ``self``."""
+        if other.n_bins != self.n_bins:
+            raise ValueError("Cannot merge accumulators with different calibration bins")
+        # Path statistics first: they need this accumulator's final PnL.
+        offset = self.total_pnl
+        self.max_drawdown_pnl = max(
+            self.max_drawdown_pnl, other.max_drawdown_pnl, self.peak - (offset + other.trough)
+        )
+        self.peak = max(self.peak, offset + other.peak)
+        self.trough = min(self.trough, offset + other.trough)
+
+        returns = self.returns + other.returns
+        if returns:
+            delta = other.mean_return - self.mean_return
+            self.m2_return += other.m2_return + delta * delta * self.returns * other.returns / returns
+            self.mean_return += delta * other.returns / returns
+        self.returns = returns
+
+        self.trades += other.trades
+        self.wins += other.wins
+        self.total_pnl += other.total_pnl
+        self.total_notional += other.total_notional
+        self.total_cost += other.total_cost
+        self.squared_error += other.squared_error
+        for key, (pnl, notional, count) in other.months.items():
+            tally = self.months.setdefault(key, [0.0, 0.0, 0])
+            tally[0] += pnl
+            tally[1] += notional
+            tally[2] += count
+        for i in range(self.n_bins):
+            self.bin_counts[i] += other.bin_counts[i]
+            self.bin_predictions[i] += other.bin_predictions[i]
+            self.bin_outcomes[i] += other.bin_outcomes[i]
+        for day, pnl in other.days.items():
+            self.days[day] = self.days.get(day, 0.0) + pnl
+        if other.first_entry_ns is not None and (
+            self.first_entry_ns is None or other.first_entry_ns < self.first_entry_ns
+        ):
+            self.first_entry_ns = other.first_entry_ns
+        self.capital_days += other.capital_days
+        self.annualised_edge_sum += other.annualised_edge_sum
+        return self
+
+    def summary(self, initial_capital: float) -> dict:
+        """Same keys as :func:`report.metrics.compute_summary`."""
+        if self.trades == 0:
+            average_return = 0.0
+        else:
+            average_return = self.mean_return if self.returns else float("nan")
+        volatility = 0.0
+        if self.trades > 1:
+            volatility = math.sqrt(self.m2_return / (self.returns - 1)) if self.returns > 1 else float("nan")
+        return {
+            "trades": self.trades,
+            "total_pnl": self.total_pnl,
+            "total_notional": self.total_notional,
+            "total_cost": self.total_cost,
+            "win_rate": self.wins / self.trades if self.trades else 0.0,
+            "average_return": average_return,
+            "sharpe_like": average_return / volatility if volatility > 1e-9 else 0.0,
+            "absolute_return": self.total_pnl / initial_capital if initial_capital else 0.0,
+            "ending_capital": initial_capital + self.total_pnl,
+        }
+
+    def brier_score(self) -> float:
+        return self.squared_error / self.trades if self.trades else 0.0
+
+    def monthly(self) -> pd.DataFrame:
+        if not self.months:
+            return pd.DataFrame(columns=["month", "pnl", "notional", "count"])
+        keys = sorted(self.months)
+        return pd.DataFrame(
+            {
+                "month": pd.PeriodIndex(np.array(keys, dtype="datetime64[M]"), freq="M"),
+                "pnl": [self.months[key][0] for key in keys],
+                "notional": [self.months[key][1] for key in keys],
+                "count": np.array([self.months[key][2] for key in keys], dtype=np.int64),
+            }
+        )
+
+    def calibration(self) -> pd.DataFrame:
+        if self.trades == 0:
+            return pd.DataFrame(columns=["bin", "mean_prediction", "empirical", "count"])
+        categories = pd.cut([], bins=self.edges, include_lowest=True).categories
+        counts = np.array(self.bin_counts, dtype=np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_prediction = np.array(self.bin_predictions) / counts
+            empirical = np.array(self.bin_outcomes) / counts
+        return pd.DataFrame(
+            {
+                "bin": pd.Categorical(categories, categories=categories, ordered=True),
+                "mean_prediction": mean_prediction,
+                "empirical": empirical,
+                "count": counts,
+            }
+        )
+
+    def risk_adjusted(self, initial_capital: float) -> dict:
+        """Same keys as :func:`report.metrics.compute_risk_adjusted`."""
+        daily_pnl = np.empty(0)
+        if self.days:
+            first_day = self.first_entry_ns // _DAY_NS
+            daily_pnl = np.zeros(max(self.days) - first_day + 1)
+            for day, pnl in self.days.items():
+                daily_pnl[day - first_day] += pnl
+        return risk_adjusted_from_tallies(
+            initial_capital,
+            daily_pnl,
+            self.total_notional,
+            self.capital_days,
+            self.annualised_edge_sum,
+            self.returns,
+        )
+
+    def report(self, initial_capital: float) -> dict:
+        """Same layout as :func:`report.metrics.compute_report`."""
+        return {
+            "summary": self.summary(initial_capital),
+            "risk_adjusted": self.risk_adjusted(initial_capital),
+            "monthly": self.monthly(),
+            "calibration": self.calibration(),
+            "brier_score": self.brier_score(),
+        }
+
+    def progress(self, initial_capital: Optional[float] = None) -> dict:
+        """Compact running figures for live progress output."""
+        progress = {
+            "trades": self.trades,
+            "total_pnl": self.total_pnl,
+            "win_rate": self.wins / self.trades if self.trades else 0.0,
+            "max_drawdown_pnl": self.max_drawdown_pnl,
+            "brier_score": self.brier_score(),
+        }
+        if initial_capital is not None:
+            progress["realised_capital"] = initial_capital + self.total_pnl
+        return progress
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backtest.results import TradeResult, as_trade_frame
+
+
+def _utc_ns(values) -> np.ndarray:
+    index = pd.DatetimeIndex(values)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return index.tz_convert("UTC").asi8
+
+
+def equity_curve(
+    trades: Union[pd.DataFrame, Iterable[TradeResult]],
+    prices: pd.DataFrame,
+    initial_capital: float,
+    freq: str = "1D",
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """Mark-to-market portfolio value on a regular UTC grid.
+
+    Cash moves by ``-(notional + total_cost)`` at entry and ``+payout`` at
+    resolution.  Between the two, each position is valued at ``shares`` times
+    the latest price for its token at or before the grid time, falling back
+    to the execution price until a price newer than the entry is seen.
+
+    Every ``(position, grid time)`` pair is generated with array arithmetic,
+    priced with one as-of search over ``prices`` (``token_id``, ``timestamp``,
+    ``price``) and scatter-added onto the grid, so there is no per-position
+    loop.  Returns ``timestamp``, ``cash``, ``positions_value``, ``equity``
+    and ``open_positions`` per grid point.
+    """
+    frame = as_trade_frame(trades)
+    if "token_id" not in frame or frame["token_id"].isna().any():
+        raise ValueError("Trades need token_id to be marked against prices")
+
+    entry = _utc_ns(frame["timestamp"])
+    resolve = _utc_ns(frame["resolve_ts"])
+    if start is None:
+        start = pd.Timestamp(int(entry.min()), tz="UTC") if len(frame) else prices["timestamp"].min()
+    if end is None:
+        end = pd.Timestamp(int(resolve.max()), tz="UTC") if len(frame) else prices["timestamp"].max()
+    grid_index = pd.date_range(pd.Timestamp(start).floor(freq), pd.Timestamp(end).ceil(freq), freq=freq)
+    grid = _utc_ns(grid_index)
+    n_grid = len(grid)
+
+    shares = frame["shares"].to_numpy(dtype=float)
+    outlay = frame["notional"].to_numpy(dtype=float) + frame["total_cost"].to_numpy(dtype=float)
+    payout = frame["payout"].to_numpy(dtype=float)
+
+    # A cash movement at time t shows from the first grid point at or after t.
+    entry_slot = np.searchsorted(grid, entry, side="left")
+    resolve_slot = np.searchsorted(grid, resolve, side="left")
+    cash_moves = np.bincount(entry_slot, weights=-outlay, minlength=n_grid + 1)
+    cash_moves += np.bincount(resolve_slot, weights=payout, minlength=n_grid + 1)
+    cash = initial_capital + np.cumsum(cash_moves[:n_grid])
+
+    # Expand each position into the grid slots it is open for.
+    held = np.maximum(resolve_slot - entry_slot, 0)
+    position = np.repeat(np.arange(len(frame)), held)
+    offsets = np.cumsum(held) - held
+    slot = entry_slot[position] + np.arange(len(position)) - np.repeat(offsets, held)
+
+    marks = frame["execution_price"].to_numpy(dtype=float)[position]
+    if len(position) and not prices.empty:
+        token_codes, tokens = pd.factorize(frame["token_id"])
+        price_tokens = pd.Categorical(prices["token_id"], categories=tokens).codes
+        known = price_tokens >= 0
+        price_times = _utc_ns(prices["timestamp"])[known]
+        price_values = prices["price"].to_numpy(dtype=float)[known]
+        price_tokens = price_tokens[known].astype(np.int64)
+
+        # Rank all timestamps jointly so (token, time) packs into one int64 key.
+        times = np.unique(np.concatenate([price_times, grid]))
+        price_keys = price_tokens * len(times) + np.searchsorted(times, price_times)
+        order = np.argsort(price_keys, kind="stable")
+        price_keys = price_keys[order]
+        pair_tokens = token_codes[position].astype(np.int64)
+        pair_keys = pair_tokens * len(times) + np.searchsorted(times, grid[slot])
+        match = np.searchsorted(price_keys, pair_keys, side="right") - 1
+        valid = match >= 0
+        valid[valid] = price_keys[match[valid]] // len(times) == pair_tokens[valid]
+        matched = order[match[valid]]
+        fresh = price_times[matched] >= entry[position[valid]]
+        updated = np.flatnonzero(valid)[fresh]
+        marks[updated] = price_values[matched[fresh]]
+
+    positions_value = np.bincount(slot, weights=shares[position] * marks, minlength=n_grid)
+    open_positions = np.bincount(slot, minlength=n_grid)
+    return pd.DataFrame(
+        {
+            "timestamp": grid_index,
+            "cash": cash,
+            "positions_value": positions_value,
+            "equity": cash + positions_value,
+            "open_positions": open_positions,
+        }
+    )
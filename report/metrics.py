@@ -1,40 +1,75 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Dict, Iterable, Mapping, Union
 
 import numpy as np
 import pandas as pd
 
-from backtest.engine import TradeResult
+from backtest.results import ColumnBuffer, TradeResult, as_trade_frame
 
+TradesLike = Union[pd.DataFrame, ColumnBuffer, Mapping[str, np.ndarray], Iterable[TradeResult]]
 
-def compute_summary(trades: Iterable[TradeResult], initial_capital: float) -> dict:
-    trades_list = list(trades)
-    total_pnl = sum(t.pnl for t in trades_list)
-    total_notional = sum(t.notional for t in trades_list)
-    total_cost = sum(t.total_cost for t in trades_list)
-    win_rate = (
-        sum(1 for t in trades_list if t.payout >= t.notional) / len(trades_list)
-        if trades_list
-        else 0.0
-    )
-    average_return = (
-        np.mean([t.pnl / t.notional for t in trades_list if t.notional > 0])
-        if trades_list
-        else 0.0
-    )
-    volatility = (
-        np.std([t.pnl / t.notional for t in trades_list if t.notional > 0], ddof=1)
-        if len(trades_list) > 1
-        else 0.0
-    )
+_DATETIME_COLUMNS = ("timestamp", "resolve_ts")
+_METRIC_COLUMNS = _DATETIME_COLUMNS + ("pnl", "notional", "total_cost", "payout", "q_hat")
+
+_DAY_NS = 86_400 * 10**9
+# Holding periods shorter than an hour are floored when annualising edge.
+_MIN_HOLDING_DAYS = 1.0 / 24.0
+
+
+def trade_columns(trades: TradesLike) -> Dict[str, np.ndarray]:
+    """The columns the metrics need, as flat arrays.
+
+    Accepts a :class:`~backtest.results.TradeLog` (read without copying), a
+    DataFrame, a mapping of column name to array, or an iterable of
+    :class:`TradeResult`.  ``timestamp`` (entry) and ``resolve_ts`` come
+    back as int64 UTC nanoseconds.  Passing the result to any function in
+    this module skips the conversion, so a full report converts the trades
+    once.
+    """
+    if isinstance(trades, ColumnBuffer):
+        source = {name: trades.column(name) for name in _METRIC_COLUMNS}
+    elif isinstance(trades, (pd.DataFrame, Mapping)):
+        source = trades
+    else:
+        source = as_trade_frame(trades)
+
+    columns = {
+        name: np.asarray(source[name], dtype=float)
+        for name in _METRIC_COLUMNS
+        if name not in _DATETIME_COLUMNS
+    }
+    for name in _DATETIME_COLUMNS:
+        values = source[name]
+        if isinstance(values, np.ndarray) and values.dtype == np.int64:
+            columns[name] = values
+            continue
+        index = pd.DatetimeIndex(values)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        columns[name] = index.tz_convert("UTC").asi8
+    return columns
+
+
+def compute_summary(trades: TradesLike, initial_capital: float) -> dict:
+    columns = trade_columns(trades)
+    pnl = columns["pnl"]
+    notional = columns["notional"]
+    count = len(pnl)
+    total_pnl = float(pnl.sum())
+
+    win_rate = float((columns["payout"] >= notional).sum() / count) if count else 0.0
+    funded = notional > 0
+    returns = pnl[funded] / notional[funded]
+    average_return = np.mean(returns) if count else 0.0
+    volatility = np.std(returns, ddof=1) if count > 1 else 0.0
     sharpe_like = average_return / volatility if volatility > 1e-9 else 0.0
 
     return {
-        "trades": len(trades_list),
+        "trades": count,
         "total_pnl": total_pnl,
-        "total_notional": total_notional,
-        "total_cost": total_cost,
+        "total_notional": float(notional.sum()),
+        "total_cost": float(columns["total_cost"].sum()),
         "win_rate": win_rate,
         "average_return": average_return,
         "sharpe_like": sharpe_like,
@@ -43,46 +78,174 @@ def compute_summary(trades: Iterable[TradeResult], initial_capital: float) -> di
     }
 
 
-def compute_monthly_breakdown(trades: Iterable[TradeResult]) -> pd.DataFrame:
-    if not trades:
+def compute_monthly_breakdown(trades: TradesLike) -> pd.DataFrame:
+    columns = trade_columns(trades)
+    if len(columns["pnl"]) == 0:
         return pd.DataFrame(columns=["month", "pnl", "notional", "count"])
 
-    df = pd.DataFrame(
+    months = columns["resolve_ts"].astype("datetime64[ns]").astype("datetime64[M]")
+    unique_months, codes = np.unique(months, return_inverse=True)
+    return pd.DataFrame(
         {
-            "resolve_ts": [t.resolve_ts for t in trades],
-            "pnl": [t.pnl for t in trades],
-            "notional": [t.notional for t in trades],
+            "month": pd.PeriodIndex(unique_months, freq="M"),
+            "pnl": np.bincount(codes, weights=columns["pnl"], minlength=len(unique_months)),
+            "notional": np.bincount(codes, weights=columns["notional"], minlength=len(unique_months)),
+            "count": np.bincount(codes, minlength=len(unique_months)),
         }
     )
-    df["month"] = df["resolve_ts"].dt.tz_convert(None).dt.to_period("M")
-    grouped = df.groupby("month").agg({"pnl": "sum", "notional": "sum", "resolve_ts": "count"})
-    grouped.rename(columns={"resolve_ts": "count"}, inplace=True)
-    return grouped.reset_index()
 
 
-def compute_calibration(trades: Iterable[TradeResult], n_bins: int = 5) -> pd.DataFrame:
-    if not trades:
+def compute_calibration(trades: TradesLike, n_bins: int = 5) -> pd.DataFrame:
+    columns = trade_columns(trades)
+    if len(columns["q_hat"]) == 0:
         return pd.DataFrame(columns=["bin", "mean_prediction", "empirical", "count"])
 
-    df = pd.DataFrame(
+    prediction = columns["q_hat"]
+    outcome = (columns["payout"] > 0).astype(float)
+    binned = pd.cut(prediction, bins=np.linspace(0.5, 1.0, n_bins + 1), include_lowest=True)
+    codes = binned.codes
+    kept = codes >= 0
+    counts = np.bincount(codes[kept], minlength=n_bins)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_prediction = np.bincount(codes[kept], weights=prediction[kept], minlength=n_bins) / counts
+        empirical = np.bincount(codes[kept], weights=outcome[kept], minlength=n_bins) / counts
+    return pd.DataFrame(
         {
-            "prediction": [t.q_hat for t in trades],
-            "outcome": [1.0 if t.payout > 0 else 0.0 for t in trades],
+            "bin": pd.Categorical(binned.categories, categories=binned.categories, ordered=True),
+            "mean_prediction": mean_prediction,
+            "empirical": empirical,
+            "count": counts,
         }
     )
-    bins = np.linspace(0.5, 1.0, n_bins + 1)
-    df["bin"] = pd.cut(df["prediction"], bins=bins, include_lowest=True)
-    grouped = df.groupby("bin", observed=False).agg(
-        mean_prediction=("prediction", "mean"),
-        empirical=("outcome", "mean"),
-        count=("outcome", "size"),
-    )
-    return grouped.reset_index()
 
 
-def brier_score(trades: Iterable[TradeResult]) -> float:
-    trades_list = list(trades)
-    if not trades_list:
+def brier_score(trades: TradesLike) -> float:
+    columns = trade_columns(trades)
+    if len(columns["q_hat"]) == 0:
         return 0.0
-    errors = [(t.q_hat - (1.0 if t.payout > 0 else 0.0)) ** 2 for t in trades_list]
-    return float(np.mean(errors))
+    outcome = (columns["payout"] > 0).astype(float)
+    return float(np.mean((columns["q_hat"] - outcome) ** 2))
+
+
+_RISK_ADJUSTED_KEYS = (
+    "days",
+    "time_weighted_return",
+    "annualised_return",
+    "annualised_volatility",
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "max_drawdown_days",
+    "capital_turnover",
+    "capital_utilisation",
+    "return_on_capital_days",
+    "mean_annualised_edge",
+)
+
+
+def risk_adjusted_from_tallies(
+    initial_capital: float,
+    daily_pnl: np.ndarray,
+    total_notional: float,
+    capital_days: float,
+    annualised_edge_sum: float,
+    funded_trades: int,
+) -> dict:
+    """Risk-adjusted figures from per-day realised PnL and per-trade tallies.
+
+    ``daily_pnl[d]`` is the PnL settled ``d`` UTC days after the day of the
+    first entry.  ``capital_days`` is the sum of ``notional * holding days``
+    and ``annualised_edge_sum`` the sum of
+    ``pnl / notional * 365 / holding days`` over ``funded_trades`` trades
+    with positive notional.  Shared by :func:`compute_risk_adjusted` and
+    :class:`report.accumulators.MetricAccumulator`.
+    """
+    n_days = len(daily_pnl)
+    if n_days == 0:
+        return {**dict.fromkeys(_RISK_ADJUSTED_KEYS, 0.0), "days": 0, "max_drawdown_days": 0}
+
+    equity = initial_capital + np.cumsum(daily_pnl)
+    previous = np.concatenate(([initial_capital], equity[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily_return = np.where(previous > 0, daily_pnl / previous, 0.0)
+    growth = float(np.prod(1.0 + daily_return))
+    years = n_days / 365.0
+    annualised_return = growth ** (1.0 / years) - 1.0 if growth > 0 else -1.0
+
+    volatility = float(np.std(daily_return, ddof=1)) if n_days > 1 else 0.0
+    downside = float(np.sqrt(np.mean(np.minimum(daily_return, 0.0) ** 2)))
+    mean_return = float(daily_return.mean())
+    sharpe = mean_return / volatility * np.sqrt(365.0) if volatility > 1e-12 else 0.0
+    sortino = mean_return / downside * np.sqrt(365.0) if downside > 1e-12 else 0.0
+
+    peak = np.maximum.accumulate(np.maximum(equity, initial_capital))
+    drawdown = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    # Days since the equity last stood at its running peak.
+    at_peak = equity >= peak
+    last_peak = np.maximum.accumulate(np.where(at_peak, np.arange(n_days), -1))
+    underwater_days = np.arange(n_days) - last_peak
+
+    average_equity = float(equity.mean())
+    return {
+        "days": n_days,
+        "time_weighted_return": growth - 1.0,
+        "annualised_return": annualised_return,
+        "annualised_volatility": volatility * np.sqrt(365.0),
+        "sharpe": float(sharpe),
+        "sortino": float(sortino),
+        "max_drawdown": float(drawdown.max()),
+        "max_drawdown_days": int(underwater_days.max()),
+        "capital_turnover": total_notional / average_equity / years if average_equity > 0 else 0.0,
+        "capital_utilisation": capital_days / (average_equity * n_days) if average_equity > 0 else 0.0,
+        "return_on_capital_days": float(daily_pnl.sum()) / capital_days * 365.0 if capital_days > 0 else 0.0,
+        "mean_annualised_edge": annualised_edge_sum / funded_trades if funded_trades else 0.0,
+    }
+
+
+def compute_risk_adjusted(trades: TradesLike, initial_capital: float) -> dict:
+    """Annualised, drawdown and capital-efficiency metrics of the realised equity.
+
+    Equity is the initial capital plus PnL booked on each trade's resolution
+    day, from the day of the first entry to the last settlement, so Sharpe,
+    Sortino and volatility are of daily realised returns annualised with
+    365 days.  ``max_drawdown`` is a fraction of the running peak and
+    ``max_drawdown_days`` the longest stretch below it.  Holding periods are
+    resolution minus entry time (floored at one hour): ``mean_annualised_edge``
+    is the average ``pnl / notional`` scaled to a year by each trade's
+    holding period, ``return_on_capital_days`` the PnL per year of notional
+    held, and ``capital_utilisation`` the average share of equity deployed.
+    Every figure comes from a fixed number of array reductions.
+    """
+    columns = trade_columns(trades)
+    if len(columns["pnl"]) == 0:
+        return risk_adjusted_from_tallies(initial_capital, np.empty(0), 0.0, 0.0, 0.0, 0)
+
+    entry = columns["timestamp"]
+    resolve = columns["resolve_ts"]
+    pnl = columns["pnl"]
+    notional = columns["notional"]
+    first_day = int(entry.min() // _DAY_NS)
+    days = resolve // _DAY_NS - first_day
+    holding_days = np.maximum((resolve - entry) / _DAY_NS, _MIN_HOLDING_DAYS)
+    funded = notional > 0
+    return risk_adjusted_from_tallies(
+        initial_capital,
+        np.bincount(days, weights=pnl),
+        float(notional.sum()),
+        float((notional * holding_days).sum()),
+        float((pnl[funded] / notional[funded] * 365.0 / holding_days[funded]).sum()),
+        int(funded.sum()),
+    )
+
+
+def compute_report(trades: TradesLike, initial_capital: float, n_bins: int = 5) -> dict:
+    """Summary, risk-adjusted figures, monthly breakdown, calibration table and
+    Brier score from one conversion."""
+    columns = trade_columns(trades)
+    return {
+        "summary": compute_summary(columns, initial_capital),
+        "risk_adjusted": compute_risk_adjusted(columns, initial_capital),
+        "monthly": compute_monthly_breakdown(columns),
+        "calibration": compute_calibration(columns, n_bins),
+        "brier_score": brier_score(columns),
+    }
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Literal, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backtest.results import TradeResult, as_trade_frame
+
+
+@dataclass
+class MonteCarloConfig:
+    """Settings for resampling realised backtest trades.
+
+    ``method`` selects how alternative outcomes are produced:
+    ``"q_hat"``/``"q_lower"`` redraw every market's resolution from the
+    calibrated probability, ``"block"`` bootstraps whole resolution months of
+    realised PnL.  A path counts as ruined once equity falls to
+    ``ruin_level`` times the initial capital.
+    """
+
+    n_paths: int = 10_000
+    method: Literal["q_hat", "q_lower", "block"] = "q_hat"
+    ruin_level: float = 0.5
+    seed: int = 0
+    n_workers: Optional[int] = None
+    chunk_size: int = 1_000
+
+
+@dataclass
+class _PathState:
+    """Trade arrays ordered by resolution time, shipped once to each worker."""
+
+    method: str
+    initial_capital: float
+    ruin_level: float
+    # Outcome redraws: per-trade market code, shares and fixed outlay.
+    market_codes: np.ndarray
+    market_probability: np.ndarray
+    shares: np.ndarray
+    outlay: np.ndarray
+    # Block bootstrap: realised PnL grouped into contiguous month blocks.
+    pnl: np.ndarray
+    block_starts: np.ndarray
+    block_lengths: np.ndarray
+
+
+_WORKER_STATE: Optional[_PathState] = None
+
+
+def _init_worker(state: _PathState) -> None:
+    global _WORKER_STATE
+    _WORKER_STATE = state
+
+
+def _encode(frame: pd.DataFrame, initial_capital: float, config: MonteCarloConfig) -> _PathState:
+    frame = frame.sort_values("resolve_ts", kind="stable")
+    market_codes, _ = pd.factorize(frame["condition_id"])
+    probability_column = "q_lower" if config.method == "q_lower" else "q_hat"
+    probabilities = np.clip(frame[probability_column].to_numpy(dtype=float), 0.0, 1.0)
+    n_markets = int(market_codes.max() + 1) if len(market_codes) else 0
+    # Trades in one market share a resolution; draw it from their mean estimate.
+    market_probability = np.bincount(market_codes, weights=probabilities, minlength=n_markets) / np.maximum(
+        np.bincount(market_codes, minlength=n_markets), 1
+    )
+
+    resolve = pd.DatetimeIndex(frame["resolve_ts"])
+    months = resolve.tz_convert(None).to_period("M") if resolve.tz is not None else resolve.to_period("M")
+    month_codes, _ = pd.factorize(months.asi8)
+    block_starts = np.flatnonzero(np.r_[True, month_codes[1:] != month_codes[:-1]])
+    block_lengths = np.diff(np.r_[block_starts, len(month_codes)])
+
+    return _PathState(
+        method=config.method,
+        initial_capital=initial_capital,
+        ruin_level=config.ruin_level,
+        market_codes=market_codes.astype(np.int64),
+        market_probability=market_probability,
+        shares=frame["shares"].to_numpy(dtype=float),
+        outlay=frame["notional"].to_numpy(dtype=float) + frame["total_cost"].to_numpy(dtype=float),
+        pnl=frame["pnl"].to_numpy(dtype=float),
+        block_starts=block_starts,
+        block_lengths=block_lengths,
+    )
+
+
+def _outcome_pnl(state: _PathState, rng: np.random.Generator, n: int) -> np.ndarray:
+    outcomes = rng.random((n, len(state.market_probability))) < state.market_probability
+    return outcomes[:, state.market_codes] * state.shares - state.outlay
+
+
+def _block_pnl(state: _PathState, rng: np.random.Generator, n: int) -> np.ndarray:
+    """PnL sequences built from months drawn with replacement, zero-padded.
+
+    Padding adds no PnL, so it leaves ending capital and drawdowns unchanged.
+    """
+    n_blocks = len(state.block_starts)
+    draws = rng.integers(0, n_blocks, size=(n, n_blocks))
+    lengths = state.block_lengths[draws]
+    totals = lengths.sum(axis=1)
+    out = np.zeros((n, int(totals.max()) if n else 0))
+
+    flat_lengths = lengths.ravel()
+    block_of_event = np.repeat(draws.ravel(), flat_lengths)
+    event_offsets = np.cumsum(flat_lengths) - flat_lengths
+    within = np.arange(len(block_of_event)) - np.repeat(event_offsets, flat_lengths)
+    path_offsets = np.cumsum(totals) - totals
+    rows = np.repeat(np.arange(n), totals)
+    columns = np.arange(len(rows)) - np.repeat(path_offsets, totals)
+    out[rows, columns] = state.pnl[state.block_starts[block_of_event] + within]
+    return out
+
+
+def _simulate(state: _PathState, seed: np.random.SeedSequence, n: int) -> np.ndarray:
+    """Return ``(n, 3)`` rows of ending capital, max drawdown and ruin flag."""
+    rng = np.random.default_rng(seed)
+    pnl = _block_pnl(state, rng, n) if state.method == "block" else _outcome_pnl(state, rng, n)
+    equity = state.initial_capital + np.cumsum(pnl, axis=1)
+    peaks = np.maximum(np.maximum.accumulate(equity, axis=1), state.initial_capital)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peaks > 0, (peaks - equity) / peaks, 0.0)
+    lowest = equity.min(axis=1, initial=state.initial_capital)
+    ending = equity[:, -1] if equity.shape[1] else np.full(n, state.initial_capital)
+    return np.column_stack(
+        [
+            ending,
+            drawdown.max(axis=1, initial=0.0),
+            lowest <= state.ruin_level * state.initial_capital,
+        ]
+    )
+
+
+def _worker_simulate(seed: np.random.SeedSequence, n: int) -> np.ndarray:
+    if _WORKER_STATE is None:
+        raise RuntimeError("Monte Carlo worker was not initialised")
+    return _simulate(_WORKER_STATE, seed, n)
+
+
+def simulate_outcomes(
+    trades: Union[pd.DataFrame, Iterable[TradeResult]],
+    initial_capital: float,
+    config: Optional[MonteCarloConfig] = None,
+) -> pd.DataFrame:
+    """Monte Carlo capital paths over the executed trades.
+
+    Position sizes and costs are kept as executed; only outcomes change.
+    Each trade's PnL is booked when its market resolves, so equity values
+    open positions at cost.  Paths are simulated in vectorised chunks, each
+    seeded from its own child ``SeedSequence``, and chunks are spread over a
+    process pool; results do not depend on ``n_workers``.
+
+    Returns one row per path with ``ending_capital``, ``max_drawdown`` (as a
+    fraction of the running peak) and ``ruined``.
+    """
+    config = config or MonteCarloConfig()
+    if config.method not in ("q_hat", "q_lower", "block"):
+        raise ValueError(f"Unknown Monte Carlo method: {config.method}")
+    if config.chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    frame = as_trade_frame(trades)
+    if frame.empty:
+        raise ValueError("No trades to resample")
+    # Outcomes are drawn per market, so a trade without one cannot be redrawn.
+    if frame["condition_id"].isnull().any():
+        raise ValueError("Monte Carlo input has trades without a condition_id")
+
+    state = _encode(frame, initial_capital, config)
+    chunk_sizes: List[int] = []
+    remaining = config.n_paths
+    while remaining > 0:
+        chunk_sizes.append(min(config.chunk_size, remaining))
+        remaining -= chunk_sizes[-1]
+    seeds = np.random.SeedSequence(config.seed).spawn(len(chunk_sizes))
+
+    if config.n_workers == 1 or len(chunk_sizes) <= 1:
+        chunks = [_simulate(state, seed, n) for seed, n in zip(seeds, chunk_sizes)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=config.n_workers, initializer=_init_worker, initargs=(state,)
+        ) as pool:
+            chunks = list(pool.map(_worker_simulate, seeds, chunk_sizes))
+
+    paths = np.vstack(chunks) if chunks else np.empty((0, 3))
+    return pd.DataFrame(
+        {
+            "ending_capital": paths[:, 0],
+            "max_drawdown": paths[:, 1],
+            "ruined": paths[:, 2].astype(bool),
+        }
+    )
+
+
+def summarise_paths(paths: pd.DataFrame, quantiles: Iterable[float] = (0.05, 0.5, 0.95)) -> dict:
+    """Distribution summary of :func:`simulate_outcomes` output."""
+    summary = {
+        "paths": len(paths),
+        "mean_ending_capital": float(paths["ending_capital"].mean()),
+        "ruin_probability": float(paths["ruined"].mean()),
+    }
+    for q in quantiles:
+        label = f"p{round(q * 100):02d}"
+        summary[f"ending_capital_{label}"] = float(paths["ending_capital"].quantile(q))
+        summary[f"max_drawdown_{label}"] = float(paths["max_drawdown"].quantile(q))
+    return summary
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water resident set size of this process in MiB (``None`` if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+@dataclass
+class StageStats:
+    name: str
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: Optional[int] = None
+    # Process high-water RSS when the stage last finished, and how much the
+    # stage raised it.
+    peak_rss_mb: Optional[float] = None
+    peak_rss_growth_mb: float = 0.0
+
+
+class _StageHandle:
+    """Yielded by :meth:`StageProfiler.stage`; set ``rows`` inside the block."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: Optional[int]) -> None:
+        self.rows = rows
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling one thread's Python stack from a helper thread.
+
+    Every ``interval`` seconds the helper reads the target thread's current
+    frame and counts the innermost frame (self samples) and each distinct
+    function on the stack (inclusive samples).  The target is never
+    interrupted, so the overhead is one stack walk per sample; the GIL
+    switch interval (5 ms by default) bounds the effective rate.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.samples = 0
+        self.self_counts: Counter = Counter()
+        self.inclusive_counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("SamplingProfiler is already running")
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.samples += 1
+            code = frame.f_code
+            self.self_counts[f"{code.co_filename}:{frame.f_lineno}:{code.co_name}"] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = f"{code.co_filename}:{code.co_firstlineno}:{code.co_name}"
+                if key not in seen:
+                    seen.add(key)
+                    self.inclusive_counts[key] += 1
+                frame = frame.f_back
+
+    def report(self, top: int = 25) -> dict:
+        total = max(self.samples, 1)
+        return {
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "self": [
+                {"location": key, "samples": n, "share": n / total}
+                for key, n in self.self_counts.most_common(top)
+            ],
+            "inclusive": [
+                {"function": key, "samples": n, "share": n / total}
+                for key, n in self.inclusive_counts.most_common(top)
+            ],
+        }
+
+
+class StageProfiler:
+    """Wall time, CPU time, peak RSS and row counts per named pipeline stage.
+
+    Stages may nest and repeat; repeated names accumulate.  Each stage costs
+    two clock reads and two ``getrusage`` calls, so instrumenting coarse
+    stages is free in practice.  With ``sample_interval`` set, stages
+    entered with ``sample=True`` also run a :class:`SamplingProfiler`.
+    """
+
+    def __init__(self, sample_interval: Optional[float] = None) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        self.sampler = SamplingProfiler(sample_interval) if sample_interval else None
+        # JSON-ready extras merged into :meth:`report`, e.g. the memory report.
+        self.notes: Dict[str, object] = {}
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    @contextmanager
+    def stage(
+        self, name: str, rows: Optional[int] = None, sample: bool = False
+    ) -> Iterator[_StageHandle]:
+        handle = _StageHandle(rows)
+        sampler = self.sampler if sample else None
+        rss_before = peak_rss_mb()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if sampler is not None:
+            sampler.start()
+        try:
+            yield handle
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            rss_after = peak_rss_mb()
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats(name)
+            stats.calls += 1
+            stats.wall_s += wall
+            stats.cpu_s += cpu
+            if handle.rows is not None:
+                stats.rows = (stats.rows or 0) + int(handle.rows)
+            stats.peak_rss_mb = rss_after
+            if rss_before is not None and rss_after is not None:
+                stats.peak_rss_growth_mb += rss_after - rss_before
+
+    def report(self) -> dict:
+        stages: List[dict] = [asdict(stats) for stats in self.stages.values()]
+        report = {
+            "wall_s": time.perf_counter() - self._started,
+            "cpu_s": time.process_time() - self._cpu_started,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+        }
+        if self.sampler is not None:
+            report["sampling"] = self.sampler.report()
+        report.update(self.notes)
+        return report
+
+    def write(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2) + "\n")
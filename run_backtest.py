@@ -3,29 +3,24 @@ from __future__ import annotations
 import argparse
 import os
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, Literal, Optional, Sequence, Tuple
-
-import pandas as pd
-
-from backtest.cost_model import CostModel
-from backtest.engine import BacktestConfig, BacktestEngine
-from backtest.risk import RiskManager
-from feature.make_features import compute_features
-from feature.make_labels import attach_labels
-from ingest.data_bundle import (
-    BacktestDataBundle,
-    download_bundle_from_api,
-    load_local_bundle,
-)
-from ingest.polymarket_api import BackfillWindow, PolymarketAPISettings
-from model.calibrate_isotonic import IsotonicCalibrator
-from report.metrics import (
-    brier_score,
-    compute_calibration,
-    compute_monthly_breakdown,
-    compute_summary,
-)
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Sequence, Tuple
+
+from report.profiling import StageProfiler
+
+# Subsystems load on first use, so ``--help`` and argument errors return
+# without importing pandas, scipy or the API client.
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from backtest.splits import WalkForwardConfig, WalkForwardSplit
+    from backtest.sweep import SweepConfig
+    from backtest.writers import ResultsFormat
+    from ingest.book_synthesis import BookProfile
+    from ingest.data_bundle import BacktestDataBundle
+    from ingest.polymarket_api import BackfillWindow
+    from report.accumulators import MetricAccumulator
 
 
 @dataclass
@@ -41,65 +36,97 @@ class PipelineConfig:
     order_book_depth: int = 5
     initial_capital: float = 100_000.0
     min_ev: float = 0.0
+    calibrator: Literal["isotonic", "online", "gbdt"] = "isotonic"
+    # ``None`` keeps the single split at the midpoint of the timeline.
+    walk_forward: Optional[WalkForwardConfig] = None
+    fit_workers: Optional[int] = 1
+    allocation: Literal["sequential", "ranked"] = "sequential"
+    decision_window_minutes: float = 0.0
+    checkpoint_path: Optional[Path] = None
+    checkpoint_every: Optional[int] = None
+    # ``resume`` restarts from the checkpoint if one exists; ``extend``
+    # requires it and only processes rows after it.
+    resume: bool = False
+    extend: bool = False
+    # ``keep_trades=False`` reports from the engine's running metrics only.
+    keep_trades: bool = True
+    progress_every: Optional[int] = None
+    # Stream trades and capital history to ``results_dir / "run_id=<run_id>"``.
+    results_dir: Optional[Path] = None
+    run_id: Optional[str] = None
+    results_format: ResultsFormat = "csv"
+    # Write per-stage wall/CPU time, peak RSS and row counts here as JSON;
+    # ``profile_sample_ms`` also samples the engine loop's Python stack.
+    profile_path: Optional[Path] = None
+    profile_sample_ms: Optional[float] = None
+    # Saved :class:`BookProfile` used for synthetic books instead of one
+    # fitted on the bundle's own snapshots.
+    book_profile: Optional[Path] = None
+    # Dictionary-encode repeated strings and narrow numeric dtypes after
+    # loading (see :mod:`ingest.encoding`).
+    encode: bool = True
+
+    def profiler(self) -> StageProfiler:
+        interval = self.profile_sample_ms / 1000.0 if self.profile_sample_ms else None
+        return StageProfiler(sample_interval=interval)
 
     def window(self) -> Optional[BackfillWindow]:
         if self.start is None and self.end is None:
             return None
+        from ingest.polymarket_api import BackfillWindow
+
         return BackfillWindow(start=self.start, end=self.end)
 
 
+def _calibrator_class(name: str) -> type:
+    """Calibrator class for ``name``; only that model's module is imported."""
+    if name == "isotonic":
+        from model.calibrate_isotonic import IsotonicCalibrator
+
+        return IsotonicCalibrator
+    if name == "online":
+        from model.online_calibrator import OnlineIsotonicCalibrator
+
+        return OnlineIsotonicCalibrator
+    if name == "gbdt":
+        from model.gbdt_monotone import MonotoneGBDTCalibrator
+
+        return MonotoneGBDTCalibrator
+    raise ValueError(f"Unknown calibrator: {name!r}")
+
+
 def _build_book_lookup(
     books: pd.DataFrame,
 ) -> Dict[Tuple[str, pd.Timestamp], pd.DataFrame]:
+    from ingest.encoding import decode_frame
+
+    # Snapshots are read row by row in the engine, where plain strings are
+    # cheaper than categoricals.
+    books = decode_frame(books)
     lookup: Dict[Tuple[str, pd.Timestamp], pd.DataFrame] = {}
-    for (token, ts), group in books.groupby(["token_id", "timestamp"]):
+    for (token, ts), group in books.groupby(["token_id", "timestamp"], observed=True):
         lookup[(token, ts)] = group.copy()
     return lookup
 
 
-def _synthesise_books(trades: pd.DataFrame, *, levels: int = 3) -> pd.DataFrame:
+def _synthesise_books(
+    trades: pd.DataFrame, *, levels: int = 3, profile: Optional[BookProfile] = None
+) -> pd.DataFrame:
     """Generate a conservative synthetic book when snapshots are unavailable."""
+    from ingest.book_synthesis import synthesise_books
+
+    return synthesise_books(trades, levels, profile)
+
 
-    records = []
-    for _, row in trades.iterrows():
-        price = float(row["price"])
-        size = float(row.get("size", 0.0) or 1.0)
-        token_id = row["token_id"]
-        timestamp = row["timestamp"]
-        tick = max(0.002, price * 0.01)
-        for level in range(1, levels + 1):
-            offset = tick * level
-            depth = max(size * (1.0 - 0.25 * (level - 1)), size * 0.25)
-            records.append(
-                {
-                    "token_id": token_id,
-                    "timestamp": timestamp,
-                    "side": "ask",
-                    "level": level,
-                    "price": min(0.999, price + offset),
-                    "size": depth,
-                }
-            )
-            records.append(
-                {
-                    "token_id": token_id,
-                    "timestamp": timestamp,
-                    "side": "bid",
-                    "level": level,
-                    "price": max(0.001, price - offset),
-                    "size": depth,
-                }
-            )
-    frame = pd.DataFrame.from_records(records)
-    frame.sort_values(["token_id", "timestamp", "side", "level"], inplace=True)
-    frame.reset_index(drop=True, inplace=True)
-    return frame
-
-
-def _ensure_books(bundle: BacktestDataBundle) -> pd.DataFrame:
-    if bundle.books is not None and not bundle.books.empty:
-        return bundle.books
-    return _synthesise_books(bundle.trades)
+def _ensure_books(bundle: BacktestDataBundle, profile: Optional[BookProfile] = None) -> pd.DataFrame:
+    """Bundle books, with synthetic snapshots for every trade that lacks one.
+
+    The synthetic shapes come from ``profile`` or, failing that, are fitted
+    per category and price band on the snapshots the bundle does have.
+    """
+    from ingest.book_synthesis import fill_missing_books
+
+    return fill_missing_books(bundle.books, bundle.trades, bundle.markets, profile=profile)
 
 
 def _ensure_prices(bundle: BacktestDataBundle) -> pd.DataFrame:
@@ -111,6 +138,8 @@ def _ensure_prices(bundle: BacktestDataBundle) -> pd.DataFrame:
 def _coerce_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
     if value is None:
         return None
+    import pandas as pd
+
     ts = pd.Timestamp(value)
     if ts.tzinfo is None:
         return ts.tz_localize("UTC")
@@ -125,41 +154,68 @@ def _resolve_source(config: PipelineConfig, default_dir: Path) -> str:
     return "local" if sample_file.exists() else "api"
 
 
-def run_backtest(config: Optional[PipelineConfig] = None) -> Dict[str, object]:
-    base = Path(__file__).resolve().parent
-    data_dir = base / "data"
-    config = config or PipelineConfig(source="local", data_dir=data_dir)
-    source = _resolve_source(config, data_dir)
-
-    if source == "local":
-        bundle = load_local_bundle(config.data_dir or data_dir)
-    else:
-        settings = PolymarketAPISettings(
-            goldsky_url=config.goldsky_url or os.getenv("POLYMOLY_GOLDSKY_URL"),
-        )
-        bundle = download_bundle_from_api(
-            settings=settings,
-            condition_filter=config.condition_ids,
-            window=config.window(),
-            depth=config.order_book_depth,
-        )
-
-    books = _ensure_books(bundle)
-    prices = _ensure_prices(bundle)
+def _load_bundle(config: PipelineConfig, data_dir: Path) -> BacktestDataBundle:
+    if _resolve_source(config, data_dir) == "local":
+        from ingest.data_bundle import load_local_bundle
 
-    labeled_trades = attach_labels(bundle.trades, bundle.resolutions)
-    features = compute_features(labeled_trades, bundle.markets, books, prices)
+        return load_local_bundle(config.data_dir or data_dir)
+    # The API client (and ``requests``) is only loaded for API runs.
+    from ingest.data_bundle import download_bundle_from_api
+    from ingest.polymarket_api import PolymarketAPISettings
 
-    book_lookup = _build_book_lookup(books)
+    settings = PolymarketAPISettings(
+        goldsky_url=config.goldsky_url or os.getenv("POLYMOLY_GOLDSKY_URL"),
+    )
+    return download_bundle_from_api(
+        settings=settings,
+        condition_filter=config.condition_ids,
+        window=config.window(),
+        depth=config.order_book_depth,
+    )
 
-    def calibrator_factory() -> IsotonicCalibrator:
-        return IsotonicCalibrator()
 
-    cost_model = CostModel(taker_fee=0.0, gas_cost=0.25, borrow_rate=0.05)
-    risk_manager = RiskManager()
-    config_bt = BacktestConfig(
-        initial_capital=config.initial_capital, min_ev=config.min_ev
-    )
+def _prepare_inputs(
+    config: PipelineConfig,
+    data_dir: Path,
+    profiler: Optional[StageProfiler] = None,
+    bundle: Optional[BacktestDataBundle] = None,
+) -> Tuple[pd.DataFrame, Dict[Tuple[str, pd.Timestamp], pd.DataFrame], List[WalkForwardSplit]]:
+    """Load the bundle (unless given) and build features, book lookup and splits."""
+    import pandas as pd
+
+    from backtest.splits import WalkForwardSplit, walk_forward_splits
+    from feature.make_features import compute_features
+    from feature.make_labels import attach_labels
+    from ingest.book_synthesis import BookProfile
+    from ingest.data_bundle import BacktestDataBundle
+    from ingest.encoding import encode_bundle, memory_report
+
+    profiler = profiler or StageProfiler()
+    if bundle is None:
+        with profiler.stage("load") as stage:
+            bundle = _load_bundle(config, data_dir)
+            stage.rows = len(bundle.trades)
+
+    with profiler.stage("ensure_books_prices") as stage:
+        book_profile = BookProfile.load(config.book_profile) if config.book_profile else None
+        books = _ensure_books(bundle, book_profile)
+        prices = _ensure_prices(bundle)
+        stage.rows = len(books) + len(prices)
+
+    bundle = BacktestDataBundle(bundle.markets, bundle.resolutions, bundle.trades, books, prices)
+    if config.encode:
+        with profiler.stage("encode", rows=len(bundle.trades)):
+            bundle = encode_bundle(bundle)
+    profiler.notes["memory"] = memory_report(bundle).to_dict("records")
+
+    with profiler.stage("attach_labels", rows=len(bundle.trades)):
+        labeled_trades = attach_labels(bundle.trades, bundle.resolutions)
+    with profiler.stage("compute_features") as stage:
+        features = compute_features(labeled_trades, bundle.markets, bundle.books, bundle.prices)
+        stage.rows = len(features)
+
+    with profiler.stage("build_book_lookup", rows=len(bundle.books)):
+        book_lookup = _build_book_lookup(bundle.books)
 
     if features.empty:
         raise RuntimeError("No features computed; verify ingestion configuration")
@@ -167,43 +223,149 @@ def run_backtest(config: Optional[PipelineConfig] = None) -> Dict[str, object]:
     timeline = features["timestamp"].sort_values().unique()
     if len(timeline) < 2:
         raise RuntimeError("Not enough data points to create walk-forward splits")
+    if config.walk_forward is not None:
+        folds = walk_forward_splits(timeline, config.walk_forward)
+        if not folds:
+            raise RuntimeError("Timeline is shorter than the walk-forward training window")
+        return features, book_lookup, folds
     start_ts = timeline.min()
     end_ts = timeline.max()
     midpoint = start_ts + (end_ts - start_ts) / 2
-    splits: Iterable[Tuple[pd.Timestamp, pd.Timestamp]] = [
-        (
-            pd.Timestamp(midpoint).tz_convert("UTC"),
-            pd.Timestamp(end_ts).tz_convert("UTC"),
+    splits = [
+        WalkForwardSplit(
+            train_end=pd.Timestamp(midpoint).tz_convert("UTC"),
+            test_end=pd.Timestamp(end_ts).tz_convert("UTC"),
         ),
     ]
+    return features, book_lookup, splits
+
+
+def _print_progress(metrics: MetricAccumulator, initial_capital: float) -> None:
+    progress = metrics.progress(initial_capital)
+    print(" ".join(f"{key}={value:.6g}" for key, value in progress.items()), flush=True)
+
+
+def run_backtest(
+    config: Optional[PipelineConfig] = None, bundle: Optional[BacktestDataBundle] = None
+) -> Dict[str, object]:
+    """Run the pipeline and report; ``bundle`` replaces loading from ``config.source``.
 
+    ``result["profile"]`` holds the per-stage timings, also written to
+    ``config.profile_path`` when set.
+    """
+    import pandas as pd
+
+    from backtest.cost_model import CostModel
+    from backtest.engine import BacktestConfig, BacktestEngine
+    from backtest.risk import RiskManager
+    from backtest.writers import results_writer
+    from report.metrics import compute_report
+
+    base = Path(__file__).resolve().parent
+    data_dir = base / "data"
+    config = config or PipelineConfig(source="local", data_dir=data_dir)
+    profiler = config.profiler()
+    features, book_lookup, splits = _prepare_inputs(config, data_dir, profiler, bundle)
+
+    cost_model = CostModel(taker_fee=0.0, gas_cost=0.25, borrow_rate=0.05)
+    risk_manager = RiskManager()
+    config_bt = BacktestConfig(
+        initial_capital=config.initial_capital,
+        min_ev=config.min_ev,
+        fit_workers=config.fit_workers,
+        checkpoint_path=config.checkpoint_path,
+        checkpoint_every=config.checkpoint_every,
+        allocation=config.allocation,
+        decision_window_minutes=config.decision_window_minutes,
+        keep_trades=config.keep_trades,
+        profiler=profiler,
+    )
+    if config.progress_every:
+        config_bt.on_progress = partial(_print_progress, initial_capital=config.initial_capital)
+        config_bt.progress_every = config.progress_every
+
+    writer = None
+    if config.results_dir is not None:
+        run_id = config.run_id or pd.Timestamp.now(tz="UTC").strftime("%Y%m%dT%H%M%S")
+        writer = results_writer(config.results_dir, run_id, config.results_format)
     engine = BacktestEngine(
-        calibrator_factory,
+        _calibrator_class(config.calibrator),
         cost_model,
         risk_manager,
         config_bt,
         book_lookup,
+        writer,
     )
-    backtest_result = engine.run(features, splits)
+    try:
+        if config.extend:
+            backtest_result = engine.extend(features, splits)
+        else:
+            backtest_result = engine.run(features, splits, resume=config.resume)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    with profiler.stage("metrics", rows=backtest_result["metrics"].trades):
+        if config.keep_trades:
+            result = compute_report(backtest_result["executed_trades"], config_bt.initial_capital)
+        else:
+            result = backtest_result["metrics"].report(config_bt.initial_capital)
+    result["backtest"] = backtest_result
+    result["profile"] = profiler.report()
+    if config.profile_path is not None:
+        profiler.write(config.profile_path)
+    return result
+
 
-    executed_trades = backtest_result["executed_trades"]
-    summary = compute_summary(executed_trades, config_bt.initial_capital)
-    monthly = compute_monthly_breakdown(executed_trades)
-    calibration = compute_calibration(executed_trades)
-    brier = brier_score(executed_trades)
+def run_parameter_sweep(
+    axes: Dict[str, Sequence[float]],
+    config: Optional[PipelineConfig] = None,
+    sweep_config: Optional[SweepConfig] = None,
+) -> pd.DataFrame:
+    """Backtest every combination in ``axes`` against one set of features.
 
-    result = {
-        "summary": summary,
-        "monthly": monthly,
-        "calibration": calibration,
-        "brier_score": brier,
-        "backtest": backtest_result,
+    Data loading and feature engineering run once; the grid is then fanned
+    out over worker processes by :func:`backtest.sweep.run_sweep`.
+    Parameters not in ``axes`` keep the values ``run_backtest`` uses.
+    """
+    from backtest.sweep import parameter_grid, run_sweep
+
+    base = Path(__file__).resolve().parent
+    data_dir = base / "data"
+    config = config or PipelineConfig(source="local", data_dir=data_dir)
+    profiler = config.profiler()
+    features, book_lookup, splits = _prepare_inputs(config, data_dir, profiler)
+
+    defaults = {
+        "taker_fee": 0.0,
+        "gas_cost": 0.25,
+        "borrow_rate": 0.05,
+        "initial_capital": config.initial_capital,
+        "min_ev": config.min_ev,
     }
+    grid = [{**defaults, **params} for params in parameter_grid(axes)]
+    with profiler.stage("sweep", rows=len(grid)):
+        table = run_sweep(
+            features,
+            book_lookup,
+            splits,
+            grid,
+            _calibrator_class(config.calibrator),
+            sweep_config,
+        )
+    if config.profile_path is not None:
+        profiler.write(config.profile_path)
+    return table
 
-    return result
 
+def _parse_sweep_axis(value: str) -> Tuple[str, List[float]]:
+    name, _, values = value.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected NAME=V1,V2,... but got {value!r}")
+    return name.strip(), [float(v) for v in values.split(",")]
 
-def _parse_args() -> PipelineConfig:
+
+def _parse_args() -> Tuple[PipelineConfig, argparse.Namespace]:
     parser = argparse.ArgumentParser(description="Run the Polymoly backtest")
     parser.add_argument(
         "--source",
@@ -252,9 +414,161 @@ def _parse_args() -> PipelineConfig:
         default=0.0,
         help="Minimum EV lower-bound threshold required to trade",
     )
+    parser.add_argument(
+        "--calibrator",
+        choices=["isotonic", "online", "gbdt"],
+        default="isotonic",
+        help="Calibrator: per-split isotonic, online tick histograms, or monotone GBDT",
+    )
+    parser.add_argument(
+        "--train-days",
+        type=float,
+        help="Walk-forward training window in days (default: single midpoint split)",
+    )
+    parser.add_argument(
+        "--test-days",
+        type=float,
+        default=30.0,
+        help="Walk-forward test window in days",
+    )
+    parser.add_argument(
+        "--step-days",
+        type=float,
+        help="Days between walk-forward folds (defaults to --test-days)",
+    )
+    parser.add_argument(
+        "--rolling",
+        action="store_true",
+        help="Train on the trailing --train-days only instead of an expanding window",
+    )
+    parser.add_argument(
+        "--embargo-days",
+        type=float,
+        default=0.0,
+        help="Gap in days between each training and test window",
+    )
+    parser.add_argument(
+        "--purge",
+        action="store_true",
+        help="Drop training trades whose market resolves after the test window starts",
+    )
+    parser.add_argument(
+        "--fit-workers",
+        type=int,
+        default=1,
+        help="Processes used to fit walk-forward folds in parallel (0 = all cores)",
+    )
+    parser.add_argument(
+        "--allocation",
+        choices=["sequential", "ranked"],
+        default="sequential",
+        help="First come, first served, or rank concurrent candidates by EV lower bound per day to resolution",
+    )
+    parser.add_argument(
+        "--decision-window-minutes",
+        type=float,
+        default=0.0,
+        help="With --allocation ranked, batch candidates arriving within this window",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="File that receives engine state after every split",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        help="Also checkpoint roughly every N test rows within a split",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from --checkpoint if it exists (e.g. after a crash)",
+    )
+    parser.add_argument(
+        "--extend",
+        action="store_true",
+        help="Process only trades after the last --checkpoint (e.g. a new day of data)",
+    )
+    parser.add_argument(
+        "--no-trades",
+        action="store_true",
+        help="Do not retain individual trades; report from running metrics",
+    )
+    parser.add_argument(
+        "--progress",
+        type=int,
+        metavar="N",
+        help="Print running metrics every N settled trades",
+    )
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        help="Stream trades and capital history here, partitioned by run id",
+    )
+    parser.add_argument(
+        "--run-id",
+        help="Partition name under --results-dir (defaults to the start time)",
+    )
+    parser.add_argument(
+        "--results-format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="File format for --results-dir (parquet needs pyarrow)",
+    )
+    parser.add_argument(
+        "--book-profile",
+        type=Path,
+        help="Saved BookProfile JSON used to synthesise missing order books",
+    )
+    parser.add_argument(
+        "--no-encode",
+        action="store_true",
+        help="Keep loaded strings as objects and numbers as 64-bit instead of dictionary-encoding the bundle",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Write per-stage wall/CPU time, peak RSS and row counts to this JSON file",
+    )
+    parser.add_argument(
+        "--profile-sample-ms",
+        type=float,
+        help="With --profile, also sample the engine loop's Python stack every MS milliseconds",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        type=_parse_sweep_axis,
+        metavar="NAME=V1,V2,...",
+        help="Sweep a risk, cost or engine parameter (repeat flag to add axes)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for --sweep (defaults to all cores)",
+    )
+    parser.add_argument(
+        "--sweep-output",
+        type=Path,
+        help="CSV file that receives one row per finished sweep configuration",
+    )
     args = parser.parse_args()
 
-    return PipelineConfig(
+    walk_forward = None
+    if args.train_days is not None:
+        from backtest.splits import WalkForwardConfig
+
+        walk_forward = WalkForwardConfig(
+            scheme="rolling" if args.rolling else "expanding",
+            train_days=args.train_days,
+            test_days=args.test_days,
+            step_days=args.step_days,
+            embargo_days=args.embargo_days,
+            purge=args.purge,
+        )
+
+    config = PipelineConfig(
         source=args.source,
         data_dir=args.data_dir,
         start=_coerce_timestamp(args.start),
@@ -264,13 +578,51 @@ def _parse_args() -> PipelineConfig:
         order_book_depth=args.depth,
         initial_capital=args.initial_capital,
         min_ev=args.min_ev,
+        calibrator=args.calibrator,
+        walk_forward=walk_forward,
+        fit_workers=args.fit_workers or None,
+        allocation=args.allocation,
+        decision_window_minutes=args.decision_window_minutes,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+        extend=args.extend,
+        keep_trades=not args.no_trades,
+        progress_every=args.progress,
+        results_dir=args.results_dir,
+        run_id=args.run_id,
+        results_format=args.results_format,
+        book_profile=args.book_profile,
+        encode=not args.no_encode,
+        profile_path=args.profile,
+        profile_sample_ms=args.profile_sample_ms,
+    )
+    return config, args
+
+
+def _sweep_config(args: argparse.Namespace) -> SweepConfig:
+    from backtest.sweep import SweepConfig
+
+    return SweepConfig(
+        n_workers=args.workers,
+        output_path=args.sweep_output,
+        results_dir=args.results_dir,
+        results_format=args.results_format,
     )
 
 
 if __name__ == "__main__":
-    config = _parse_args()
+    config, args = _parse_args()
+    if args.sweep:
+        table = run_parameter_sweep(dict(args.sweep), config, _sweep_config(args))
+        print("=== Parameter Sweep ===")
+        print(table.to_string(index=False))
+        raise SystemExit(0)
     output = run_backtest(config)
     print("=== Backtest Summary ===")
     for key, value in output["summary"].items():
         print(f"{key}: {value}")
+    print("=== Risk-Adjusted ===")
+    for key, value in output["risk_adjusted"].items():
+        print(f"{key}: {value}")
     print(f"Brier score: {output['brier_score']}")
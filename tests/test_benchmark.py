@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmark import (
+    ROOT,
+    STARTUP_COMMANDS,
+    BenchmarkConfig,
+    compare_to_baseline,
+    load_baselines,
+    run_benchmark,
+    save_baseline,
+)
+from feature.make_features import compute_features
+from feature.make_labels import attach_labels
+from ingest.synthetic import SyntheticMarketConfig, generate_bundle
+
+
+def test_synthetic_bundle_is_internally_consistent():
+    bundle = generate_bundle(SyntheticMarketConfig(n_markets=30, n_trades=3_000, seed=3))
+    trades = bundle.trades
+    assert not trades.duplicated(["token_id", "timestamp"]).any()
+    assert trades["timestamp"].is_monotonic_increasing
+    assert set(trades["condition_id"]) <= set(bundle.markets["condition_id"])
+
+    market = bundle.markets.set_index("condition_id").loc[trades["condition_id"]]
+    assert (trades["token_id"].to_numpy() == market["clob_token_yes"].to_numpy()).all()
+    assert (trades["timestamp"].to_numpy() < market["end_date"].to_numpy()).all()
+    markets = bundle.markets.set_index("condition_id")
+    resolutions = bundle.resolutions.set_index("condition_id")
+    assert (resolutions.loc[markets.index, "resolve_ts"] > markets["end_date"]).all()
+
+    best = bundle.books.loc[bundle.books["level"] == 1].pivot(
+        index=["token_id", "timestamp"], columns="side", values="price"
+    )
+    quoted = best.loc[pd.MultiIndex.from_frame(trades[["token_id", "timestamp"]])]
+    np.testing.assert_allclose(quoted["ask"], trades["price"])
+    assert (quoted["bid"] < quoted["ask"]).all()
+
+    features = compute_features(
+        attach_labels(trades, bundle.resolutions), bundle.markets, bundle.books, bundle.prices
+    )
+    assert len(features) > 0.95 * len(trades)
+    assert features["trade_id"].is_unique
+    # Prices lean towards the realised outcome.
+    assert features.groupby("outcome")["price"].mean().diff().iloc[-1] > 0.2
+
+
+def test_benchmark_flags_regressions_against_baseline(tmp_path):
+    config = BenchmarkConfig(n_markets=10, n_trades=500, repeat=1)
+    result = run_benchmark(config)
+    assert {"generate", "compute_features", "engine.loop", "metrics"} <= set(result["stages"])
+    assert result["rows"]["generate"] > 0
+
+    path = tmp_path / "baseline.json"
+    save_baseline(path, result)
+    baseline = load_baselines(path)[config.key]
+    assert not compare_to_baseline(result, baseline)["regression"].any()
+
+    stages = dict(result["stages"])
+    stages["compute_features"] += 1.0
+    slower = {**result, "stages": stages}
+    table = compare_to_baseline(slower, baseline).set_index("stage")
+    assert table.loc["compute_features", "regression"]
+    assert table["regression"].sum() == 1
+
+
+def test_cli_startup_defers_heavy_imports():
+    for module in ("run_backtest", "paper_trade"):
+        probe = f"import sys, {module}; print(sorted({{'pandas', 'scipy', 'requests'}} & set(sys.modules)))"
+        loaded = subprocess.run(
+            [sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout.strip()
+        assert loaded == "[]", f"{module} imports {loaded} at startup"
+    for command in STARTUP_COMMANDS.values():
+        output = subprocess.run([sys.executable, *command], cwd=ROOT, check=True, capture_output=True, text=True)
+        assert "usage:" in output.stdout
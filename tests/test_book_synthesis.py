@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from feature.make_features import compute_features
+from feature.make_labels import attach_labels
+from ingest.book_synthesis import BookProfile, fill_missing_books, synthesise_books
+from ingest.synthetic import SyntheticMarketConfig, generate_bundle
+
+
+def test_synthesised_books_follow_heuristic_without_profile():
+    ts = pd.Timestamp("2024-01-01T00:00:00Z")
+    trades = pd.DataFrame(
+        {
+            "token_id": ["b", "a", "a"],
+            "timestamp": [ts, ts, ts],
+            "price": [0.95, 0.1, 0.1],
+            "size": [100.0, 0.0, 0.0],
+        }
+    )
+    books = synthesise_books(trades, levels=3)
+    # One snapshot per (token, timestamp), in loader order.
+    assert len(books) == 2 * 2 * 3
+    assert books["token_id"].tolist() == ["a"] * 6 + ["b"] * 6
+    b_asks = books.loc[(books["token_id"] == "b") & (books["side"] == "ask")]
+    np.testing.assert_allclose(b_asks["price"], [0.95 + 0.0095, 0.95 + 0.019, 0.95 + 0.0285])
+    np.testing.assert_allclose(b_asks["size"], [100.0, 75.0, 50.0])
+    a_bids = books.loc[(books["token_id"] == "a") & (books["side"] == "bid")]
+    np.testing.assert_allclose(a_bids["price"], [0.098, 0.096, 0.094])
+    np.testing.assert_allclose(a_bids["size"], [1.0, 0.75, 0.5])
+
+
+def test_missing_books_are_filled_from_fitted_profile(tmp_path):
+    bundle = generate_bundle(SyntheticMarketConfig(n_markets=20, n_trades=6_000, seed=5))
+    tokens = bundle.markets["clob_token_yes"]
+    dropped = set(tokens.iloc[::2])
+    books = bundle.books.loc[~bundle.books["token_id"].isin(dropped)]
+
+    filled = fill_missing_books(books, bundle.trades, bundle.markets)
+    assert len(filled) == len(bundle.books)
+    features = compute_features(
+        attach_labels(bundle.trades, bundle.resolutions), bundle.markets, filled, bundle.prices
+    )
+    assert len(features) > 0.95 * len(bundle.trades)
+
+    def best_offsets(frame):
+        top = frame.loc[frame["level"] == 1].merge(bundle.trades, on=["token_id", "timestamp"])
+        top["offset"] = (top["price_x"] - top["price_y"]).abs()
+        return top.pivot_table(index="token_id", columns="side", values="offset", aggfunc="median")
+
+    real = best_offsets(bundle.books.loc[bundle.books["token_id"].isin(dropped)])
+    synthetic = best_offsets(filled.loc[filled["token_id"].isin(dropped)])
+    # The generator quotes the trade price as best ask and a geometric number
+    # of ticks below it as best bid; the heuristic would quote 1% either side.
+    np.testing.assert_allclose(synthetic["ask"], 0.0, atol=1e-9)
+    assert abs(synthetic["bid"].median() - real["bid"].median()) < 0.005
+
+    profile = BookProfile.fit(books, bundle.trades, bundle.markets)
+    assert profile.shapes
+    path = tmp_path / "profile.json"
+    profile.save(path)
+    reloaded = synthesise_books(bundle.trades, profile=BookProfile.load(path), markets=bundle.markets)
+    pd.testing.assert_frame_equal(
+        reloaded, synthesise_books(bundle.trades, profile=profile, markets=bundle.markets)
+    )
@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import numpy as np
 import pandas as pd
+import pytest
 
-from model.calibrate_isotonic import IsotonicCalibrator
+from model.calibrate_isotonic import CalibrationConfig, IsotonicCalibrator
+from model.bootstrap import BootstrapConfig, bootstrap_calibration_bands
+from model.gbdt_monotone import GBDTConfig, MonotoneGBDTCalibrator
+from model.online_calibrator import OnlineIsotonicCalibrator
 
 
 def test_isotonic_monotonic():
@@ -17,3 +21,105 @@ def test_isotonic_monotonic():
     preds = calibrator.transform(df)
     q_hat = preds["q_hat"].to_numpy()
     assert np.all(np.diff(q_hat) >= -1e-8)
+
+
+def _tick_aligned_sample() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    prices = np.round(rng.uniform(0.8, 0.99, 200), 2)
+    outcomes = (rng.uniform(size=200) < prices).astype(float)
+    buckets = rng.choice(["1-3d", "7-30d"], size=200)
+    return pd.DataFrame({"price": prices, "outcome": outcomes, "tau_bucket": buckets})
+
+
+def test_online_calibrator_matches_batch_lower_bound():
+    df = _tick_aligned_sample()
+    config = CalibrationConfig(neighborhood=0.035)
+    batch = IsotonicCalibrator(config)
+    batch.fit(df)
+    online = OnlineIsotonicCalibrator(config, tick_size=0.01)
+    online.fit(df)
+
+    expected = batch.transform(df)
+    actual = online.transform(df)
+    np.testing.assert_array_equal(actual["sample_count"], expected["sample_count"])
+    unclipped = (actual["q_lower"] < actual["q_hat"]) & (expected["q_lower"] < expected["q_hat"])
+    np.testing.assert_allclose(
+        actual.loc[unclipped, "q_lower"], expected.loc[unclipped, "q_lower"], atol=1e-9
+    )
+    for _, group in actual.sort_values("price").groupby("tau_bucket"):
+        assert np.all(np.diff(group["q_hat"].to_numpy()) >= -1e-8)
+
+
+def test_online_partial_fit_equals_full_fit():
+    df = _tick_aligned_sample()
+    full = OnlineIsotonicCalibrator(tick_size=0.01)
+    full.fit(df)
+    incremental = OnlineIsotonicCalibrator(tick_size=0.01)
+    incremental.partial_fit(df.iloc[:80]).partial_fit(df.iloc[80:])
+
+    assert incremental.n_observations == len(df)
+    pd.testing.assert_frame_equal(incremental.transform(df), full.transform(df))
+
+
+def test_isotonic_save_load_roundtrip(tmp_path):
+    df = _tick_aligned_sample()
+    calibrator = IsotonicCalibrator(CalibrationConfig(alpha=0.1))
+    calibrator.fit(df)
+    artifact = tmp_path / "calibrator.bin"
+    calibrator.save(artifact)
+
+    loaded = IsotonicCalibrator.load(artifact)
+    assert loaded.config == calibrator.config
+    pd.testing.assert_frame_equal(loaded.transform(df), calibrator.transform(df))
+
+    content = artifact.read_bytes()
+    for cut in (8, len(content) // 2, len(content) - 20):
+        truncated = tmp_path / f"truncated_{cut}.bin"
+        truncated.write_bytes(content[:-cut])
+        with pytest.raises(ValueError, match="truncated"):
+            IsotonicCalibrator.load(truncated)
+
+
+def test_bootstrap_bands_reproducible_across_workers():
+    df = _tick_aligned_sample()
+    df["condition_id"] = [f"market_{i % 25}" for i in range(len(df))]
+    serial = bootstrap_calibration_bands(df, BootstrapConfig(n_resamples=40, chunk_size=10, n_workers=1))
+    pooled = bootstrap_calibration_bands(df, BootstrapConfig(n_resamples=40, chunk_size=10, n_workers=2))
+
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert np.all(serial["lower"] <= serial["upper"])
+    assert serial["count"].sum() == len(df)
+
+    with pytest.raises(ValueError, match="chunk_size"):
+        bootstrap_calibration_bands(df, BootstrapConfig(n_resamples=40, chunk_size=0))
+    df.loc[3, "condition_id"] = None
+    with pytest.raises(ValueError, match="condition_id"):
+        bootstrap_calibration_bands(df, BootstrapConfig(n_resamples=40, n_workers=1))
+
+
+def test_gbdt_calibrator_is_monotone_in_price():
+    rng = np.random.default_rng(3)
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "price": rng.uniform(0.5, 0.99, n),
+            "time_to_event_days": rng.exponential(10.0, n),
+            "spread": rng.uniform(0.0, 0.05, n),
+            "ask_depth": rng.exponential(100.0, n),
+            "category": rng.choice(["politics", "sports", "crypto"], n),
+            "tau_bucket": rng.choice(["1-3d", "7-30d"], n),
+        }
+    )
+    df["outcome"] = (rng.uniform(size=n) < df["price"]).astype(float)
+
+    calibrator = MonotoneGBDTCalibrator(GBDTConfig(n_estimators=30, min_samples_leaf=10))
+    calibrator.fit(df)
+    grid = df.iloc[:50].copy()
+    curves = []
+    for price in np.linspace(0.4, 1.0, 25):
+        grid["price"] = price
+        curves.append(calibrator.transform(grid)["q_hat"].to_numpy())
+    assert np.all(np.diff(np.array(curves), axis=0) >= -1e-12)
+
+    preds = calibrator.transform(df)
+    assert np.all(preds["q_lower"] <= preds["q_hat"] + 1e-12)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from backtest.cost_model import CostModel
+
+
+def _book(prices, sizes) -> pd.DataFrame:
+    levels = np.arange(1, len(prices) + 1)
+    return pd.DataFrame(
+        {
+            "side": ["ask"] * len(prices) + ["bid"],
+            "level": list(levels) + [1],
+            "price": list(prices) + [min(prices) - 0.01],
+            "size": list(sizes) + [100.0],
+        }
+    )
+
+
+def test_vwap_walks_levels():
+    model = CostModel(gas_cost=0.0, borrow_rate=0.0)
+    breakdown = model.estimate_cost(_book([0.90, 0.92], [100.0, 100.0]), 150.0, 1.0)
+    assert breakdown.filled_size == 150.0
+    assert abs(breakdown.execution_price - (100 * 0.90 + 50 * 0.92) / 150) < 1e-12
+    assert abs(breakdown.slippage_cost - (breakdown.execution_price - 0.90) * 150) < 1e-12
+
+
+def test_size_for_notional_fills_budget_exactly():
+    model = CostModel()
+    book = _book([0.90, 0.92, 0.95], [100.0, 100.0, 100.0])
+    breakdown = model.estimate_cost_for_notional(book, 150.0, 3.0)
+    assert abs(breakdown.notional - 150.0) < 1e-9
+    capped = model.estimate_cost_for_notional(book, 1_000.0, 3.0)
+    assert capped.filled_size == 300.0
+
+
+def test_batch_costs_match_scalar_path():
+    model = CostModel(taker_fee=0.01)
+    books = [_book([0.90, 0.92], [50.0, 80.0]), _book([0.95, 0.96, 0.99], [10.0, 10.0, 500.0])]
+    sizes = np.array([70.0, 600.0])
+    taus = np.array([2.0, 10.0])
+    batch = model.estimate_costs(books, sizes, taus)
+    for i, book in enumerate(books):
+        scalar = model.estimate_cost(book, sizes[i], taus[i])
+        for name in ("execution_price", "filled_size", "slippage_cost", "taker_fee_cost", "borrow_cost"):
+            assert abs(batch[name][i] - getattr(scalar, name)) < 1e-9
+
+    budgets = np.array([40.0, 100.0])
+    expected = [model.ladder(book).size_for_notional(b) for book, b in zip(books, budgets)]
+    np.testing.assert_allclose(model.max_sizes_for_notional(books, budgets), expected)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from feature.make_features import compute_features
+from feature.make_labels import attach_labels
+from ingest.encoding import decode_frame, encode_bundle, memory_report, narrow_numeric
+from ingest.synthetic import SyntheticMarketConfig, generate_bundle
+
+
+def test_encoded_bundle_shares_one_dictionary_and_keeps_features():
+    bundle = generate_bundle(SyntheticMarketConfig(n_markets=20, n_trades=2_000, seed=5))
+    encoded = encode_bundle(bundle)
+
+    dictionary = encoded.trades["token_id"].dtype
+    assert isinstance(dictionary, pd.CategoricalDtype)
+    for frame, column in [
+        (encoded.markets, "clob_token_yes"),
+        (encoded.markets, "neg_risk_group"),
+        (encoded.resolutions, "condition_id"),
+        (encoded.books, "side"),
+        (encoded.prices, "token_id"),
+    ]:
+        assert frame[column].dtype == dictionary
+    assert list(dictionary.categories) == sorted(dictionary.categories)
+    assert encoded.books["size"].dtype == np.int32
+    assert encoded.trades["price"].dtype == np.float64
+    assert encoded.trades["trade_id"].dtype == object
+    pd.testing.assert_frame_equal(decode_frame(encoded.markets), bundle.markets)
+
+    before = memory_report(bundle).set_index("frame")["bytes"]
+    after = memory_report(encoded).set_index("frame")["bytes"]
+    assert after.sum() < 0.5 * before.sum()
+    assert (after.drop("dictionary") < before).all()
+
+    features = [
+        compute_features(attach_labels(b.trades, b.resolutions), b.markets, b.books, b.prices)
+        for b in (bundle, encoded)
+    ]
+    plain, coded = features
+    assert coded["category"].dtype == dictionary
+    coded = decode_frame(coded).astype(plain.dtypes.to_dict())
+    pd.testing.assert_frame_equal(coded, plain)
+
+
+def test_narrow_numeric_only_drops_lossless_precision():
+    assert narrow_numeric(pd.Series([1, 2, 3])).dtype == np.int32
+    assert narrow_numeric(pd.Series([0, 2**40])).dtype == np.int64
+    assert narrow_numeric(pd.Series([0.5, 1.25, np.nan])).dtype == np.float32
+    assert narrow_numeric(pd.Series([0.123, 0.5])).dtype == np.float64
+    assert narrow_numeric(pd.Series([True, False])).dtype == bool
@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.cost_model import CostModel
+from backtest.engine import BacktestConfig, BacktestEngine
+from backtest.results import TradeLog
+from backtest.risk import RiskConfig, RiskManager
+from backtest.splits import WalkForwardConfig, walk_forward_splits
+from backtest.sweep import SweepConfig, _attach_inputs, _share_inputs, parameter_grid, run_sweep
+from backtest.writers import CSVResultsWriter, ParquetResultsWriter, load_results
+from model.calibrate_isotonic import IsotonicCalibrator
+from report.metrics import compute_report
+
+
+def _engine_inputs():
+    start = pd.Timestamp("2024-01-01T00:00:00Z")
+    rows = []
+    for i in range(40):
+        ts = start + pd.Timedelta(hours=6 * i)
+        rows.append(
+            {
+                "trade_id": f"trade_{i}",
+                "token_id": f"token_{i % 4}",
+                "condition_id": f"market_{i % 4}",
+                "timestamp": ts,
+                "price": 0.9,
+                "size": 100.0,
+                "outcome": 1,
+                "time_to_event_days": 5.0,
+                "tau_bucket": "3-7d",
+                "category": "politics" if i % 2 else "sports",
+                "neg_risk_group": None,
+                "slug": f"market-{i % 4}",
+                # Later entries can resolve first, so settlement order differs
+                # from entry order.
+                "resolve_ts": ts + pd.Timedelta(hours=30 - 12 * (i % 3)),
+            }
+        )
+    data = pd.DataFrame(rows)
+    books = {}
+    for row in rows:
+        books[(row["token_id"], row["timestamp"])] = pd.DataFrame(
+            {
+                "side": ["ask", "ask", "bid"],
+                "level": [1, 2, 1],
+                "price": [0.9, 0.91, 0.89],
+                "size": [100.0, 100.0, 100.0],
+            }
+        )
+    splits = [(start + pd.Timedelta(days=3), start + pd.Timedelta(days=10))]
+    return data, books, splits
+
+
+def _run_engine():
+    data, books, splits = _engine_inputs()
+    engine = BacktestEngine(
+        IsotonicCalibrator, CostModel(), RiskManager(), BacktestConfig(min_ev=-1.0), books
+    )
+    return engine.run(data, splits)
+
+
+def test_engine_settles_every_position():
+    result = _run_engine()
+    trades = result["executed_trades"]
+    entries = len(result["capital_history"]) - len(trades) - 1
+    assert len(trades) > 0
+    assert entries == len(trades)
+    pnl = sum(t.pnl for t in trades)
+    assert abs(result["ending_capital"] - (100_000.0 + pnl)) < 1e-6
+    assert result["capital_history"][-1][1] == result["ending_capital"]
+
+
+def test_prescreen_rejects_state_free_failures():
+    data, books, _ = _engine_inputs()
+    frame = data.iloc[:4].copy()
+    frame["q_hat"] = [0.97, float("nan"), 0.85, 0.97]
+    frame["q_lower"] = [0.95, 0.95, 0.80, 0.95]
+    del books[(frame.loc[3, "token_id"], frame.loc[3, "timestamp"])]
+
+    engine = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), BacktestConfig(), books)
+    mask = engine._prescreen(frame)
+    assert mask.tolist() == [True, False, False, False]
+
+
+def test_engine_results_are_columnar():
+    result = _run_engine()
+    trades = result["executed_trades"]
+    frame = trades.to_frame()
+    assert len(frame) == len(trades)
+    assert str(frame["resolve_ts"].dt.tz) == "UTC"
+    assert abs(frame["pnl"].sum() - sum(t.pnl for t in trades)) < 1e-9
+    history = result["capital_history"].to_frame()
+    assert list(history.columns) == ["timestamp", "capital"]
+
+
+def test_sweep_workers_match_serial_run(tmp_path):
+    data, books, splits = _engine_inputs()
+    grid = parameter_grid({"kelly_lambda": [0.2, 0.4], "min_ev": [-1.0]})
+    serial = run_sweep(data, books, splits, grid, IsotonicCalibrator, SweepConfig(n_workers=1))
+    output = tmp_path / "sweep.csv"
+    pooled = run_sweep(
+        data, books, splits, grid, IsotonicCalibrator, SweepConfig(n_workers=2, output_path=output)
+    )
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert len(pd.read_csv(output)) == len(grid)
+    assert serial.loc[0, "trades"] > 0
+    assert serial["kelly_lambda"].tolist() == [0.2, 0.4]
+
+
+class _CountingCalibrator(IsotonicCalibrator):
+    fits = 0
+
+    def fit(self, data):
+        type(self).fits += 1
+        return super().fit(data)
+
+
+def test_sweep_fits_each_fold_once():
+    data, books, splits = _engine_inputs()
+    grid = parameter_grid({"kelly_lambda": [0.2, 0.4, 0.6], "min_ev": [-1.0, 0.0]})
+    _CountingCalibrator.fits = 0
+    run_sweep(data, books, splits, grid, _CountingCalibrator, SweepConfig(n_workers=1))
+    assert _CountingCalibrator.fits == len(splits)
+
+
+def test_sweep_workers_read_folds_from_shared_memory():
+    data, books, _ = _engine_inputs()
+    splits = walk_forward_splits(data["timestamp"], WalkForwardConfig(train_days=3, test_days=2))
+    engine = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), BacktestConfig(), books)
+    folds = engine.predict_folds(data, splits)
+    block, inputs = _share_inputs(folds, books)
+    attached = shared_memory.SharedMemory(name=inputs.name)
+    try:
+        shared_folds, lookup = _attach_inputs(attached, inputs)
+        buffer = np.frombuffer(attached.buf, dtype=np.uint8)
+        assert [fold is None for fold in shared_folds] == [fold is None for fold in folds]
+        for fold, shared in zip(folds, shared_folds):
+            if fold is None:
+                continue
+            for name in fold.columns:
+                column = shared[name]
+                if isinstance(column.dtype, pd.CategoricalDtype):
+                    values = column.cat.codes.to_numpy()
+                    assert column.astype(object).where(column.notna(), None).tolist() == fold[name].tolist()
+                elif isinstance(column.dtype, pd.DatetimeTZDtype):
+                    values = pd.DatetimeIndex(column).asi8
+                    assert column.tolist() == fold[name].tolist()
+                else:
+                    values = column.to_numpy()
+                    np.testing.assert_array_equal(values, fold[name].to_numpy())
+                assert np.shares_memory(values, buffer), name
+        del shared_folds, lookup, buffer, column, values
+    finally:
+        attached.close()
+        block.close()
+        block.unlink()
+
+
+def test_walk_forward_splits_respect_windows():
+    data, _, _ = _engine_inputs()
+    config = WalkForwardConfig(scheme="rolling", train_days=3, test_days=2, embargo_days=0.5, purge=True)
+    splits = walk_forward_splits(data["timestamp"], config)
+    assert len(splits) == 4
+    for split in splits:
+        train = data.loc[split.train_mask(data)]
+        test = data.loc[split.test_mask(data)]
+        assert train["timestamp"].min() >= split.train_end - pd.Timedelta(days=3)
+        assert train["resolve_ts"].max() <= split.test_begin
+        assert test["timestamp"].min() > split.train_end + pd.Timedelta(days=0.5)
+    tested = pd.concat([data.loc[s.test_mask(data), "trade_id"] for s in splits])
+    assert tested.is_unique
+
+
+def test_parallel_fold_fitting_matches_serial():
+    data, books, _ = _engine_inputs()
+    splits = walk_forward_splits(data["timestamp"], WalkForwardConfig(train_days=3, test_days=2))
+    results = []
+    for workers in (1, 2):
+        engine = BacktestEngine(
+            IsotonicCalibrator,
+            CostModel(),
+            RiskManager(),
+            BacktestConfig(min_ev=-1.0, fit_workers=workers),
+            books,
+        )
+        results.append(engine.run(data, splits))
+    serial, pooled = results
+    assert len(serial["executed_trades"]) > 0
+    pd.testing.assert_frame_equal(
+        serial["executed_trades"].to_frame(), pooled["executed_trades"].to_frame()
+    )
+    assert serial["ending_capital"] == pooled["ending_capital"]
+
+
+class _CrashingRiskManager(RiskManager):
+    def __init__(self, crash_after: int) -> None:
+        super().__init__()
+        self._remaining = crash_after
+
+    def register_coded(self, *args) -> None:
+        if self._remaining == 0:
+            raise RuntimeError("simulated crash")
+        self._remaining -= 1
+        super().register_coded(*args)
+
+
+def test_resume_after_crash_matches_uninterrupted_run(tmp_path):
+    data, books, splits = _engine_inputs()
+    expected = _run_engine()
+    config = BacktestConfig(min_ev=-1.0, checkpoint_path=tmp_path / "state.pkl", checkpoint_every=3)
+
+    crashing = BacktestEngine(IsotonicCalibrator, CostModel(), _CrashingRiskManager(6), config, books)
+    with pytest.raises(RuntimeError, match="simulated crash"):
+        crashing.run(data, splits)
+    assert config.checkpoint_path.exists()
+
+    resumed = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books)
+    result = resumed.run(data, splits, resume=True)
+    pd.testing.assert_frame_equal(
+        result["executed_trades"].to_frame(), expected["executed_trades"].to_frame()
+    )
+    pd.testing.assert_frame_equal(
+        result["capital_history"].to_frame(), expected["capital_history"].to_frame()
+    )
+    assert result["metrics"].summary(100_000.0) == pytest.approx(expected["metrics"].summary(100_000.0))
+
+
+def test_extend_processes_only_new_rows(tmp_path):
+    data, books, splits = _engine_inputs()
+    expected = _run_engine()
+    config = BacktestConfig(min_ev=-1.0, checkpoint_path=tmp_path / "state.pkl")
+
+    first_days = data.loc[data["timestamp"] < pd.Timestamp("2024-01-07T00:00:00Z")]
+    BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books).run(first_days, splits)
+    extended = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books).extend(data, splits)
+    pd.testing.assert_frame_equal(
+        extended["executed_trades"].to_frame(), expected["executed_trades"].to_frame()
+    )
+    assert extended["ending_capital"] == expected["ending_capital"]
+
+
+def test_running_metrics_match_report_without_keeping_trades():
+    data, books, splits = _engine_inputs()
+    expected = _run_engine()
+    seen = []
+    config = BacktestConfig(
+        min_ev=-1.0, keep_trades=False, on_progress=lambda m: seen.append(m.trades), progress_every=5
+    )
+    result = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books).run(data, splits)
+
+    assert len(result["executed_trades"]) == 0
+    assert result["ending_capital"] == expected["ending_capital"]
+    assert seen and seen == sorted(seen) and seen[-1] <= len(expected["executed_trades"])
+    report = compute_report(expected["executed_trades"], 100_000.0)
+    running = result["metrics"].report(100_000.0)
+    assert running["summary"] == pytest.approx(report["summary"])
+    assert running["brier_score"] == pytest.approx(report["brier_score"])
+    pd.testing.assert_frame_equal(running["monthly"], report["monthly"])
+    pd.testing.assert_frame_equal(running["calibration"], report["calibration"])
+
+
+def test_results_writer_streams_trades_and_capital(tmp_path):
+    data, books, splits = _engine_inputs()
+    expected = _run_engine()
+    config = BacktestConfig(min_ev=-1.0, keep_trades=False)
+    with CSVResultsWriter(tmp_path, "single", row_group_size=4) as writer:
+        BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books, writer).run(data, splits)
+
+    trades = load_results(tmp_path, "trades").drop(columns="run_id")
+    expected_trades = expected["executed_trades"].to_frame()
+    assert len(trades) == len(expected_trades) > 4
+    pd.testing.assert_frame_equal(
+        trades[["trade_id", "timestamp", "resolve_ts", "shares", "pnl"]],
+        expected_trades[["trade_id", "timestamp", "resolve_ts", "shares", "pnl"]],
+    )
+    capital = load_results(tmp_path, "capital").drop(columns="run_id")
+    pd.testing.assert_frame_equal(capital, expected["capital_history"].to_frame())
+
+    grid = parameter_grid({"kelly_lambda": [0.2, 0.4], "min_ev": [-1.0]})
+    table = run_sweep(
+        data, books, splits, grid, IsotonicCalibrator, SweepConfig(n_workers=1, results_dir=tmp_path / "sweep")
+    )
+    stored = load_results(tmp_path / "sweep").groupby("run_id").size()
+    assert stored.to_dict() == dict(zip(table["run_id"], table["trades"]))
+
+
+@pytest.mark.parametrize("writer_class", [CSVResultsWriter, ParquetResultsWriter])
+def test_results_writer_resumes_from_checkpoint(tmp_path, writer_class):
+    if writer_class is ParquetResultsWriter:
+        pytest.importorskip("pyarrow")
+    data, books, splits = _engine_inputs()
+    expected = _run_engine()
+    config = BacktestConfig(min_ev=-1.0, checkpoint_path=tmp_path / "state.pkl", checkpoint_every=3)
+
+    # Every row is flushed at once, so the crashed run leaves rows past its checkpoint.
+    with writer_class(tmp_path / "results", "run", row_group_size=1) as writer:
+        crashing = BacktestEngine(IsotonicCalibrator, CostModel(), _CrashingRiskManager(6), config, books, writer)
+        with pytest.raises(RuntimeError, match="simulated crash"):
+            crashing.run(data, splits)
+    assert len(load_results(tmp_path / "results", "capital")) > 0
+
+    with writer_class(tmp_path / "results", "run", row_group_size=4) as writer:
+        resumed = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books, writer)
+        result = resumed.run(data, splits, resume=True)
+
+    trades = load_results(tmp_path / "results", "trades").drop(columns="run_id")
+    assert len(trades) == len(result["executed_trades"]) == len(expected["executed_trades"])
+    pd.testing.assert_frame_equal(
+        trades[["trade_id", "timestamp", "resolve_ts", "shares", "pnl"]],
+        expected["executed_trades"].to_frame()[["trade_id", "timestamp", "resolve_ts", "shares", "pnl"]],
+    )
+    capital = load_results(tmp_path / "results", "capital").drop(columns="run_id")
+    pd.testing.assert_frame_equal(capital, expected["capital_history"].to_frame())
+
+
+def test_parquet_writer_resumes_after_crash_without_close(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    data, books, splits = _engine_inputs()
+    expected = _run_engine()
+    config = BacktestConfig(min_ev=-1.0, checkpoint_path=tmp_path / "state.pkl", checkpoint_every=3)
+
+    # The crashed writer is never closed, as after SIGKILL: its open part has no footer.
+    crashed = ParquetResultsWriter(tmp_path / "results", "run", row_group_size=1)
+    crashing = BacktestEngine(IsotonicCalibrator, CostModel(), _CrashingRiskManager(6), config, books, crashed)
+    with pytest.raises(RuntimeError, match="simulated crash"):
+        crashing.run(data, splits)
+    *closed, open_part = sorted((tmp_path / "results" / "run_id=run" / "capital").glob("part-*.parquet"))
+    assert closed
+    for part in closed:
+        pq.read_table(part)
+    with pytest.raises(Exception, match="magic bytes"):
+        pq.read_table(open_part)
+
+    with ParquetResultsWriter(tmp_path / "results", "run", row_group_size=4) as writer:
+        resumed = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books, writer)
+        resumed.run(data, splits, resume=True)
+
+    trades = load_results(tmp_path / "results", "trades").drop(columns="run_id")
+    pd.testing.assert_frame_equal(
+        trades[["trade_id", "timestamp", "resolve_ts", "shares", "pnl"]],
+        expected["executed_trades"].to_frame()[["trade_id", "timestamp", "resolve_ts", "shares", "pnl"]],
+    )
+    capital = load_results(tmp_path / "results", "capital").drop(columns="run_id")
+    pd.testing.assert_frame_equal(capital, expected["capital_history"].to_frame())
+
+
+def test_parquet_writer_schema_allows_strings_after_missing_values(tmp_path):
+    pytest.importorskip("pyarrow")
+    row = dict.fromkeys(TradeLog.schema, 1.0)
+    row.update(trade_id="t", condition_id="m", category="c", token_id="tok", timestamp=0, resolve_ts=1)
+    with ParquetResultsWriter(tmp_path, "run", row_group_size=1) as writer:
+        writer.write_trade(*{**row, "neg_risk_group": None}.values())
+        writer.write_trade(*{**row, "neg_risk_group": "group"}.values())
+    trades = load_results(tmp_path)
+    assert trades["neg_risk_group"].tolist() == [None, "group"]
+
+
+def test_decision_window_enters_at_the_decision_time():
+    data, books, splits = _engine_inputs()
+    config = BacktestConfig(min_ev=-1.0, allocation="ranked", decision_window_minutes=13 * 60)
+    engine = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books)
+    result = engine.run(data, splits)
+
+    trades = result["executed_trades"].to_frame()
+    capital = result["capital_history"].to_frame()
+    assert len(trades) > 0
+    # Every entry is stamped when its capital was debited, and its market is
+    # still open then.
+    debits = capital.loc[capital["capital"].diff() < 0, "timestamp"]
+    assert set(trades["timestamp"]) <= set(debits)
+    assert (trades["resolve_ts"] > trades["timestamp"]).all()
+
+
+def test_undelayed_entries_are_not_checked_against_resolution():
+    data, books, splits = _engine_inputs()
+    late = data["trade_id"] == "trade_20"
+    data.loc[late, "resolve_ts"] = data.loc[late, "timestamp"]
+    for allocation in ("sequential", "ranked"):
+        config = BacktestConfig(min_ev=-1.0, allocation=allocation)
+        result = BacktestEngine(IsotonicCalibrator, CostModel(), RiskManager(), config, books).run(data, splits)
+        assert "trade_20" in set(result["executed_trades"].to_frame()["trade_id"])
+
+
+class _ConstantCalibrator:
+    def fit(self, data):
+        return self
+
+    def transform(self, data):
+        return pd.DataFrame({"q_hat": 0.97, "q_lower": 0.95}, index=data.index)
+
+
+def test_ranked_allocation_prefers_short_dated_edge():
+    data, books, splits = _engine_inputs()
+    decision = pd.Timestamp("2024-01-05T00:00:00Z")
+    contender = data.loc[data["timestamp"] == decision].iloc[0]
+    short = contender.copy()
+    short["trade_id"] = "trade_short"
+    short["token_id"] = "token_short"
+    short["condition_id"] = "market_short"
+    books[("token_short", decision)] = books[(contender["token_id"], decision)]
+    data["time_to_event_days"] = 30.0
+    short["time_to_event_days"] = 1.0
+    data["category"] = "sports"
+    short["category"] = "sports"
+    split = [(decision - pd.Timedelta(hours=1), decision)]
+    # Caps leave room for a single position at the decision time.
+    risk = RiskConfig(category_cap=0.001, max_fraction=0.001)
+
+    for rows in ([data, short.to_frame().T], [short.to_frame().T, data]):
+        frame = pd.concat(rows, ignore_index=True)
+        engine = BacktestEngine(
+            _ConstantCalibrator,
+            CostModel(),
+            RiskManager(risk),
+            BacktestConfig(min_ev=-1.0, allocation="ranked"),
+            books,
+        )
+        trades = engine.run(frame, split)["executed_trades"]
+        assert [t.trade_id for t in trades] == ["trade_short"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from report.monte_carlo import MonteCarloConfig, simulate_outcomes, summarise_paths
+
+
+def _trades(n: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    timestamps = pd.Timestamp("2024-01-01T00:00:00Z") + pd.to_timedelta(np.arange(n) * 3, unit="D")
+    shares = np.full(n, 100.0)
+    notional = shares * 0.9
+    payout = shares * (rng.random(n) < 0.9)
+    return pd.DataFrame(
+        {
+            "condition_id": [f"market_{i // 2}" for i in range(n)],
+            "timestamp": timestamps,
+            "resolve_ts": timestamps + pd.Timedelta(days=5),
+            "shares": shares,
+            "notional": notional,
+            "total_cost": np.full(n, 0.5),
+            "q_hat": np.full(n, 0.95),
+            "q_lower": np.full(n, 0.9),
+            "payout": payout,
+            "pnl": payout - notional - 0.5,
+        }
+    )
+
+
+def test_paths_do_not_depend_on_worker_count():
+    trades = _trades()
+    for method in ("q_hat", "block"):
+        config = MonteCarloConfig(n_paths=500, method=method, chunk_size=100, n_workers=1)
+        serial = simulate_outcomes(trades, 1_000.0, config)
+        config.n_workers = 2
+        pooled = simulate_outcomes(trades, 1_000.0, config)
+        pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_certain_outcomes_reproduce_fixed_pnl():
+    trades = _trades()
+    trades["q_hat"] = 1.0
+    paths = simulate_outcomes(trades, 1_000.0, MonteCarloConfig(n_paths=50, n_workers=1))
+    expected = 1_000.0 + (trades["shares"] - trades["notional"] - trades["total_cost"]).sum()
+    assert np.allclose(paths["ending_capital"], expected)
+    assert (paths["max_drawdown"] == 0).all()
+
+    # Block resampling keeps realised PnL, so on average it matches the run.
+    blocks = simulate_outcomes(trades, 1_000.0, MonteCarloConfig(n_paths=4_000, method="block", n_workers=1))
+    realised = 1_000.0 + trades["pnl"].sum()
+    assert abs(blocks["ending_capital"].mean() - realised) < 0.05 * abs(trades["pnl"]).sum()
+    summary = summarise_paths(blocks)
+    assert summary["paths"] == 4_000
+    assert 0.0 <= summary["ruin_probability"] <= 1.0
+
+
+def test_invalid_inputs_are_rejected():
+    trades = _trades()
+    with pytest.raises(ValueError, match="chunk_size"):
+        simulate_outcomes(trades, 1_000.0, MonteCarloConfig(n_paths=10, chunk_size=0))
+    trades.loc[3, "condition_id"] = None
+    with pytest.raises(ValueError, match="condition_id"):
+        simulate_outcomes(trades, 1_000.0, MonteCarloConfig(n_paths=10, n_workers=1))
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from feature.make_features import compute_features
+from feature.make_labels import attach_labels
+from ingest.data_bundle import load_local_bundle
+from live.feed import FileFeed, SocketFeed, bundle_events, serve_replay, write_replay
+from live.paper_trader import PaperTrader, PaperTradingConfig
+from model.calibrate_isotonic import IsotonicCalibrator
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _fitted(bundle):
+    features = compute_features(
+        attach_labels(bundle.trades, bundle.resolutions), bundle.markets, bundle.books, bundle.prices
+    )
+    calibrator = IsotonicCalibrator()
+    calibrator.fit(features)
+    return features, calibrator
+
+
+def test_incremental_features_match_batch_features(tmp_path):
+    bundle = load_local_bundle(DATA_DIR)
+    features, calibrator = _fitted(bundle)
+    replay = tmp_path / "events.jsonl"
+    write_replay(bundle_events(bundle), replay)
+
+    trader = PaperTrader(calibrator, bundle.markets, config=PaperTradingConfig(min_ev=-1.0))
+    rows = []
+    for event in FileFeed(replay):
+        if event.kind == "trade":
+            rows.append(trader.trade_features(event))
+        trader.on_event(event)
+    live = pd.DataFrame([row for row in rows if row is not None]).set_index("trade_id")
+
+    # One fixture timestamp has two book snapshots, which duplicates its trades.
+    expected = features.drop_duplicates("trade_id", keep=False).set_index("trade_id")
+    columns = [
+        "time_to_event_days",
+        "best_ask",
+        "best_bid",
+        "spread",
+        "relative_spread",
+        "ask_depth",
+        "bid_depth",
+        "price_vs_mid",
+        "price_change",
+    ]
+    np.testing.assert_allclose(live.loc[expected.index, columns], expected[columns])
+    assert (live.loc[expected.index, "tau_bucket"] == expected["tau_bucket"].astype(str)).all()
+
+    summary = trader.summary()
+    assert summary["signals"] > 0
+    assert summary["open_positions"] == 0
+    assert np.isclose(summary["capital"], 100_000.0 + summary["realised_pnl"])
+    assert summary["latency"]["trade"]["events"] == len(rows)
+
+
+class _UnscoredCalibrator:
+    def transform(self, data):
+        return pd.DataFrame({"q_hat": np.nan, "q_lower": np.nan}, index=data.index)
+
+
+def test_unscored_trades_count_as_skipped():
+    bundle = load_local_bundle(DATA_DIR)
+    trader = PaperTrader(_UnscoredCalibrator(), bundle.markets, config=PaperTradingConfig(min_ev=-1.0))
+    trades = 0
+    for event in bundle_events(bundle):
+        trades += event.kind == "trade"
+        trader.on_event(event)
+    summary = trader.summary()
+    assert summary["signals"] == 0
+    assert summary["skipped_trades"] == trades > 0
+
+
+def test_socket_feed_matches_file_replay(tmp_path):
+    bundle = load_local_bundle(DATA_DIR)
+    _, calibrator = _fitted(bundle)
+    replay = tmp_path / "events.jsonl"
+    write_replay(bundle_events(bundle), replay)
+
+    address = []
+    bound = threading.Event()
+    server = threading.Thread(
+        target=serve_replay,
+        args=(replay,),
+        kwargs={"ready": lambda addr: (address.append(addr), bound.set())},
+        daemon=True,
+    )
+    server.start()
+    assert bound.wait(5)
+
+    config = PaperTradingConfig(min_ev=-1.0)
+    from_socket = PaperTrader(calibrator, bundle.markets, config=config)
+    from_socket.run(SocketFeed(*address[0], timeout=5))
+    server.join(5)
+    from_file = PaperTrader(calibrator, bundle.markets, config=config)
+    from_file.run(FileFeed(replay))
+
+    assert [s.trade_id for s in from_socket.signals] == [s.trade_id for s in from_file.signals]
+    assert from_socket.capital == from_file.capital
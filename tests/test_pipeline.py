@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import json
+
 import pandas as pd
 
+from report.profiling import StageProfiler
 from run_backtest import (
     PipelineConfig,
     _coerce_timestamp,
@@ -19,6 +22,49 @@ def test_run_backtest_pipeline():
     assert isinstance(result["calibration"], pd.DataFrame)
 
 
+def test_profile_report_covers_every_stage(tmp_path):
+    path = tmp_path / "profile.json"
+    run_backtest(PipelineConfig(source="local", profile_path=path, profile_sample_ms=1.0))
+    report = json.loads(path.read_text())
+    stages = {stage["name"]: stage for stage in report["stages"]}
+    for name in (
+        "load",
+        "attach_labels",
+        "compute_features",
+        "build_book_lookup",
+        "engine.fit_predict",
+        "engine.loop",
+        "metrics",
+    ):
+        assert stages[name]["calls"] >= 1
+        assert stages[name]["wall_s"] >= 0
+    assert stages["load"]["rows"] > 0
+    assert stages["compute_features"]["rows"] > 0
+    assert report["wall_s"] >= sum(stages[name]["wall_s"] for name in ("load", "compute_features"))
+    assert "sampling" in report
+
+
+def test_sampling_profiler_attributes_samples_to_the_hot_function():
+    def spin():
+        total = 0
+        for i in range(2_000_000):
+            total += i * i
+        return total
+
+    profiler = StageProfiler(sample_interval=0.001)
+    with profiler.stage("spin", sample=True) as stage:
+        spin()
+        stage.rows = 2
+    with profiler.stage("spin"):
+        pass
+    stats = profiler.report()
+    assert stats["stages"][0]["calls"] == 2
+    assert stats["stages"][0]["rows"] == 2
+    sampling = stats["sampling"]
+    assert sampling["samples"] > 0
+    assert any(entry["function"].endswith(":spin") for entry in sampling["inclusive"])
+
+
 def test_coerce_timestamp_returns_utc():
     ts = _coerce_timestamp("2024-01-01T00:00:00Z")
     assert isinstance(ts, pd.Timestamp)
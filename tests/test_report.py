@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.results import TradeLog
+from report.accumulators import MetricAccumulator
+from report.equity import equity_curve
+from report.metrics import compute_report, compute_risk_adjusted
+
+
+def _positions():
+    start = pd.Timestamp("2024-01-01T00:00:00Z")
+    rng = np.random.default_rng(7)
+    rows = []
+    for i in range(25):
+        entry = start + pd.Timedelta(hours=int(rng.integers(0, 24 * 20)))
+        shares = float(rng.uniform(10, 100))
+        price = float(rng.uniform(0.8, 0.95))
+        won = bool(rng.random() < 0.8)
+        rows.append(
+            {
+                "trade_id": f"t{i}",
+                "token_id": f"token_{i % 6}",
+                "timestamp": entry,
+                "resolve_ts": entry + pd.Timedelta(hours=int(rng.integers(1, 24 * 10))),
+                "execution_price": price,
+                "shares": shares,
+                "notional": shares * price,
+                "total_cost": 0.3,
+                "payout": shares if won else 0.0,
+            }
+        )
+    trades = pd.DataFrame(rows)
+    price_times = start + pd.to_timedelta(rng.integers(0, 24 * 30, size=300), unit="h")
+    prices = pd.DataFrame(
+        {
+            "token_id": [f"token_{i}" for i in rng.integers(0, 7, size=300)],
+            "timestamp": price_times,
+            "price": rng.uniform(0.7, 0.99, size=300),
+        }
+    )
+    return trades, prices
+
+
+def test_equity_curve_matches_per_position_valuation():
+    trades, prices = _positions()
+    curve = equity_curve(trades, prices, 1_000.0, freq="6h")
+
+    for _, point in curve.iloc[::7].iterrows():
+        g = point["timestamp"]
+        cash = 1_000.0
+        value = 0.0
+        for _, t in trades.iterrows():
+            if t["timestamp"] <= g:
+                cash -= t["notional"] + t["total_cost"]
+            if t["resolve_ts"] <= g:
+                cash += t["payout"]
+            elif t["timestamp"] <= g:
+                seen = prices[
+                    (prices["token_id"] == t["token_id"])
+                    & (prices["timestamp"] <= g)
+                    & (prices["timestamp"] >= t["timestamp"])
+                ]
+                mark = seen.sort_values("timestamp")["price"].iloc[-1] if len(seen) else t["execution_price"]
+                value += t["shares"] * mark
+        assert abs(point["cash"] - cash) < 1e-9
+        assert abs(point["positions_value"] - value) < 1e-9
+
+    final = curve.iloc[-1]
+    assert final["open_positions"] == 0
+    assert abs(final["equity"] - (1_000.0 + (trades["payout"] - trades["notional"] - trades["total_cost"]).sum())) < 1e-9
+
+
+def test_metrics_agree_across_trade_containers():
+    trades, _ = _positions()
+    trades["q_hat"] = np.linspace(0.55, 0.98, len(trades))
+    trades["pnl"] = trades["payout"] - trades["notional"] - trades["total_cost"]
+    log = TradeLog()
+    for row in trades.itertuples(index=False):
+        log.append(
+            row.trade_id, "market", row.timestamp.value, row.resolve_ts.value, "sports", None,
+            row.execution_price, row.execution_price, row.shares, row.notional, row.q_hat,
+            row.q_hat - 0.05, 0.01, row.total_cost, row.payout, row.pnl, row.token_id,
+        )
+
+    reports = [compute_report(source, 1_000.0) for source in (log, log.to_frame(), list(log))]
+    for report in reports[1:]:
+        assert report["summary"] == pytest.approx(reports[0]["summary"])
+        pd.testing.assert_frame_equal(report["monthly"], reports[0]["monthly"])
+        pd.testing.assert_frame_equal(report["calibration"], reports[0]["calibration"])
+        assert report["brier_score"] == pytest.approx(reports[0]["brier_score"])
+
+    report = reports[0]
+    won = trades["payout"] > 0
+    assert report["summary"]["win_rate"] == pytest.approx((trades["payout"] >= trades["notional"]).mean())
+    assert report["brier_score"] == pytest.approx(((trades["q_hat"] - won) ** 2).mean())
+    assert report["monthly"]["count"].sum() == len(trades)
+    assert report["monthly"]["pnl"].sum() == pytest.approx(trades["pnl"].sum())
+    assert report["calibration"]["count"].sum() == len(trades)
+
+
+def test_merged_accumulators_match_single_pass():
+    trades, _ = _positions()
+    trades["q_hat"] = np.linspace(0.5, 1.0, len(trades))
+    trades["pnl"] = trades["payout"] - trades["notional"] - trades["total_cost"]
+    trades = trades.sort_values("resolve_ts", ignore_index=True)
+
+    streamed = MetricAccumulator()
+    for row in trades.itertuples(index=False):
+        streamed.update(
+            row.timestamp.value, row.resolve_ts.value, row.pnl, row.notional, row.total_cost,
+            row.payout, row.q_hat,
+        )
+    merged = MetricAccumulator.from_trades(trades.iloc[:9])
+    for part in (trades.iloc[9:17], trades.iloc[17:]):
+        merged.merge(MetricAccumulator.from_trades(part))
+
+    expected = compute_report(trades, 1_000.0)
+    path = trades["pnl"].cumsum().to_numpy()
+    drawdown = (np.maximum.accumulate(np.maximum(path, 0.0)) - path).max()
+    for acc in (streamed, merged):
+        report = acc.report(1_000.0)
+        assert report["summary"] == pytest.approx(expected["summary"])
+        assert report["risk_adjusted"] == pytest.approx(expected["risk_adjusted"])
+        assert report["brier_score"] == pytest.approx(expected["brier_score"])
+        pd.testing.assert_frame_equal(report["monthly"], expected["monthly"])
+        pd.testing.assert_frame_equal(report["calibration"], expected["calibration"])
+        assert acc.max_drawdown_pnl == pytest.approx(drawdown)
+
+
+def test_risk_adjusted_matches_daily_loop():
+    trades, _ = _positions()
+    trades["q_hat"] = 0.9
+    trades["pnl"] = trades["payout"] - trades["notional"] - trades["total_cost"]
+    initial_capital = 1_000.0
+    metrics = compute_risk_adjusted(trades, initial_capital)
+
+    day = pd.Timedelta(days=1)
+    start = trades["timestamp"].min().floor("D")
+    n_days = (trades["resolve_ts"].max().floor("D") - start) // day + 1
+    equity, peak, drawdown, underwater, longest = initial_capital, initial_capital, 0.0, 0, 0
+    returns = []
+    for d in range(n_days):
+        settled = trades["resolve_ts"].dt.floor("D") == start + d * day
+        pnl = trades.loc[settled, "pnl"].sum()
+        returns.append(pnl / equity)
+        equity += pnl
+        if equity >= peak:
+            peak, underwater = equity, 0
+        else:
+            underwater += 1
+        drawdown = max(drawdown, (peak - equity) / peak)
+        longest = max(longest, underwater)
+    returns = np.array(returns)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    holding = np.maximum((trades["resolve_ts"] - trades["timestamp"]) / day, 1 / 24)
+
+    assert metrics["days"] == n_days
+    assert metrics["time_weighted_return"] == pytest.approx(np.prod(1 + returns) - 1)
+    assert metrics["time_weighted_return"] == pytest.approx(trades["pnl"].sum() / initial_capital)
+    assert metrics["sharpe"] == pytest.approx(returns.mean() / returns.std(ddof=1) * np.sqrt(365))
+    assert metrics["sortino"] == pytest.approx(returns.mean() / downside * np.sqrt(365))
+    assert metrics["max_drawdown"] == pytest.approx(drawdown)
+    assert metrics["max_drawdown_days"] == longest
+    assert metrics["mean_annualised_edge"] == pytest.approx(
+        (trades["pnl"] / trades["notional"] * 365 / holding).mean()
+    )
+    assert compute_risk_adjusted(trades.iloc[:0], initial_capital)["days"] == 0
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+
+from backtest.risk import RiskConfig, RiskManager
+
+
+def _loaded_manager() -> RiskManager:
+    manager = RiskManager(RiskConfig(category_cap=0.3, neg_risk_cap=0.2, market_cap=0.1))
+    manager.register_position("sports", "group-a", "m1", 800.0)
+    manager.register_position("sports", None, "m2", 500.0)
+    manager.register_position("politics", "group-a", "m3", 300.0)
+    manager.release_position("sports", None, "m2", 200.0)
+    return manager
+
+
+def test_batch_available_notional_matches_scalar():
+    manager = _loaded_manager()
+    categories = ["sports", "politics", None, "crypto", ""]
+    groups = ["group-a", None, "group-b", "group-a", None]
+    markets = ["m1", "m3", "m4", "m2", "m1"]
+    ids = [
+        manager.encode("category", categories),
+        manager.encode("neg_risk", groups),
+        manager.encode("market", markets),
+    ]
+    for capital in (5_000.0, 20_000.0):
+        batch = manager.available_notionals(capital, *ids)
+        scalar = [
+            manager.available_notional(capital, c, g, m) for c, g, m in zip(categories, groups, markets)
+        ]
+        np.testing.assert_array_equal(batch, scalar)
+    assert ids[0][2] == ids[0][4] == -1
+
+
+def test_exposure_snapshot_keeps_ids():
+    manager = _loaded_manager()
+    market_ids = manager.encode("market", ["m1", "m2", "m3"])
+    restored = RiskManager(manager.config)
+    restored.restore_exposures(manager.exposures())
+    assert restored.encode("market", ["m1", "m2", "m3"]).tolist() == market_ids.tolist()
+    np.testing.assert_array_equal(
+        restored.available_notionals(10_000.0, [0, -1, 1], [0, -1, 0], market_ids),
+        manager.available_notionals(10_000.0, [0, -1, 1], [0, -1, 0], market_ids),
+    )